@@ -3,6 +3,7 @@
 
 import sys
 import os
+import multiprocessing
 import time
 import threading
 import webbrowser
@@ -14,14 +15,33 @@ sys.path.insert(0, str(backend_dir))
 os.chdir(backend_dir)
 
 import uvicorn  # noqa: E402
-from main import app  # noqa: E402
+from main import app, startup_ready  # noqa: E402
 
+READY_TIMEOUT_SECONDS = 30.0
 
-def open_browser(port: int):
-    """Wait for the server to boot, then open the browser."""
-    time.sleep(1.5)
+
+class ListeningServer(uvicorn.Server):
+    """uvicorn.Server that signals once its socket accepts connections."""
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self.listening = threading.Event()
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            self.listening.set()
+
+
+def open_browser(port: int, server: ListeningServer):
+    """Open the browser once the port is bound and the cert matcher is warm."""
+    started = time.monotonic()
+    if not server.listening.wait(READY_TIMEOUT_SECONDS):
+        return
+    # Warm-up only delays the first scan, so don't hold the UI back forever.
+    startup_ready.wait(max(0.0, READY_TIMEOUT_SECONDS - (time.monotonic() - started)))
     url = f"http://localhost:{port}"
-    print(f"Opening browser to {url}")
+    print(f"Ready in {time.monotonic() - started:.2f}s — opening browser to {url}")
     webbrowser.open(url)
 
 
@@ -44,9 +64,12 @@ def main():
 
     if frozen:
         # Standalone .exe — open browser automatically
-        threading.Thread(target=open_browser, args=(port,), daemon=True).start()
+        server = ListeningServer(
+            uvicorn.Config(app, host=host, port=port, log_level="warning")
+        )
+        threading.Thread(target=open_browser, args=(port, server), daemon=True).start()
         print("=" * 40)
-        uvicorn.run(app, host=host, port=port, log_level="warning")
+        server.run()
     else:
         # Dev mode — hot reload
         reload = not settings.is_production()
@@ -57,4 +80,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed for EXTRACTION_EXECUTOR=process in the frozen executable.
+    multiprocessing.freeze_support()
     main()
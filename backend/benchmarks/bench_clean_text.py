@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark clean_text against the old two-pass regex cleaner.
+
+Reports throughput on the usual 2-4 KB postings and on large descriptions
+built by concatenating many of them.
+
+Usage (from backend/):
+    python benchmarks/bench_clean_text.py [--jobs 2000] [--large-kb 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import main  # noqa: E402
+from benchmarks.corpus import make_description  # noqa: E402
+
+
+def legacy_clean_lower(text: str) -> str:
+    """The original cleaner plus the separate .lower() the matcher used to do."""
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip().lower()
+
+
+def _throughput(
+    fn: Callable[[str], str], descriptions: List[str], repeat: int = 3
+) -> float:
+    """Best-of-`repeat` throughput in MB/s."""
+    size_mb = sum(len(d) for d in descriptions) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for desc in descriptions:
+            fn(desc)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--large-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    terms = [term for term, _canonical, _info in main.get_cert_index().lookup]
+    typical = [make_description(rng, terms) for _ in range(args.jobs)]
+    large = []
+    for _ in range(20):
+        parts: List[str] = []
+        while sum(map(len, parts)) < args.large_kb * 1024:
+            parts.append(make_description(rng, terms))
+        large.append("\n".join(parts))
+
+    corpora = {"typical": typical, f"{args.large_kb}KB": large}
+    print("MB/s (higher is better)")
+    for label, descriptions in corpora.items():
+        old = _throughput(legacy_clean_lower, descriptions)
+        new = _throughput(lambda d: main.clean_text(d, lower=True), descriptions)
+        print(
+            f"  {label:<8} legacy {old:7.1f}   clean_text {new:7.1f}   "
+            f"({new / old:.1f}x)"
+        )
+
+    changed = sum(
+        1
+        for desc in typical
+        if main.match_cert_names(legacy_clean_lower(desc), lowered=True)
+        != main.match_cert_names(main.clean_text(desc, lower=True), lowered=True)
+    )
+    print(f"  postings whose certs change with entity decoding: {changed}/{len(typical)}")
+
+
+if __name__ == "__main__":
+    main_cli()
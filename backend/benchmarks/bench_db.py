@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compare history/stats/save throughput with per-call vs persistent SQLite connections.
+
+"per-call" reproduces the old behaviour: a fresh connection, schema DDL and the
+default rollback journal on every query. "persistent" is the current layer.
+
+Usage (from backend/):
+    python benchmarks/bench_db.py [--scans 5000] [--iterations 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import main  # noqa: E402
+
+
+def populate(path: Path, scans: int, seed: int = 11) -> None:
+    """Fill a database with synthetic scans through the real save path."""
+    main.DB_PATH = path
+    rng = random.Random(seed)
+    names = list(main.get_cert_index().dictionary)
+    for _ in range(scans):
+        items = [
+            {"name": name, "count": rng.randint(1, 40), "percentage": rng.uniform(1, 90)}
+            for name in rng.sample(names, 12)
+        ]
+        main.save_scan("SOC Analyst", None, "1d", 50, 45, items)
+    main.close_db()
+
+
+def legacy_get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(main.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = DELETE")
+    main._create_schema(conn)
+    conn.commit()
+    return conn
+
+
+def measure(iterations: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        main.get_scan_history(50)
+    history = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(max(1, iterations // 10)):
+        main.compute_aggregate_stats(points=None)
+    stats = time.perf_counter() - start
+
+    items = [{"name": "CISSP", "count": 3, "percentage": 30.0}]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        main.save_scan("Bench", None, "1d", 10, 10, items)
+    saves = time.perf_counter() - start
+
+    return {
+        "history/s": iterations / history,
+        "stats/s": max(1, iterations // 10) / stats,
+        "save/s": iterations / saves,
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scans", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        populate(path, args.scans)
+
+        persistent_get_db = main._get_db
+        main._get_db = legacy_get_db
+        before = measure(args.iterations)
+
+        main._get_db = persistent_get_db
+        main.DB_PATH = path
+        after = measure(args.iterations)
+        main.close_db()
+
+    print(f"{args.scans} scans, {args.iterations} history calls")
+    for key in before:
+        print(
+            f"  {key:<10} per-call {before[key]:9.1f}   persistent {after[key]:9.1f}"
+            f"   ({after[key] / before[key]:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark the compiled cert matcher against the old per-term regex loop.
+
+Usage (from backend/):
+    python benchmarks/bench_extract_certs.py [--jobs 3000] [--words 600]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import main  # noqa: E402
+
+FILLER = (
+    "we are looking for an experienced analyst to join our security operations "
+    "team you will monitor siem alerts triage incidents and work with cloud "
+    "engineering on detection coverage strong communication skills python "
+    "scripting networking fundamentals and a bachelor degree are preferred"
+).split()
+
+
+def make_descriptions(count: int, words: int, seed: int = 7) -> List[str]:
+    """Build synthetic descriptions with a few cert mentions sprinkled in."""
+    rng = random.Random(seed)
+    names = [term for term, _canonical, _info in main.get_cert_index().lookup]
+    descriptions = []
+    for _ in range(count):
+        body = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(0, 5)):
+            body.insert(rng.randrange(len(body)), rng.choice(names).upper())
+        descriptions.append(" ".join(body))
+    return descriptions
+
+
+def legacy_extract_names(text: str) -> List[str]:
+    """The original per-term implementation, kept only for comparison."""
+    text_lower = text.lower()
+    seen = set()
+    names = []
+    for search_term, canonical, _info in main.get_cert_index().lookup:
+        if canonical in seen:
+            continue
+        escaped = re.escape(search_term).replace(r"\ ", r"\s+")
+        pattern = rf"(?<![a-z0-9]){escaped}(?![a-z0-9])"
+        if re.search(pattern, text_lower):
+            seen.add(canonical)
+            names.append(canonical)
+    return names
+
+
+def _time(fn, descriptions: List[str]) -> float:
+    start = time.perf_counter()
+    for desc in descriptions:
+        fn(desc)
+    return time.perf_counter() - start
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=3000)
+    parser.add_argument("--words", type=int, default=600)
+    args = parser.parse_args()
+
+    descriptions = make_descriptions(args.jobs, args.words)
+
+    mismatches = sum(
+        1
+        for desc in descriptions
+        if legacy_extract_names(desc)
+        != [c["name"] for c in main.extract_certs(desc, "Role")]
+    )
+
+    results: Dict[str, float] = {
+        "legacy": _time(legacy_extract_names, descriptions),
+        "compiled": _time(lambda d: main.extract_certs(d, "Role"), descriptions),
+    }
+
+    print(f"{args.jobs} descriptions x ~{args.words} words")
+    for label, seconds in results.items():
+        per_job = seconds / args.jobs * 1000
+        print(f"  {label:<9} {seconds:8.3f}s  ({per_job:.3f} ms/job)")
+    print(f"  speedup   {results['legacy'] / results['compiled']:8.1f}x")
+    print(f"  mismatches vs legacy: {mismatches}")
+
+
+if __name__ == "__main__":
+    main_cli()
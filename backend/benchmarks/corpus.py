@@ -0,0 +1,98 @@
+"""Synthetic JSearch-shaped postings for benchmarks.
+
+Descriptions look like real listings: HTML paragraphs and bullet lists,
+entities, boilerplate, and a handful of cert mentions (abbreviations, full
+names, odd casing and spacing).
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import main  # noqa: E402
+
+COMPANIES = [
+    "Acme Corp", "Globex", "Initech", "Umbrella Health", "Stark Industries",
+    "Wayne Enterprises", "Hooli", "Cyberdyne Systems", "Soylent Foods", "Vandelay Imports",
+]
+
+SENTENCES = [
+    "You will monitor SIEM alerts and triage security incidents across hybrid cloud environments.",
+    "Partner with engineering teams to harden endpoints, identity and network infrastructure.",
+    "Develop detection content, playbooks and runbooks for the security operations center.",
+    "Conduct vulnerability assessments and track remediation with system owners.",
+    "Support audits against NIST 800-53, ISO 27001 and SOC 2 control frameworks.",
+    "Experience with Splunk, Sentinel, CrowdStrike or similar tooling is a plus.",
+    "Strong written &amp; verbal communication skills are essential.",
+    "Ability to obtain and maintain a government security clearance.",
+    "Scripting experience in Python, PowerShell or Bash.",
+    "We offer competitive salary, 401(k) matching &amp; flexible hybrid work.",
+    "Bachelor&#39;s degree in Computer Science or equivalent experience.",
+    "Participate in an on-call rotation and post-incident reviews.",
+]
+
+BOILERPLATE = (
+    "<p><em>We are an equal opportunity employer and value diversity at our company. "
+    "We do not discriminate on the basis of race, religion, color, national origin, "
+    "gender, sexual orientation, age, marital status, veteran status, or disability "
+    "status.</em></p>"
+)
+
+
+def _mention(rng: random.Random, search_terms: List[str]) -> str:
+    term = rng.choice(search_terms)
+    style = rng.random()
+    if style < 0.3:
+        return term.upper()
+    if style < 0.5:
+        return term.replace(" ", "&nbsp;")
+    if style < 0.6:
+        return term.replace(" ", "\n  ")
+    return term.title()
+
+
+def make_description(rng: random.Random, search_terms: List[str]) -> str:
+    """One HTML job description of roughly 2-4 KB."""
+    parts = [f"<h2>About the role</h2><p>{' '.join(rng.sample(SENTENCES, 4))}</p>"]
+    bullets = []
+    for sentence in rng.sample(SENTENCES, rng.randint(4, 8)):
+        bullets.append(f"<li>{sentence}</li>")
+    certs = [_mention(rng, search_terms) for _ in range(rng.randint(0, 5))]
+    if certs:
+        bullets.append(f"<li>Certifications such as {', '.join(certs)} preferred.</li>")
+    parts.append(f"<h3>Responsibilities</h3><ul>{''.join(bullets)}</ul>")
+    parts.append(f"<p>{' '.join(rng.sample(SENTENCES, 3))}</p>")
+    parts.append(BOILERPLATE)
+    return "\n".join(parts)
+
+
+def make_postings(count: int, seed: int = 42) -> List[Dict]:
+    """Build `count` postings in the JSearch response shape."""
+    rng = random.Random(seed)
+    search_terms = [term for term, _canonical, _info in main.get_cert_index().lookup]
+    titles = [title for family in main.ROLE_FAMILIES.values() for title in family]
+    now = datetime.now(timezone.utc)
+    postings = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        posted = now - timedelta(hours=rng.randint(0, 24 * 30))
+        postings.append(
+            {
+                "job_id": f"bench-{seed}-{i}",
+                "job_title": rng.choice(titles),
+                "employer_name": company,
+                "company_name": company,
+                "job_apply_link": f"https://jobs.example.com/{seed}/{i}",
+                "job_posted_at_datetime_utc": posted.isoformat(),
+                "job_description": make_description(rng, search_terms),
+            }
+        )
+    return postings
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Time each stage of the analysis pipeline over synthetic corpora.
+
+Results are written as JSON (one file per commit by default) so two runs can
+be compared with --compare.
+
+Usage (from backend/):
+    python benchmarks/run_benchmarks.py [--sizes 100 1000 10000 100000]
+    python benchmarks/run_benchmarks.py --sizes 1000 --compare benchmarks/results/abc1234.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.corpus import make_postings  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def _timed(fn: Callable[[], object], items: int, repeat: int = 1) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": round(best, 6),
+        "items": items,
+        "per_item_us": round(best / max(items, 1) * 1e6, 3),
+    }
+
+
+def bench_pipeline(postings: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """Time the pure-Python stages of analyze_jobs over one corpus."""
+    n = len(postings)
+    descriptions = [p["job_description"] for p in postings]
+    results: Dict[str, Dict[str, float]] = {}
+
+    cleaned: List[str] = []
+    results["clean_text"] = _timed(
+        lambda: cleaned.extend(main.clean_text(d) for d in descriptions), n
+    )
+
+    all_certs: List[Dict] = []
+    certs_per_job: List[List[str]] = []
+
+    def extract() -> None:
+        for posting, text in zip(postings, cleaned):
+            certs = main.extract_certs(
+                text, posting["job_title"], posting["company_name"],
+                posting["job_apply_link"], job_key=posting["job_id"],
+            )
+            all_certs.extend(certs)
+            certs_per_job.append([c["name"] for c in certs])
+
+    results["extract_certs"] = _timed(extract, n)
+    results["rank_certs"] = _timed(lambda: main.rank_certs(all_certs, n, 15), n, repeat=3)
+    results["compute_cert_pairs"] = _timed(
+        lambda: main.compute_cert_pairs(certs_per_job, n), n, repeat=3
+    )
+    results["compute_title_distribution"] = _timed(
+        lambda: main.compute_title_distribution(postings), n, repeat=3
+    )
+    results["analyze_postings"] = _timed(lambda: main.analyze_postings(postings), n)
+    return results
+
+
+def bench_db(scans: int, workdir: Path, seed: int = 5) -> Dict[str, Dict[str, float]]:
+    """Time save_scan and GET /stats against a database holding `scans` scans."""
+    main.DB_PATH = workdir / f"bench-{scans}.db"
+    rng = random.Random(seed)
+    dictionary = main.get_cert_index().dictionary
+    names = list(dictionary)
+
+    def ranked() -> List[Dict]:
+        return [
+            {
+                "name": name,
+                "full_name": dictionary[name].get("full_name", name),
+                "org": dictionary[name].get("org", ""),
+                "count": rng.randint(1, 50),
+                "percentage": round(rng.uniform(1, 90), 1),
+            }
+            for name in rng.sample(names, 15)
+        ]
+
+    titles = list(main.ROLE_FAMILIES)
+    for _ in range(scans):
+        main.save_scan(rng.choice(titles), None, "1d", 100, 90, ranked())
+
+    results: Dict[str, Dict[str, float]] = {}
+    saves = 100
+    batch = [ranked() for _ in range(saves)]
+    results["save_scan"] = _timed(
+        lambda: [main.save_scan("Bench", None, "1d", 100, 90, items) for items in batch],
+        saves,
+    )
+
+    with TestClient(main.app) as client:
+        results["GET /stats"] = _timed(
+            lambda: client.get("/stats").raise_for_status(), 1, repeat=3
+        )
+        results["GET /stats?points=200"] = _timed(
+            lambda: client.get("/stats", params={"points": 200}).raise_for_status(),
+            1,
+            repeat=3,
+        )
+        results["GET /history"] = _timed(
+            lambda: client.get("/history").raise_for_status(), 1, repeat=3
+        )
+    main.close_db()
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=BACKEND_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict, previous: Dict) -> None:
+    print(f"\nvs {previous['commit']} (ratio > 1 means slower now)")
+    for size, stages in current["results"].items():
+        before = previous["results"].get(size, {})
+        for stage, result in stages.items():
+            if stage in before and before[stage]["seconds"]:
+                ratio = result["seconds"] / before[stage]["seconds"]
+                flag = "  <-- regression" if ratio > 1.2 else ""
+                print(f"  {size:>7} {stage:<28} {ratio:6.2f}x{flag}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--skip-db", action="store_true")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"== {size} postings")
+            postings = make_postings(size)
+            stages = bench_pipeline(postings)
+            del postings
+            if not args.skip_db:
+                stages.update(bench_db(size, Path(tmp)))
+            for stage, result in stages.items():
+                print(
+                    f"  {stage:<28} {result['seconds']:10.4f}s"
+                    f"  {result['per_item_us']:12.2f} us/item"
+                )
+            report["results"][str(size)] = stages
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -14,12 +14,117 @@ class Settings:
         self.jsearch_api_url = "https://jsearch.p.rapidapi.com/search"
         self.jsearch_api_host = "jsearch.p.rapidapi.com"
 
-        # Admin/auth for protected endpoints (Removed for personal usetool)
+        # Paging: by default one call asks JSearch for JSEARCH_MAX_PAGES pages at
+        # once. With JSEARCH_PAGE_PARALLEL each page is its own request, fetched
+        # JSEARCH_PAGE_CONCURRENCY at a time and stopped early on short or
+        # mostly-duplicate pages.
+        self.jsearch_max_pages = int(os.getenv("JSEARCH_MAX_PAGES", "10"))
+        self.jsearch_page_parallel = os.getenv(
+            "JSEARCH_PAGE_PARALLEL", "false"
+        ).lower() in ("1", "true", "yes")
+        self.jsearch_page_concurrency = int(os.getenv("JSEARCH_PAGE_CONCURRENCY", "3"))
+        self.jsearch_duplicate_stop_ratio = float(
+            os.getenv("JSEARCH_DUPLICATE_STOP_RATIO", "0.8")
+        )
+
+        # Upstream rate limiting: token bucket (requests/second and burst size,
+        # rate 0 disables it), concurrent call cap, and retries with jittered
+        # exponential backoff on 429/5xx. Retry-After waits longer than
+        # JSEARCH_MAX_RETRY_WAIT seconds are treated as exhausted quota.
+        self.jsearch_rate_per_second = float(
+            os.getenv("JSEARCH_RATE_PER_SECOND", "4")
+        )
+        self.jsearch_burst = int(os.getenv("JSEARCH_BURST", "4"))
+        self.jsearch_max_concurrency = int(os.getenv("JSEARCH_MAX_CONCURRENCY", "4"))
+        self.jsearch_max_retries = int(os.getenv("JSEARCH_MAX_RETRIES", "3"))
+        self.jsearch_retry_base_seconds = float(
+            os.getenv("JSEARCH_RETRY_BASE_SECONDS", "1")
+        )
+        self.jsearch_max_retry_wait = float(os.getenv("JSEARCH_MAX_RETRY_WAIT", "60"))
+
+        # Unique queries fetched at once by /analyze-jobs/batch
+        self.batch_query_concurrency = int(os.getenv("BATCH_QUERY_CONCURRENCY", "4"))
+
+        # Shared upstream HTTP client (one pool for the app lifetime)
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "60"))
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+        self.http_max_keepalive = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.http2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")
+
+        # JSearch response cache (0 entries disables it). One entry is a whole
+        # multi-page response, so the stored JSON is also capped in MB (0 = no cap).
+        self.query_cache_max_entries = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "500"))
+        self.query_cache_max_mb = int(os.getenv("QUERY_CACHE_MAX_MB", "100"))
+
+        # Per-posting extraction results; rows unused for longer than the max
+        # age are dropped (0 entries disables the cache, 0 days keeps rows)
+        self.extraction_cache_max_entries = int(
+            os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "50000")
+        )
+        self.extraction_cache_max_age_days = int(
+            os.getenv("EXTRACTION_CACHE_MAX_AGE_DAYS", "30")
+        )
+
+        # SQLite tuning for the persistent per-thread connections
+        self.sqlite_cache_mb = int(os.getenv("SQLITE_CACHE_MB", "16"))
+        self.sqlite_mmap_mb = int(os.getenv("SQLITE_MMAP_MB", "256"))
+
+        # Reposted descriptions: exact-duplicate collapsing, plus optional
+        # near-duplicate detection (max SimHash bit distance, 0 disables it)
+        self.description_dedup = os.getenv("DESCRIPTION_DEDUP", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.near_duplicate_distance = int(os.getenv("NEAR_DUPLICATE_DISTANCE", "0"))
+
+        # Description cleaning / cert extraction pool ("thread" or "process").
+        # Scans with at most EXTRACTION_INLINE_MAX postings skip the pool.
+        self.extraction_executor = os.getenv("EXTRACTION_EXECUTOR", "thread").lower()
+        self.extraction_workers = int(os.getenv("EXTRACTION_WORKERS", "0")) or None
+        self.extraction_chunk_size = int(os.getenv("EXTRACTION_CHUNK_SIZE", "50"))
+        self.extraction_inline_max = int(os.getenv("EXTRACTION_INLINE_MAX", "50"))
+
+        # Saved-search scheduler: poll interval, concurrent scheduled scans,
+        # start-time jitter, and a daily JSearch call budget (0 = unlimited)
+        self.scheduler_enabled = os.getenv("SCHEDULER_ENABLED", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.scheduler_poll_seconds = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+        self.scheduler_max_concurrent_runs = int(
+            os.getenv("SCHEDULER_MAX_CONCURRENT_RUNS", "1")
+        )
+        self.scheduler_jitter_seconds = float(
+            os.getenv("SCHEDULER_JITTER_SECONDS", "300")
+        )
+        self.scheduler_daily_call_budget = int(
+            os.getenv("SCHEDULER_DAILY_CALL_BUDGET", "100")
+        )
+
+        # Admin/auth for protected endpoints (unset disables them)
+        self.admin_api_key = os.getenv("ADMIN_API_KEY", "")
+
+        # Opt-in request profiles kept under ~/.intelijob/data/profiles
+        self.profile_max_files = int(os.getenv("PROFILE_MAX_FILES", "50"))
 
         # Scan retention limits
         self.scan_retention_days = int(os.getenv("SCAN_RETENTION_DAYS", "0"))
         self.max_scan_rows = int(os.getenv("MAX_SCAN_ROWS", "0"))
 
+        # Compressed raw posting archive (off by default; 0 disables a limit)
+        self.posting_archive = os.getenv("POSTING_ARCHIVE", "false").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.posting_archive_retention_days = int(
+            os.getenv("POSTING_ARCHIVE_RETENTION_DAYS", "90")
+        )
+        self.posting_archive_max_mb = int(os.getenv("POSTING_ARCHIVE_MAX_MB", "200"))
+
     def is_rapidapi_configured(self) -> bool:
         return bool(
             self.rapidapi_key
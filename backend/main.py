@@ -1,21 +1,40 @@
 import os
 import re
 import sys
+import io
 import json
+import cProfile
+import marshal
+import pstats
+import hashlib
+import functools
+import html
+import mimetypes
+import heapq
+import random
 import sqlite3
+import struct
 import asyncio
+import threading
+import time
+import zlib
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional, Any, Literal
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Any, AsyncIterator, Callable, Iterator, Literal
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 import httpx
-from fastapi import FastAPI, HTTPException, Request, Body, Header
+from fastapi import FastAPI, HTTPException, Request, Response, Body, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+_MODULE_STARTED = time.perf_counter()
+
 def _load_env_for_exe():
     """When frozen, load .env from the directory containing the .exe."""
     if getattr(sys, "frozen", False):
@@ -29,9 +48,264 @@ _load_env_for_exe()
 
 
 from config import settings  # noqa: E402
+import metrics  # noqa: E402
+
+# ── HTTP Client ──────────────────────────────────────────────────────────────
+# One pooled client is shared by every upstream call so scans reuse warm
+# TLS connections to RapidAPI instead of handshaking on each request.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Create the pooled upstream client; pass a transport to mock RapidAPI."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    http2 = settings.http2 and _http2_available()
+    return httpx.AsyncClient(
+        timeout=settings.http_timeout,
+        limits=limits,
+        http2=http2,
+        transport=transport,
+    )
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Install the shared client (tests and the mock server inject one here)."""
+    global _http_client
+    _http_client = client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if the lifespan hasn't run."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = build_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# ── Startup ──────────────────────────────────────────────────────────────────
+# Importing this module only defines things. The lifespan opens the database
+# and loads the frontend files; the HTTP client (TLS context) and cert matcher
+# are then built in the background so the port is bound without waiting.
+# /health reports each phase and whether warm-up has finished.
+_startup_phases: Dict[str, float] = {}
+_startup_ready_after: Optional[float] = None
+startup_ready = threading.Event()
+
+
+@contextmanager
+def startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _startup_phases[name] = round(time.perf_counter() - start, 4)
+
+
+async def warm_up() -> None:
+    """Build the HTTP client and cert matcher off the event loop, then set `startup_ready`."""
+    global _startup_ready_after
+    if _http_client is None:
+        with startup_phase("http_client"):
+            client = await asyncio.to_thread(build_http_client)
+        # A request may have created one meanwhile; keep that one.
+        if _http_client is None or _http_client.is_closed:
+            set_http_client(client)
+    await asyncio.to_thread(get_cert_index)
+    if not startup_ready.is_set():
+        _startup_ready_after = round(time.perf_counter() - _MODULE_STARTED, 4)
+        startup_ready.set()
+
+
+def startup_status() -> Dict[str, Any]:
+    return {
+        "ready": startup_ready.is_set(),
+        "ready_after_seconds": _startup_ready_after,
+        "cert_index": _cert_index.source if _cert_index else None,
+        "phases_seconds": dict(_startup_phases),
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_phase("database"):
+        init_db()
+    with startup_phase("frontend"):
+        load_frontend()
+    with startup_phase("scheduler"):
+        start_scan_scheduler()
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        if not warm_up_task.done():
+            warm_up_task.cancel()
+        await stop_scan_scheduler()
+        await cancel_reanalysis()
+        await close_http_client()
+        shutdown_extraction_executor()
+        close_db()
+
+
+# ── Metrics ──────────────────────────────────────────────────────────────────
+# Exposed at GET /metrics in Prometheus text format.
+
+HTTP_REQUEST_SECONDS = metrics.Histogram(
+    "intelijob_http_request_seconds",
+    "HTTP request latency by route template, until the last body chunk is sent.",
+    ("method", "route", "status"),
+)
+SCAN_STAGE_SECONDS = metrics.Histogram(
+    "intelijob_scan_stage_seconds",
+    "Time each scan spent per pipeline stage, by path (scan, stream or batch).",
+    ("path", "stage"),
+)
+UPSTREAM_REQUEST_SECONDS = metrics.Histogram(
+    "intelijob_upstream_request_seconds",
+    "Latency of each JSearch HTTP attempt, excluding scheduler wait.",
+    ("outcome",),
+)
+UPSTREAM_QUEUE_SECONDS = metrics.Histogram(
+    "intelijob_upstream_queue_seconds",
+    "Time a JSearch call waited for a scheduler slot.",
+)
+DB_OPERATION_SECONDS = metrics.Histogram(
+    "intelijob_db_operation_seconds",
+    "Latency of SQLite operations.",
+    ("operation",),
+)
+POSTINGS_FETCHED = metrics.Counter(
+    "intelijob_postings_fetched_total",
+    "Postings returned by JSearch (cache misses only).",
+)
+POSTINGS_DEDUPED = metrics.Counter(
+    "intelijob_postings_deduped_total",
+    "Postings dropped as duplicates, by job identity or repeated description.",
+    ("reason",),
+)
+UPSTREAM_ERRORS = metrics.Counter(
+    "intelijob_upstream_errors_total",
+    "Failed JSearch attempts (429s are counted separately).",
+    ("reason",),
+)
+UPSTREAM_RATE_LIMITED = metrics.Counter(
+    "intelijob_upstream_429_total",
+    "JSearch attempts answered with 429 Too Many Requests.",
+)
+
+
+def _timed_db(operation: str):
+    """Record the wrapped function's latency under DB_OPERATION_SECONDS."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                DB_OPERATION_SECONDS.observe(
+                    time.perf_counter() - start, operation=operation
+                )
+
+        return wrapper
+
+    return decorate
+
+
+class ScanStages:
+    """Per-scan stage timer feeding SCAN_STAGE_SECONDS.
+
+    A stage that runs several times in one scan (per query when streaming, per
+    pair in a batch) is summed and observed once when the scan ends, so the
+    scan, stream and batch paths report comparable per-scan stage times.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+
+    def record(self) -> None:
+        for name, seconds in self.seconds.items():
+            SCAN_STAGE_SECONDS.observe(seconds, path=self.path, stage=name)
+        self.seconds.clear()
+
+    def __enter__(self) -> "ScanStages":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.record()
+
+
+class RouteTimingMiddleware:
+    """Pure ASGI middleware feeding HTTP_REQUEST_SECONDS.
+
+    The router stores the matched route in the shared scope, so the label is
+    the path template (`/history/{scan_id}`), not the raw URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "other")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=route,
+                status=str(status),
+            )
+
 
 # ── App Setup ────────────────────────────────────────────────────────────────
-app = FastAPI(title="InteliJob API", version="1.0.0")
+app = FastAPI(title="InteliJob API", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(RouteTimingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -60,6 +334,25 @@ class JobSearchRequest(BaseModel):
     owned_certs: List[str] = Field(default_factory=list)
 
 
+class SavedSearchRequest(BaseModel):
+    job_title: str
+    location: Optional[str] = None
+    time_range: Literal["1d", "3d", "7d", "14d", "30d"] = "1d"
+    interval_minutes: int = Field(1440, ge=15)
+    # Local "HH:MM"; when set the search runs once a day at that time instead.
+    daily_at: Optional[str] = Field(None, pattern=r"^([01]\d|2[0-3]):[0-5]\d$")
+
+
+class BatchPair(BaseModel):
+    job_title: str
+    location: Optional[str] = None
+
+
+class BatchAnalysisRequest(BaseModel):
+    pairs: List[BatchPair] = Field(..., min_length=1, max_length=50)
+    time_range: Literal["1d", "3d", "7d", "14d", "30d"] = "1d"
+
+
 class JobAnalysisResponse(BaseModel):
     success: bool
     message: str
@@ -224,51 +517,646 @@ def filter_jobs_by_time_range(
 
 # ── Cert Dictionary ──────────────────────────────────────────────────────────
 CERT_DICT_PATH = Path(__file__).parent / "certs.json"
-CERT_DICTIONARY: Dict[str, Dict] = {}
 
-try:
-    with open(CERT_DICT_PATH, "r", encoding="utf-8") as f:
-        CERT_DICTIONARY = json.load(f)
-    print(f"Loaded {len(CERT_DICTIONARY)} certifications")
-except (FileNotFoundError, json.JSONDecodeError) as e:
-    print(f"Warning: certs.json issue: {e}")
 
-# Build lookup: (search_term_lower, canonical_abbrev, info_dict)
-_cert_lookup: List[tuple] = []
-for abbrev, info in CERT_DICTIONARY.items():
-    _cert_lookup.append((abbrev.lower(), abbrev, info))
-    full = info.get("full_name", "")
-    if full and full.lower() != abbrev.lower():
-        _cert_lookup.append((full.lower(), abbrev, info))
+def load_cert_dictionary(path: Optional[Path] = None) -> Dict[str, Dict]:
+    path = path or CERT_DICT_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            dictionary = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: certs.json issue: {e}")
+        return {}
+    print(f"Loaded {len(dictionary)} certifications")
+    return dictionary
+
+
+def _build_cert_lookup(dictionary: Dict[str, Dict]) -> List[tuple]:
+    """(search_term_lower, canonical_abbrev, info_dict) for each abbrev and full name."""
+    lookup: List[tuple] = []
+    for abbrev, info in dictionary.items():
+        lookup.append((abbrev.lower(), abbrev, info))
+        full = info.get("full_name", "")
+        if full and full.lower() != abbrev.lower():
+            lookup.append((full.lower(), abbrev, info))
+    return lookup
+
+
+_WORD_CHAR = re.compile(r"[a-z0-9]")
+
+
+def _normalize_term(term: str) -> str:
+    """Collapse whitespace runs so matched text maps back to its lookup term."""
+    return " ".join(term.split())
+
+
+def _build_cert_matcher(
+    lookup: List[tuple],
+) -> tuple[Optional[re.Pattern], Dict[str, List[str]], Dict[str, int]]:
+    """Compile every search term into one alternation scanned in a single pass.
+
+    Terms are tried longest-first inside a lookahead so each position yields the
+    longest term that matches there. Shorter terms that are prefixes of it (and
+    end on a word boundary inside it) are attached to that term up front, so
+    "CCNA Security" still counts as a CCNA hit just like the per-term search did.
+    """
+    order: Dict[str, int] = {}
+    term_hits: Dict[str, List[str]] = {}
+    for search_term, canonical, _info in lookup:
+        order.setdefault(canonical, len(order))
+        hits = term_hits.setdefault(_normalize_term(search_term), [])
+        if canonical not in hits:
+            hits.append(canonical)
+
+    if not term_hits:
+        return None, {}, order
+
+    terms = sorted(term_hits, key=len, reverse=True)
+    for term in terms:
+        for other in terms:
+            if (
+                len(other) < len(term)
+                and term.startswith(other)
+                and not _WORD_CHAR.match(term[len(other)])
+            ):
+                for canonical in term_hits[other]:
+                    if canonical not in term_hits[term]:
+                        term_hits[term].append(canonical)
+
+    alternation = "|".join(re.escape(t).replace(r"\ ", r"\s+") for t in terms)
+    pattern = re.compile(rf"(?<![a-z0-9])(?=({alternation})(?![a-z0-9]))")
+    return pattern, term_hits, order
+
+
+# `python -c "import main; main.write_cert_index()"` (run by tools/build_app.py)
+# serializes the compiled index next to certs.json. The file is checked for its
+# header, checksum, Python version, EXTRACTOR_REVISION and the certs.json it was
+# built from; anything off falls back to parsing certs.json.
+CERT_INDEX_PATH = Path(__file__).parent / "certs.idx"
+CERT_INDEX_FORMAT = 1
+_CERT_INDEX_MAGIC = b"IJCERTIX"
+_CERT_INDEX_HEADER = struct.Struct(">8sHBB32s")
+
+
+class CertIndex:
+    """The cert dictionary and the single-pass matcher compiled from it."""
+
+    def __init__(
+        self,
+        dictionary: Dict[str, Dict],
+        lookup: List[tuple],
+        pattern: Optional[re.Pattern],
+        term_hits: Dict[str, List[str]],
+        order: Dict[str, int],
+        source: str,
+    ):
+        self.dictionary = dictionary
+        self.lookup = lookup
+        self.pattern = pattern
+        self.term_hits = term_hits
+        self.order = order
+        self.source = source
+        # Extraction cache and re-analysis rows are tagged with this; see
+        # EXTRACTOR_REVISION.
+        self.version = hashlib.blake2b(
+            json.dumps([EXTRACTOR_REVISION, dictionary], sort_keys=True).encode("utf-8"),
+            digest_size=8,
+        ).hexdigest()
+
+    @classmethod
+    def from_dictionary(cls, dictionary: Dict[str, Dict]) -> "CertIndex":
+        lookup = _build_cert_lookup(dictionary)
+        pattern, term_hits, order = _build_cert_matcher(lookup)
+        return cls(dictionary, lookup, pattern, term_hits, order, source="certs.json")
+
+    def to_bytes(self, source_digest: str) -> bytes:
+        body = marshal.dumps(
+            {
+                "source_digest": source_digest,
+                "extractor_revision": EXTRACTOR_REVISION,
+                "dictionary": self.dictionary,
+                "lookup": [(term, canonical) for term, canonical, _info in self.lookup],
+                "pattern": self.pattern.pattern if self.pattern is not None else None,
+                "term_hits": self.term_hits,
+                "order": self.order,
+            }
+        )
+        checksum = hashlib.blake2b(body, digest_size=32).digest()
+        header = _CERT_INDEX_HEADER.pack(
+            _CERT_INDEX_MAGIC, CERT_INDEX_FORMAT, *sys.version_info[:2], checksum
+        )
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes, source_digest: Optional[str]) -> "CertIndex":
+        """Decode a prebuilt index; raises ValueError if it is corrupt or stale."""
+        if len(data) < _CERT_INDEX_HEADER.size:
+            raise ValueError("truncated")
+        magic, fmt, major, minor, checksum = _CERT_INDEX_HEADER.unpack_from(data)
+        if magic != _CERT_INDEX_MAGIC or fmt != CERT_INDEX_FORMAT:
+            raise ValueError("unknown format")
+        # marshal output is only stable within one Python minor version.
+        if (major, minor) != sys.version_info[:2]:
+            raise ValueError(f"built for Python {major}.{minor}")
+        body = data[_CERT_INDEX_HEADER.size :]
+        if hashlib.blake2b(body, digest_size=32).digest() != checksum:
+            raise ValueError("checksum mismatch")
+        payload = marshal.loads(body)
+        if payload["extractor_revision"] != EXTRACTOR_REVISION:
+            raise ValueError("built for another extractor revision")
+        if source_digest is not None and payload["source_digest"] != source_digest:
+            raise ValueError("certs.json changed since it was built")
+
+        dictionary = payload["dictionary"]
+        lookup = [
+            (term, canonical, dictionary[canonical])
+            for term, canonical in payload["lookup"]
+        ]
+        pattern = payload["pattern"]
+        return cls(
+            dictionary,
+            lookup,
+            re.compile(pattern) if pattern is not None else None,
+            payload["term_hits"],
+            payload["order"],
+            source="prebuilt",
+        )
+
+
+def _file_digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_cert_index(
+    source: Optional[Path] = None, dest: Optional[Path] = None
+) -> CertIndex:
+    """Compile certs.json into the prebuilt index bundled with the executable."""
+    source, dest = source or CERT_DICT_PATH, dest or CERT_INDEX_PATH
+    digest = _file_digest(source)
+    if digest is None:
+        raise FileNotFoundError(source)
+    index = CertIndex.from_dictionary(load_cert_dictionary(source))
+    dest.write_bytes(index.to_bytes(digest))
+    print(f"Wrote cert index to {dest}")
+    return index
+
+
+def load_prebuilt_cert_index(
+    path: Optional[Path] = None, source: Optional[Path] = None
+) -> Optional[CertIndex]:
+    """The prebuilt index, or None if it is missing, corrupt or stale."""
+    path, source = path or CERT_INDEX_PATH, source or CERT_DICT_PATH
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        return CertIndex.from_bytes(data, _file_digest(source))
+    except (ValueError, EOFError, TypeError, KeyError) as e:
+        print(f"Ignoring {path.name} ({e}); loading {source.name} instead")
+        return None
+
+
+_cert_index: Optional[CertIndex] = None
+_cert_index_lock = threading.Lock()
+
+
+def get_cert_index() -> CertIndex:
+    """Load the cert index on first use (thread-safe).
+
+    Prefers the prebuilt certs.idx and falls back to parsing certs.json.
+    """
+    global _cert_index
+    if _cert_index is None:
+        with _cert_index_lock:
+            if _cert_index is None:
+                with startup_phase("cert_index"):
+                    index = load_prebuilt_cert_index()
+                if index is None:
+                    with startup_phase("cert_dictionary"):
+                        dictionary = load_cert_dictionary()
+                    with startup_phase("cert_matcher"):
+                        index = CertIndex.from_dictionary(dictionary)
+                _cert_index = index
+    return _cert_index
 
 
 # ── SQLite Persistence ───────────────────────────────────────────────────────
 # In a PyInstaller standalone bundle, we cannot store the DB in the installation folder or _MEIPASS
 # as it would be wiped out or unwriteable. We use a dedicated folder in the user's home directory.
 DATA_DIR = Path.home() / ".intelijob" / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DATA_DIR / "scans.db"
 
 
-def _get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    job_title TEXT NOT NULL,
+    location TEXT,
+    time_range TEXT,
+    total_jobs INTEGER,
+    jobs_with_descriptions INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans (timestamp);
+
+CREATE TABLE IF NOT EXISTS scan_certs (
+    scan_id INTEGER NOT NULL,
+    cert TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    percentage REAL NOT NULL,
+    sources TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (scan_id, cert)
+);
+CREATE INDEX IF NOT EXISTS idx_scan_certs_cert ON scan_certs (cert, scan_id);
+
+CREATE TABLE IF NOT EXISTS cert_stats (
+    name TEXT PRIMARY KEY,
+    full_name TEXT,
+    org TEXT,
+    total_mentions INTEGER NOT NULL DEFAULT 0,
+    scans_appeared INTEGER NOT NULL DEFAULT 0,
+    percentage_sum REAL NOT NULL DEFAULT 0,
+    latest_percentage REAL NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS query_cache (
+    cache_key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_query_cache_last_used ON query_cache (last_used);
+
+-- Entry count and stored payload bytes for query_cache, kept in step by
+-- _QUERY_CACHE_TRIGGERS.
+CREATE TABLE IF NOT EXISTS query_cache_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS extraction_cache (
+    cache_key TEXT PRIMARY KEY,
+    dict_version TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    certs TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_used ON extraction_cache (last_used);
+
+-- Row count for extraction_cache, kept in step by _EXTRACTION_CACHE_TRIGGERS
+-- so a put never counts the table.
+CREATE TABLE IF NOT EXISTS extraction_cache_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS postings (
+    job_key TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_postings_last_seen ON postings (last_seen);
+
+-- Every posting a scan fetched. `kept` marks the ones that survived the
+-- time-range filter and repost collapse, i.e. the ones its ranks came from.
+CREATE TABLE IF NOT EXISTS scan_postings (
+    scan_id INTEGER NOT NULL,
+    job_key TEXT NOT NULL,
+    kept INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (scan_id, job_key)
+);
+CREATE INDEX IF NOT EXISTS idx_scan_postings_job_key ON scan_postings (job_key);
+
+-- Running totals for the posting archive, kept in step by the
+-- _ARCHIVE_TOTALS_TRIGGERS below so /health never scans `postings`.
+CREATE TABLE IF NOT EXISTS archive_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    postings INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scan_certs_staging (
+    scan_id INTEGER NOT NULL,
+    cert TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    percentage REAL NOT NULL,
+    sources TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (scan_id, cert)
+);
+
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_title TEXT NOT NULL,
+    location TEXT,
+    time_range TEXT NOT NULL,
+    interval_minutes INTEGER NOT NULL,
+    daily_at TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    next_run_at TEXT NOT NULL,
+    last_run_at TEXT,
+    last_status TEXT,
+    last_error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS saved_search_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_id INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    jobs_analyzed INTEGER,
+    upstream_calls INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_saved_search_runs_search ON saved_search_runs (search_id, id);
+CREATE INDEX IF NOT EXISTS idx_saved_search_runs_started ON saved_search_runs (started_at);
+
+CREATE TABLE IF NOT EXISTS reanalysis (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    dict_version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL,
+    last_scan_id INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    error TEXT
+);
+"""
+
+
+# Each thread keeps one open connection per database file. The schema (and any
+# legacy migration) runs once per file, not on every query.
+_db_local = threading.local()
+_db_connections: List[sqlite3.Connection] = []
+_db_lock = threading.Lock()
+_db_initialized: set = set()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS scans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            job_title TEXT NOT NULL,
-            location TEXT,
-            time_range TEXT,
-            total_jobs INTEGER,
-            jobs_with_descriptions INTEGER,
-            cert_data TEXT NOT NULL
-        )
-    """)
-    conn.commit()
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = {-1024 * settings.sqlite_cache_mb}")
+    conn.execute(f"PRAGMA mmap_size = {1024 * 1024 * settings.sqlite_mmap_mb}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def init_db(path: Optional[Path] = None) -> None:
+    """Create tables and run migrations for a database file (once per process)."""
+    path = path or DB_PATH
+    with _db_lock:
+        if path in _db_initialized:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = _connect(path)
+        try:
+            scan_columns = {
+                row["name"] for row in conn.execute("PRAGMA table_info(scans)")
+            }
+            if "cert_data" in scan_columns:
+                _migrate_cert_data_blobs(conn)
+            else:
+                _create_schema(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        _db_initialized.add(path)
+
+
+def _get_db() -> sqlite3.Connection:
+    """Return this thread's persistent connection to DB_PATH."""
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and getattr(_db_local, "path", None) == DB_PATH:
+        try:
+            conn.in_transaction  # raises if a caller closed it
+            return conn
+        except sqlite3.ProgrammingError:
+            pass
+
+    if conn is not None:
+        _forget_db(conn)
+    init_db(DB_PATH)
+    conn = _connect(DB_PATH)
+    with _db_lock:
+        _db_connections.append(conn)
+    _db_local.conn, _db_local.path = conn, DB_PATH
     return conn
 
 
+def _forget_db(conn: sqlite3.Connection) -> None:
+    with _db_lock:
+        if conn in _db_connections:
+            _db_connections.remove(conn)
+    conn.close()
+
+
+def close_db() -> None:
+    """Close every thread's connection (app shutdown)."""
+    with _db_lock:
+        connections, _db_connections[:] = list(_db_connections), []
+    for conn in connections:
+        conn.close()
+    _db_local.__dict__.clear()
+
+
+# Trigger bodies contain ";", so these can't live in SCHEMA.
+_ARCHIVE_TOTALS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS archive_totals_insert AFTER INSERT ON postings
+    BEGIN
+        UPDATE archive_totals SET postings = postings + 1, bytes = bytes + NEW.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS archive_totals_delete AFTER DELETE ON postings
+    BEGIN
+        UPDATE archive_totals SET postings = postings - 1, bytes = bytes - OLD.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS archive_totals_resize AFTER UPDATE OF size ON postings
+    BEGIN
+        UPDATE archive_totals SET bytes = bytes - OLD.size + NEW.size;
+    END
+    """,
+)
+
+
+_QUERY_CACHE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS query_cache_totals_insert AFTER INSERT ON query_cache
+    BEGIN
+        UPDATE query_cache_totals SET entries = entries + 1,
+            bytes = bytes + length(CAST(NEW.payload AS BLOB));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS query_cache_totals_delete AFTER DELETE ON query_cache
+    BEGIN
+        UPDATE query_cache_totals SET entries = entries - 1,
+            bytes = bytes - length(CAST(OLD.payload AS BLOB));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS query_cache_totals_resize AFTER UPDATE OF payload ON query_cache
+    BEGIN
+        UPDATE query_cache_totals SET
+            bytes = bytes - length(CAST(OLD.payload AS BLOB)) + length(CAST(NEW.payload AS BLOB));
+    END
+    """,
+)
+
+
+_EXTRACTION_CACHE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS extraction_cache_totals_insert AFTER INSERT ON extraction_cache
+    BEGIN
+        UPDATE extraction_cache_totals SET entries = entries + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS extraction_cache_totals_delete AFTER DELETE ON extraction_cache
+    BEGIN
+        UPDATE extraction_cache_totals SET entries = entries - 1;
+    END
+    """,
+)
+
+
+# Columns added after their table first shipped; older databases get them on
+# startup. The defaults describe rows written before the column existed.
+_ADDED_COLUMNS = (
+    ("scan_certs", "sources", "TEXT NOT NULL DEFAULT '[]'"),
+    ("scan_certs_staging", "sources", "TEXT NOT NULL DEFAULT '[]'"),
+    ("scan_postings", "kept", "INTEGER NOT NULL DEFAULT 1"),
+)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    for statement in SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    if conn.execute("SELECT 1 FROM archive_totals").fetchone() is None:
+        # First run with totals (or a fresh database): count what's there once.
+        conn.execute(
+            "INSERT INTO archive_totals (id, postings, bytes) SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM postings"
+        )
+    if conn.execute("SELECT 1 FROM query_cache_totals").fetchone() is None:
+        conn.execute(
+            "INSERT INTO query_cache_totals (id, entries, bytes) SELECT 1, COUNT(*), COALESCE(SUM(length(CAST(payload AS BLOB))), 0) FROM query_cache"
+        )
+    if conn.execute("SELECT 1 FROM extraction_cache_totals").fetchone() is None:
+        conn.execute(
+            "INSERT INTO extraction_cache_totals (id, entries) SELECT 1, COUNT(*) FROM extraction_cache"
+        )
+    for trigger in (
+        _ARCHIVE_TOTALS_TRIGGERS + _QUERY_CACHE_TRIGGERS + _EXTRACTION_CACHE_TRIGGERS
+    ):
+        conn.execute(trigger)
+    for table, column, definition in _ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migrate_cert_data_blobs(conn: sqlite3.Connection) -> None:
+    """One-time move of legacy `scans.cert_data` JSON into `scan_certs` rows.
+
+    SQLite can't drop a column in place on older versions, so the scans table
+    is rebuilt without it. Per-cert aggregates are recomputed from the blobs.
+    """
+    conn.execute("BEGIN")
+    with conn:
+        conn.execute("ALTER TABLE scans RENAME TO scans_legacy")
+        _create_schema(conn)
+        conn.execute("DELETE FROM cert_stats")
+        legacy = conn.execute(
+            "SELECT * FROM scans_legacy ORDER BY timestamp ASC, id ASC"
+        ).fetchall()
+        for row in legacy:
+            conn.execute(
+                "INSERT INTO scans (id, timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    row["id"],
+                    row["timestamp"],
+                    row["job_title"],
+                    row["location"],
+                    row["time_range"],
+                    row["total_jobs"],
+                    row["jobs_with_descriptions"],
+                ),
+            )
+            cert_items = json.loads(row["cert_data"])
+            _insert_scan_certs(conn, row["id"], cert_items)
+            _add_cert_stats(conn, row["timestamp"], cert_items)
+        conn.execute("DROP TABLE scans_legacy")
+
+
+def _insert_scan_certs(
+    conn: sqlite3.Connection,
+    scan_id: int,
+    cert_items: List[Dict],
+    table: str = "scan_certs",
+) -> None:
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {table} (scan_id, cert, rank, count, percentage, sources) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                scan_id,
+                cert["name"],
+                rank,
+                cert.get("count", 0),
+                cert.get("percentage", 0),
+                json.dumps(cert.get("sources", [])),
+            )
+            for rank, cert in enumerate(cert_items)
+        ],
+    )
+
+
+def _add_cert_stats(
+    conn: sqlite3.Connection, timestamp: str, cert_items: List[Dict]
+) -> None:
+    """Fold one scan's ranked certs into the running per-cert aggregates."""
+    conn.executemany(
+        """
+        INSERT INTO cert_stats (name, full_name, org, total_mentions, scans_appeared, percentage_sum, latest_percentage, first_seen)
+        VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            total_mentions = total_mentions + excluded.total_mentions,
+            scans_appeared = scans_appeared + 1,
+            percentage_sum = percentage_sum + excluded.percentage_sum,
+            latest_percentage = excluded.latest_percentage
+        """,
+        [
+            (
+                cert["name"],
+                cert.get("full_name", cert["name"]),
+                cert.get("org", ""),
+                cert.get("count", 0),
+                cert.get("percentage", 0),
+                cert.get("percentage", 0),
+                timestamp,
+            )
+            for cert in cert_items
+        ],
+    )
+
+
+@_timed_db("save_scan")
 def save_scan(
     job_title: str,
     location: Optional[str],
@@ -276,402 +1164,2750 @@ def save_scan(
     total_jobs: int,
     jobs_with_desc: int,
     cert_items: List[Dict],
-):
-    """Save a scan result to SQLite."""
+    postings: Optional[List[Dict]] = None,
+    kept_postings: Optional[List[Dict]] = None,
+) -> int:
+    """Save a scan result to SQLite, archiving its raw postings when given.
+
+    `postings` is everything the scan fetched; `kept_postings` (default: all of
+    them) is the subset its ranks were computed from.
+    """
     conn = _get_db()
-    try:
-        conn.execute(
-            "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions, cert_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    timestamp = datetime.now(timezone.utc).isoformat()
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions) VALUES (?, ?, ?, ?, ?, ?)",
             (
-                datetime.now(timezone.utc).isoformat(),
+                timestamp,
                 job_title,
                 location,
                 time_range,
                 total_jobs,
                 jobs_with_desc,
-                json.dumps(cert_items),
             ),
         )
+        scan_id = cursor.lastrowid
+        _insert_scan_certs(conn, scan_id, cert_items)
+        _add_cert_stats(conn, timestamp, cert_items)
+        if postings:
+            _archive_postings(conn, scan_id, timestamp, postings, kept_postings)
         _apply_scan_retention(conn)
-        conn.commit()
-    finally:
-        conn.close()
+    return scan_id
 
 
 def _apply_scan_retention(conn: sqlite3.Connection) -> None:
     """Prune old scan rows by age and by max-row limit."""
+    conditions = []
+    params: List[Any] = []
     if settings.scan_retention_days > 0:
         cutoff = (
             datetime.now(timezone.utc) - timedelta(days=settings.scan_retention_days)
         ).isoformat()
-        conn.execute("DELETE FROM scans WHERE timestamp < ?", (cutoff,))
+        conditions.append("timestamp < ?")
+        params.append(cutoff)
 
     if settings.max_scan_rows > 0:
-        conn.execute(
-            "DELETE FROM scans WHERE id NOT IN (SELECT id FROM scans ORDER BY timestamp DESC LIMIT ?)",
-            (settings.max_scan_rows,),
+        conditions.append(
+            "id NOT IN (SELECT id FROM scans ORDER BY timestamp DESC LIMIT ?)"
+        )
+        params.append(settings.max_scan_rows)
+
+    if not conditions:
+        return
+
+    pruned = f"SELECT id FROM scans WHERE {' OR '.join(conditions)}"
+    pruned_ids = [row[0] for row in conn.execute(pruned, params)]
+    if not pruned_ids:
+        return
+    # Back the pruned scans out of the running per-cert aggregates first.
+    removed = conn.execute(
+        f"SELECT cert, SUM(count) AS mentions, COUNT(*) AS scans, SUM(percentage) AS percentage_sum FROM scan_certs WHERE scan_id IN ({pruned}) GROUP BY cert",
+        params,
+    ).fetchall()
+    conn.executemany(
+        """
+        UPDATE cert_stats SET
+            total_mentions = total_mentions - ?,
+            scans_appeared = scans_appeared - ?,
+            percentage_sum = percentage_sum - ?
+        WHERE name = ?
+        """,
+        [
+            (row["mentions"], row["scans"], row["percentage_sum"], row["cert"])
+            for row in removed
+        ],
+    )
+    conn.execute("DELETE FROM cert_stats WHERE scans_appeared <= 0")
+    conn.execute(f"DELETE FROM scan_certs WHERE scan_id IN ({pruned})", params)
+    _unlink_archived_scans(conn, pruned_ids)
+    conn.execute(f"DELETE FROM scans WHERE {' OR '.join(conditions)}", params)
+
+
+def _load_scan_certs(
+    conn: sqlite3.Connection, scan_filter: str, params: tuple
+) -> Dict[int, List[Dict]]:
+    """Return ranked cert items per scan for the scan ids selected by `scan_filter`."""
+    rows = conn.execute(
+        f"""
+        SELECT sc.scan_id, sc.cert, sc.count, sc.percentage, sc.sources, cs.full_name, cs.org
+        FROM scan_certs sc LEFT JOIN cert_stats cs ON cs.name = sc.cert
+        WHERE sc.scan_id IN ({scan_filter})
+        ORDER BY sc.scan_id, sc.rank
+        """,
+        params,
+    ).fetchall()
+    by_scan: Dict[int, List[Dict]] = {}
+    for row in rows:
+        by_scan.setdefault(row["scan_id"], []).append(
+            {
+                "name": row["cert"],
+                "full_name": row["full_name"] or row["cert"],
+                "org": row["org"] or "",
+                "count": row["count"],
+                "percentage": row["percentage"],
+                "sources": json.loads(row["sources"]),
+            }
         )
+    return by_scan
 
 
+@_timed_db("scan_history")
 def get_scan_history(limit: int = 50) -> List[Dict]:
     """Get recent scan history."""
     conn = _get_db()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM scans ORDER BY timestamp DESC LIMIT ?", (limit,)
-        ).fetchall()
-        return [
-            {
-                "id": row["id"],
-                "timestamp": row["timestamp"],
-                "job_title": row["job_title"],
-                "location": row["location"],
-                "time_range": row["time_range"],
-                "total_jobs": row["total_jobs"],
-                "jobs_with_descriptions": row["jobs_with_descriptions"],
-                "cert_data": json.loads(row["cert_data"]),
-            }
-            for row in rows
-        ]
-    finally:
-        conn.close()
+    recent = "SELECT id FROM scans ORDER BY timestamp DESC LIMIT ?"
+    rows = conn.execute(
+        "SELECT * FROM scans ORDER BY timestamp DESC LIMIT ?", (limit,)
+    ).fetchall()
+    certs = _load_scan_certs(conn, recent, (limit,))
+    return [
+        {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "job_title": row["job_title"],
+            "location": row["location"],
+            "time_range": row["time_range"],
+            "total_jobs": row["total_jobs"],
+            "jobs_with_descriptions": row["jobs_with_descriptions"],
+            "cert_data": certs.get(row["id"], []),
+        }
+        for row in rows
+    ]
 
 
-# ── Job Fetching ─────────────────────────────────────────────────────────────
+# Each scan's trend bucket: one per scan by default (`?1` is NULL); with `?1`
+# points, each role's series is cut into at most that many consecutive runs,
+# matching indices[b * n // size : (b + 1) * n // size] for size = min(n, points).
+_TREND_JOBS = "COALESCE(NULLIF(s.jobs_with_descriptions, 0), s.total_jobs, 0)"
 
+# Downsampled series: each role's scans are split into ``points`` contiguous
+# buckets and SQLite sums jobs and the charted certs' percentages per bucket.
+_TREND_BUCKETS = f"""
+WITH ordered AS (
+    SELECT s.id, s.timestamp, s.job_title, {_TREND_JOBS} AS jobs,
+           ROW_NUMBER() OVER (PARTITION BY s.job_title ORDER BY s.timestamp, s.id) AS pos,
+           COUNT(*) OVER (PARTITION BY s.job_title) AS n
+    FROM scans s
+),
+bucketed AS (
+    SELECT id, timestamp, job_title, jobs, (pos * MIN(n, ?) - 1) / n AS bucket
+    FROM ordered
+),
+totals AS (
+    SELECT job_title, bucket, MAX(timestamp) AS last_timestamp, MAX(id) AS last_id,
+           SUM(jobs) AS jobs, COUNT(*) AS scans
+    FROM bucketed GROUP BY job_title, bucket
+),
+certs AS (
+    SELECT b.job_title, b.bucket, sc.cert, SUM(sc.percentage * b.jobs) AS weighted,
+           SUM(sc.percentage) AS plain
+    FROM bucketed b JOIN scan_certs sc ON sc.scan_id = b.id AND sc.cert IN ({{certs}})
+    GROUP BY b.job_title, b.bucket, sc.cert
+)
+SELECT t.job_title, t.bucket, t.last_timestamp, t.jobs, t.scans, c.cert, c.weighted, c.plain
+FROM totals t LEFT JOIN certs c ON c.job_title = t.job_title AND c.bucket = t.bucket
+ORDER BY t.last_timestamp, t.last_id
+"""
 
-async def fetch_jobs_single(
-    client: httpx.AsyncClient,
-    query: str,
-    location: str = None,
-    date_posted: str = "today",
-) -> List[Dict]:
-    """Fetch job postings for a single query."""
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": "jsearch.p.rapidapi.com",
-    }
-    params = {
-        "query": f"{query} in {location}" if location else query,
-        "page": "1",
-        "num_pages": "10",
-        "date_posted": date_posted,
-    }
-    try:
-        response = await client.get(JSEARCH_API_URL, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json().get("data", [])
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 429:
-            raise HTTPException(
-                status_code=429,
-                detail="RapidAPI quota exhausted. Please wait until your limit resets."
-            )
-        print(f"Query '{query}' failed: {e}")
-        return []
-    except Exception as e:
-        print(f"Query '{query}' failed: {e}")
-        return []
 
+@_timed_db("trend_series")
+def build_trend_series(
+    conn: sqlite3.Connection, cert_names: List[str], points: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Chronological trend rows for the charted certs, optionally downsampled.
 
-async def fetch_jobs_expanded(
-    job_title: str, location: str = None, date_posted: str = "today"
-) -> tuple[List[Dict], List[str]]:
-    """Fetch jobs using expanded queries, dedup, and return (jobs, queries_used)."""
-    if not RAPIDAPI_KEY:
-        raise HTTPException(
-            status_code=401,
-            detail="Missing RapidAPI Key! Please create a .env file in the same folder as InteliJob.exe with your RAPIDAPI_KEY=... to scan."
-        )
+    Unsampled, every scan is one row read through the timestamp index with its
+    charted certs joined on the scan_certs key. With ``points`` set, SQLite does
+    the bucketing and summing, so Python only sees one row per bucket and cert;
+    a multi-scan bucket reports its last date, summed jobs and jobs-weighted
+    percentages, so percentage x jobs totals hold.
+    """
+    placeholders = ", ".join("?" for _ in cert_names) or "NULL"
+    rows: List[Dict[str, Any]] = []
+    if points is None:
+        last_id = None
+        for scan_id, timestamp, job_title, jobs, cert, percentage in conn.execute(
+            f"""
+            SELECT s.id, s.timestamp, s.job_title, {_TREND_JOBS}, sc.cert, sc.percentage
+            FROM scans s
+            LEFT JOIN scan_certs sc ON sc.scan_id = s.id AND sc.cert IN ({placeholders})
+            ORDER BY s.timestamp, s.id
+            """,
+            cert_names,
+        ):
+            if scan_id != last_id:
+                last_id = scan_id
+                rows.append({"date": timestamp[:10], "job_title": job_title, "jobs": jobs})
+            if cert is not None:
+                rows[-1][cert] = percentage
+        return rows
 
-    queries = get_search_queries(job_title)
+    last_key = None
+    for job_title, bucket, last_timestamp, jobs, scans, cert, weighted, plain in conn.execute(
+        _TREND_BUCKETS.format(certs=placeholders), (points, *cert_names)
+    ):
+        if (job_title, bucket) != last_key:
+            last_key = (job_title, bucket)
+            entry: Dict[str, Any] = {"date": last_timestamp[:10], "job_title": job_title}
+            entry["jobs"] = jobs
+            if scans > 1:
+                entry["scans"] = scans
+            rows.append(entry)
+        if cert is None:
+            continue
+        if scans == 1:
+            rows[-1][cert] = plain
+        else:
+            rows[-1][cert] = round(weighted / jobs if jobs > 0 else plain / scans, 1)
+    return rows
 
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Run all queries in parallel
-            tasks = [
-                fetch_jobs_single(client, q, location, date_posted) for q in queries
-            ]
-            results = await asyncio.gather(*tasks)
+
+@_timed_db("cert_series")
+def get_cert_series(
+    conn: sqlite3.Connection, cert: str, limit: int = 200
+) -> List[Dict[str, Any]]:
+    """One cert's latest `limit` scan results, oldest first.
+
+    Walks idx_scan_certs_cert backwards from the newest scan id, so the cost
+    follows `limit`, not the number of scans stored.
+    """
+    rows = conn.execute(
+        """
+        SELECT s.id, s.timestamp, s.job_title, sc.rank, sc.count, sc.percentage
+        FROM scan_certs sc JOIN scans s ON s.id = sc.scan_id
+        WHERE sc.cert = ?
+        ORDER BY sc.scan_id DESC
+        LIMIT ?
+        """,
+        (cert, limit),
+    ).fetchall()
+    return [
+        {
+            "scan_id": row["id"],
+            "date": row["timestamp"][:10],
+            "job_title": row["job_title"],
+            "rank": row["rank"] + 1,
+            "count": row["count"],
+            "percentage": row["percentage"],
+        }
+        for row in reversed(rows)
+    ]
+
+
+# ── Query Cache ──────────────────────────────────────────────────────────────
+# Upstream responses are cached per (query, location, date_posted, page range). Narrow
+# windows change quickly, so they expire sooner than month-wide searches.
+QUERY_CACHE_TTL_SECONDS: Dict[str, int] = {
+    "today": 15 * 60,
+    "3days": 60 * 60,
+    "week": 3 * 60 * 60,
+    "month": 6 * 60 * 60,
+}
+_query_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _query_cache_key(
+    query: str, location: Optional[str], date_posted: str, page: int, num_pages: int
+) -> str:
+    normalized_location = (location or "").strip().lower()
+    return json.dumps(
+        [query.strip().lower(), normalized_location, date_posted, page, num_pages]
+    )
+
+
+@_timed_db("query_cache_get")
+def query_cache_get(cache_key: str) -> Optional[List[Dict]]:
+    """Return a cached, unexpired upstream payload and refresh its LRU position."""
+    if settings.query_cache_max_entries <= 0:
+        return None
+    now = time.time()
+    conn = _get_db()
+    with conn:
+        row = conn.execute(
+            "SELECT payload, expires_at FROM query_cache WHERE cache_key = ?",
+            (cache_key,),
+        ).fetchone()
+        if row is None or row["expires_at"] <= now:
+            if row is not None:
+                conn.execute("DELETE FROM query_cache WHERE cache_key = ?", (cache_key,))
+            _query_cache_stats["misses"] += 1
+            return None
+        conn.execute(
+            "UPDATE query_cache SET last_used = ? WHERE cache_key = ?", (now, cache_key)
+        )
+    _query_cache_stats["hits"] += 1
+    return json.loads(row["payload"])
+
+
+@_timed_db("query_cache_put")
+def query_cache_put(cache_key: str, date_posted: str, jobs: List[Dict]) -> None:
+    """Store an upstream payload, then evict expired rows and least-recently-used
+    ones until both the entry cap and the QUERY_CACHE_MAX_MB budget hold.
+
+    Both caps are checked against the trigger-maintained query_cache_totals row.
+    """
+    if settings.query_cache_max_entries <= 0:
+        return
+    now = time.time()
+    ttl = QUERY_CACHE_TTL_SECONDS.get(date_posted, QUERY_CACHE_TTL_SECONDS["today"])
+    conn = _get_db()
+    with conn:
+        # An upsert keeps the totals triggers exact (see extraction_cache_put).
+        conn.execute(
+            """
+            INSERT INTO query_cache (cache_key, expires_at, last_used, payload) VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                expires_at = excluded.expires_at,
+                last_used = excluded.last_used,
+                payload = excluded.payload
+            """,
+            (cache_key, now + ttl, now, json.dumps(jobs)),
+        )
+        conn.execute("DELETE FROM query_cache WHERE expires_at <= ?", (now,))
+        entries, stored = conn.execute(
+            "SELECT entries, bytes FROM query_cache_totals WHERE id = 1"
+        ).fetchone()
+        excess_entries = entries - settings.query_cache_max_entries
+        excess_bytes = (
+            stored - settings.query_cache_max_mb * 1024 * 1024
+            if settings.query_cache_max_mb > 0
+            else 0
+        )
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        evicted = []
+        cursor = conn.execute(
+            "SELECT cache_key, length(CAST(payload AS BLOB)) FROM query_cache ORDER BY last_used"
+        )
+        for key, size in cursor:
+            evicted.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+        cursor.close()
+        conn.executemany("DELETE FROM query_cache WHERE cache_key = ?", evicted)
+
+
+def get_query_cache_size() -> Dict[str, int]:
+    """Query cache size from the trigger-maintained totals row; O(1) for /health."""
+    row = _get_db().execute(
+        "SELECT entries, bytes FROM query_cache_totals WHERE id = 1"
+    ).fetchone()
+    return {"entries": row["entries"], "bytes": row["bytes"]}
+
+
+# ── Extraction Cache ─────────────────────────────────────────────────────────
+# Per-description extraction results ([cert names or null, description
+# fingerprint, SimHash or null]), keyed by the raw description so a repost under
+# a new job ID is a hit. Names are null for reposts that were fingerprinted but
+# dropped before matching. Rows also record the cert dictionary they were
+# matched against: editing certs.json changes CertIndex.version, so old rows
+# stop matching and get purged.
+# Bump EXTRACTOR_REVISION when cleaning, matching or the stored shape changes.
+EXTRACTOR_REVISION = 4
+_extraction_cache_stats = {"hits": 0, "misses": 0}
+# (database, dictionary version) whose stale rows this process already purged.
+_extraction_cache_purged: Optional[tuple] = None
+_SQL_IN_CHUNK = 500
+
+
+def extraction_cache_key(job: Dict) -> str:
+    description = job.get("job_description", "")
+    return hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _extraction_cache_cutoff(now: float) -> float:
+    max_age_days = settings.extraction_cache_max_age_days
+    return now - max_age_days * 86400 if max_age_days > 0 else float("-inf")
+
+
+@_timed_db("extraction_cache_get")
+def extraction_cache_get(keys: List[str]) -> Dict[str, list]:
+    """Return cached rows for current-dictionary hits and refresh their LRU position."""
+    if settings.extraction_cache_max_entries <= 0 or not keys:
+        return {}
+    now = time.time()
+    cutoff = _extraction_cache_cutoff(now)
+    version = get_cert_index().version
+    found: Dict[str, list] = {}
+    conn = _get_db()
+    with conn:
+        for i in range(0, len(keys), _SQL_IN_CHUNK):
+            chunk = keys[i : i + _SQL_IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT cache_key, certs FROM extraction_cache WHERE cache_key IN ({marks}) AND dict_version = ? AND last_used > ?",
+                (*chunk, version, cutoff),
+            )
+            found.update((row["cache_key"], json.loads(row["certs"])) for row in rows)
+        hits = list(found)
+        for i in range(0, len(hits), _SQL_IN_CHUNK):
+            chunk = hits[i : i + _SQL_IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            conn.execute(
+                f"UPDATE extraction_cache SET last_used = ? WHERE cache_key IN ({marks})",
+                (now, *chunk),
+            )
+    _extraction_cache_stats["hits"] += len(found)
+    _extraction_cache_stats["misses"] += len(keys) - len(found)
+    return found
+
+
+@_timed_db("extraction_cache_put")
+def extraction_cache_put(entries: Dict[str, list]) -> None:
+    """Store per-description rows, then drop stale-dictionary, expired and LRU rows.
+
+    Stale-dictionary rows are purged once per dictionary version; the expiry
+    and LRU deletes go through idx_extraction_cache_last_used, and the size
+    check reads the trigger-maintained extraction_cache_totals row.
+    """
+    global _extraction_cache_purged
+    if settings.extraction_cache_max_entries <= 0 or not entries:
+        return
+    now = time.time()
+    version = get_cert_index().version
+    conn = _get_db()
+    with conn:
+        # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips
+        # the delete trigger and would leave the totals row off by one.
+        conn.executemany(
+            """
+            INSERT INTO extraction_cache (cache_key, dict_version, last_used, certs) VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                dict_version = excluded.dict_version,
+                last_used = excluded.last_used,
+                certs = excluded.certs
+            """,
+            [
+                (key, version, now, json.dumps(row))
+                for key, row in entries.items()
+            ],
+        )
+        if _extraction_cache_purged != (DB_PATH, version):
+            conn.execute(
+                "DELETE FROM extraction_cache WHERE dict_version != ?", (version,)
+            )
+        conn.execute(
+            "DELETE FROM extraction_cache WHERE last_used <= ?",
+            (_extraction_cache_cutoff(now),),
+        )
+        (count,) = conn.execute(
+            "SELECT entries FROM extraction_cache_totals WHERE id = 1"
+        ).fetchone()
+        excess = count - settings.extraction_cache_max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM extraction_cache WHERE cache_key IN (SELECT cache_key FROM extraction_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+    _extraction_cache_purged = (DB_PATH, version)
+
+
+# ── Posting Archive ──────────────────────────────────────────────────────────
+# Opt-in store of the raw postings behind each scan, one zlib-compressed JSON
+# row per posting. Postings are deduplicated by _dedup_job_key and linked to
+# every scan that saw them, so stored scans can be re-analyzed offline.
+_ARCHIVE_READ_BATCH = 200
+
+
+def _archive_postings(
+    conn: sqlite3.Connection,
+    scan_id: int,
+    timestamp: str,
+    jobs: List[Dict],
+    kept: Optional[List[Dict]] = None,
+) -> None:
+    """Store not-yet-archived postings and link all of them to the scan,
+    flagging the `kept` ones (default: all)."""
+    by_key: Dict[str, Dict] = {}
+    for job in jobs:
+        by_key.setdefault(_dedup_job_key(job), job)
+    keys = list(by_key)
+    kept_keys = None if kept is None else {_dedup_job_key(job) for job in kept}
+
+    existing = set()
+    for i in range(0, len(keys), _SQL_IN_CHUNK):
+        chunk = keys[i : i + _SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        conn.execute(
+            f"UPDATE postings SET last_seen = ? WHERE job_key IN ({marks})",
+            (timestamp, *chunk),
+        )
+        existing.update(
+            row["job_key"]
+            for row in conn.execute(
+                f"SELECT job_key FROM postings WHERE job_key IN ({marks})", chunk
+            )
+        )
+
+    rows = []
+    for key in keys:
+        if key in existing:
+            continue
+        payload = zlib.compress(json.dumps(by_key[key]).encode("utf-8"))
+        rows.append((key, timestamp, timestamp, len(payload), payload))
+    conn.executemany(
+        "INSERT INTO postings (job_key, first_seen, last_seen, size, payload) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO scan_postings (scan_id, job_key, kept) VALUES (?, ?, ?)",
+        [(scan_id, key, kept_keys is None or key in kept_keys) for key in keys],
+    )
+    _apply_archive_retention(conn)
+
+
+def _apply_archive_retention(conn: sqlite3.Connection) -> None:
+    """Drop postings not seen within the retention window, then the oldest
+    ones until the compressed total fits the size budget.
+
+    Both steps read postings through idx_postings_last_seen and only touch
+    the evicted keys and the scans that linked them (see _evict_postings).
+    """
+    if settings.posting_archive_retention_days > 0:
+        cutoff = (
+            datetime.now(timezone.utc)
+            - timedelta(days=settings.posting_archive_retention_days)
+        ).isoformat()
+        expired = conn.execute(
+            "SELECT job_key FROM postings WHERE last_seen < ?", (cutoff,)
+        ).fetchall()
+        _evict_postings(conn, [row[0] for row in expired])
+
+    if settings.posting_archive_max_mb > 0:
+        budget = settings.posting_archive_max_mb * 1024 * 1024
+        (excess,) = conn.execute(
+            "SELECT bytes - ? FROM archive_totals WHERE id = 1", (budget,)
+        ).fetchone()
+        oldest: List[str] = []
+        if excess > 0:
+            cursor = conn.execute("SELECT job_key, size FROM postings ORDER BY last_seen")
+            for key, size in cursor:
+                oldest.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            cursor.close()
+        _evict_postings(conn, oldest)
+
+
+def _evict_postings(conn: sqlite3.Connection, keys: List[str]) -> None:
+    """Delete postings and unlink every scan that saw one of them.
+
+    A scan's archive is kept whole or not at all: a scan that lost any posting
+    is unlinked entirely (it keeps its saved ranks but is no longer
+    re-analyzed).
+    """
+    scan_ids = set()
+    for i in range(0, len(keys), _SQL_IN_CHUNK):
+        chunk = keys[i : i + _SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        scan_ids.update(
+            row[0]
+            for row in conn.execute(
+                f"SELECT DISTINCT scan_id FROM scan_postings WHERE job_key IN ({marks})",
+                chunk,
+            )
+        )
+        conn.execute(f"DELETE FROM postings WHERE job_key IN ({marks})", chunk)
+    _unlink_archived_scans(conn, sorted(scan_ids))
+
+
+def _unlink_archived_scans(conn: sqlite3.Connection, scan_ids: List[int]) -> None:
+    """Drop the scans' posting links, then the postings no other scan links to."""
+    candidates = set()
+    for i in range(0, len(scan_ids), _SQL_IN_CHUNK):
+        chunk = scan_ids[i : i + _SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        candidates.update(
+            row[0]
+            for row in conn.execute(
+                f"SELECT job_key FROM scan_postings WHERE scan_id IN ({marks})", chunk
+            )
+        )
+        conn.execute(f"DELETE FROM scan_postings WHERE scan_id IN ({marks})", chunk)
+    conn.executemany(
+        """
+        DELETE FROM postings WHERE job_key = ?
+        AND NOT EXISTS (SELECT 1 FROM scan_postings sp WHERE sp.job_key = postings.job_key)
+        """,
+        [(key,) for key in candidates],
+    )
+
+
+def iter_archived_postings(
+    scan_id: Optional[int] = None, kept_only: bool = False
+) -> Iterator[Dict]:
+    """Yield archived postings (for one scan, or all of them) in job-key order.
+
+    For one scan, `kept_only` limits it to the postings its ranks came from.
+
+    Reads in small keyset-paginated batches, so memory stays flat however large
+    the archive is and no cursor is held open between batches.
+    """
+    last_key = ""
+    while True:
+        conn = _get_db()
+        if scan_id is None:
+            rows = conn.execute(
+                "SELECT job_key, payload FROM postings WHERE job_key > ? ORDER BY job_key LIMIT ?",
+                (last_key, _ARCHIVE_READ_BATCH),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """
+                SELECT p.job_key, p.payload FROM scan_postings sp
+                JOIN postings p ON p.job_key = sp.job_key
+                WHERE sp.scan_id = ? AND sp.job_key > ? AND sp.kept >= ?
+                ORDER BY sp.job_key LIMIT ?
+                """,
+                (scan_id, last_key, int(kept_only), _ARCHIVE_READ_BATCH),
+            ).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            yield json.loads(zlib.decompress(row["payload"]))
+        last_key = rows[-1]["job_key"]
+
+
+def get_archive_stats() -> Dict[str, int]:
+    """Archive size from the trigger-maintained totals row; O(1) for /health."""
+    row = _get_db().execute(
+        "SELECT postings, bytes FROM archive_totals WHERE id = 1"
+    ).fetchone()
+    return {"postings": row["postings"], "compressed_bytes": row["bytes"]}
+
+
+# ── Request Coalescing ───────────────────────────────────────────────────────
+class SingleFlight:
+    """Share one in-flight computation among concurrent callers with the same key.
+
+    The shared task is shielded, so a caller that disconnects doesn't cancel
+    the work the other callers are waiting on.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self.joined = 0
+
+    async def run(self, key: Any, factory: Callable[[], Any]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.joined += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Any, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so unawaited failures don't warn
+
+
+class _Channel:
+    """Events published by one shared producer, plus a wake-up for readers."""
+
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+        self.done = False
+        self.producer: Optional[asyncio.Future] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Any) -> None:
+        self.events.append(event)
+        self._wake()
+
+    def close(self) -> None:
+        self.done = True
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlightStream:
+    """SingleFlight for async generators: one producer, every event fanned out.
+
+    A subscriber that joins late first replays the events published so far,
+    then follows live. The producer runs as its own task, so a subscriber that
+    disconnects doesn't cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Any, _Channel] = {}
+        self.joined = 0
+
+    async def subscribe(
+        self, key: Any, factory: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        channel = self._inflight.get(key)
+        if channel is None:
+            channel = self._inflight[key] = _Channel()
+            channel.producer = asyncio.ensure_future(
+                self._produce(key, channel, factory())
+            )
+        else:
+            self.joined += 1
+        seen = 0
+        while True:
+            while seen < len(channel.events):
+                seen += 1
+                yield channel.events[seen - 1]
+            if channel.done:
+                return
+            await channel.wait()
+
+    async def _produce(
+        self, key: Any, channel: _Channel, events: AsyncIterator[Any]
+    ) -> None:
+        try:
+            async for event in events:
+                channel.publish(event)
+        finally:
+            if self._inflight.get(key) is channel:
+                del self._inflight[key]
+            channel.close()
+
+
+# One keyspace for every scan entry point (/analyze-jobs, its stream and saved
+# searches), so an identical scheduled scan and user stream share one run.
+_scan_flights = SingleFlightStream()
+_query_flights = SingleFlight()
+
+
+# ── Upstream Rate Limiting ───────────────────────────────────────────────────
+# Every JSearch call waits for a scheduler slot: a token bucket caps the request
+# rate, a semaphore-style counter caps concurrency, and waiters are served by
+# priority then arrival. A 429 pauses the whole bucket, so a burst of scans
+# slows down instead of failing.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+# Set by background callers (e.g. scheduled scans) for the calls they trigger.
+jsearch_priority: ContextVar[int] = ContextVar(
+    "jsearch_priority", default=PRIORITY_INTERACTIVE
+)
+# When set, every upstream attempt made in this context bumps counter["calls"].
+jsearch_call_counter: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "jsearch_call_counter", default=None
+)
+# Set per query by fetch_query: successful upstream responses add the pages
+# they returned to counter["pages"]. Cache hits and joined flights add nothing.
+jsearch_page_counter: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "jsearch_page_counter", default=None
+)
+
+
+class JSearchScheduler:
+    """Token bucket + concurrency cap + priority queue, bound to one event loop."""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.loop = asyncio.get_running_loop()
+        self._tokens = float(self.burst)
+        self._refilled_at = self.loop.time()
+        self._paused_until = 0.0
+        self._active = 0
+        self._waiters: List[tuple] = []
+        self._seq = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"granted": 0, "retries": 0, "throttled": 0}
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        future = self.loop.create_future()
+        self._seq += 1
+        heapq.heappush(self._waiters, (priority, self._seq, future))
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just as we were cancelled
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._pump()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every waiter for `seconds` (Retry-After / 429 backoff)."""
+        self.stats["throttled"] += 1
+        self._paused_until = max(self._paused_until, self.loop.time() + seconds)
+        self._pump()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._refilled_at = now
+
+    def _pump(self) -> None:
+        now = self.loop.time()
+        limited = self.rate > 0  # rate <= 0: unlimited, only concurrency applies
+        if limited:
+            self._refill(now)
+        while self._waiters and self._active < self.max_concurrency:
+            if self._waiters[0][2].done():  # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._paused_until - now
+            if limited and self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.rate)
+            if wait > 0:
+                self._schedule(wait)
+                return
+            _priority, _seq, future = heapq.heappop(self._waiters)
+            if limited:
+                self._tokens -= 1
+            self._active += 1
+            self.stats["granted"] += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self.loop.call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queued": sum(1 for w in self._waiters if not w[2].done()),
+            "active": self._active,
+            **self.stats,
+        }
+
+
+_jsearch_scheduler: Optional[JSearchScheduler] = None
+
+
+def get_jsearch_scheduler() -> JSearchScheduler:
+    """Return the scheduler for the running event loop, creating it on first use."""
+    global _jsearch_scheduler
+    loop = asyncio.get_running_loop()
+    if _jsearch_scheduler is None or _jsearch_scheduler.loop is not loop:
+        _jsearch_scheduler = JSearchScheduler(
+            settings.jsearch_rate_per_second,
+            settings.jsearch_burst,
+            settings.jsearch_max_concurrency,
+        )
+    return _jsearch_scheduler
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def jsearch_get(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    params: Dict[str, str],
+) -> httpx.Response:
+    """GET JSearch through the scheduler, retrying 429/5xx and transport errors.
+
+    Backoff is exponential with full jitter unless the response carries
+    Retry-After. A wait longer than JSEARCH_MAX_RETRY_WAIT (e.g. a monthly quota
+    reset) is not retried; the last response or error is returned/raised.
+    """
+    scheduler = get_jsearch_scheduler()
+    priority = jsearch_priority.get()
+    counter = jsearch_call_counter.get()
+    attempt = 0
+    while True:
+        retry_after = None
+        queued = time.perf_counter()
+        try:
+            async with scheduler.slot(priority):
+                started = time.perf_counter()
+                UPSTREAM_QUEUE_SECONDS.observe(started - queued)
+                if counter is not None:
+                    counter["calls"] += 1
+                try:
+                    response = await client.get(
+                        JSEARCH_API_URL, headers=headers, params=params
+                    )
+                except httpx.TransportError:
+                    UPSTREAM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - started, outcome="transport_error"
+                    )
+                    raise
+                UPSTREAM_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started, outcome=str(response.status_code)
+                )
+        except httpx.TransportError:
+            UPSTREAM_ERRORS.inc(reason="transport")
+            if attempt >= settings.jsearch_max_retries:
+                raise
+            response = None
+        else:
+            if response.status_code == 429:
+                UPSTREAM_RATE_LIMITED.inc()
+            elif response.status_code >= 400:
+                UPSTREAM_ERRORS.inc(reason=f"http_{response.status_code // 100}xx")
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            retry_after = _retry_after_seconds(response)
+            if attempt >= settings.jsearch_max_retries or (
+                retry_after is not None
+                and retry_after > settings.jsearch_max_retry_wait
+            ):
+                return response
+
+        if retry_after is None:
+            backoff = settings.jsearch_retry_base_seconds * 2**attempt
+            retry_after = random.uniform(0, backoff)
+        attempt += 1
+        scheduler.stats["retries"] += 1
+        if response is not None and response.status_code == 429:
+            # Quota pressure applies to every caller, not just this request.
+            scheduler.pause(retry_after)
+        else:
+            await asyncio.sleep(retry_after)
+
+
+# ── Job Fetching ─────────────────────────────────────────────────────────────
+
+
+async def fetch_jobs_single(
+    client: httpx.AsyncClient,
+    query: str,
+    location: str = None,
+    date_posted: str = "today",
+    page: int = 1,
+    num_pages: Optional[int] = None,
+) -> List[Dict]:
+    """Fetch job postings for a single query (one scheduled upstream call)."""
+    num_pages = num_pages or settings.jsearch_max_pages
+    headers = {
+        "X-RapidAPI-Key": RAPIDAPI_KEY,
+        "X-RapidAPI-Host": "jsearch.p.rapidapi.com",
+    }
+    params = {
+        "query": f"{query} in {location}" if location else query,
+        "page": str(page),
+        "num_pages": str(num_pages),
+        "date_posted": date_posted,
+    }
+    cache_key = _query_cache_key(query, location, date_posted, page, num_pages)
+    cached = query_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Identical concurrent calls (e.g. two scans sharing a family query) share
+    # one upstream request.
+    jobs = await _query_flights.run(
+        cache_key,
+        lambda: _fetch_uncached(client, query, headers, params, cache_key, date_posted),
+    )
+    return list(jobs)
+
+
+async def _fetch_uncached(
+    client: httpx.AsyncClient,
+    query: str,
+    headers: Dict[str, str],
+    params: Dict[str, str],
+    cache_key: str,
+    date_posted: str,
+) -> List[Dict]:
+    try:
+        response = await jsearch_get(client, headers, params)
+        response.raise_for_status()
+        jobs = response.json().get("data", [])
+        POSTINGS_FETCHED.inc(len(jobs))
+        pages = jsearch_page_counter.get()
+        if pages is not None:
+            pages["pages"] += _estimated_pages(len(jobs), int(params["num_pages"]))
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 429:
+            raise HTTPException(
+                status_code=429,
+                detail="RapidAPI quota exhausted. Please wait until your limit resets."
+            )
+        print(f"Query '{query}' failed: {e}")
+        return []
+    except Exception as e:
+        print(f"Query '{query}' failed: {e}")
+        return []
+
+    query_cache_put(cache_key, date_posted, jobs)
+    return jobs
+
+
+JSEARCH_PAGE_SIZE = 10
+
+
+def _estimated_pages(results: int, num_pages: int) -> int:
+    """Pages behind one response. JSearch doesn't report how many pages a
+    multi-page call actually read, so for num_pages > 1 this is an estimate
+    from the result count (it stops early once results run out)."""
+    if num_pages == 1:
+        return 1
+    return min(num_pages, max(1, -(-results // JSEARCH_PAGE_SIZE)))
+
+
+async def fetch_query(
+    client: httpx.AsyncClient,
+    query: str,
+    location: str = None,
+    date_posted: str = "today",
+) -> tuple[List[Dict], int]:
+    """Fetch all pages for one query and return (jobs, upstream pages fetched).
+
+    Only pages read from JSearch by this call count: query-cache hits and
+    calls joined to another caller's flight report 0. In page-parallel mode
+    each page is one call, so the count is exact. The default single
+    multi-page call gives an estimate (see _estimated_pages).
+
+    In page-parallel mode pages are requested in waves of
+    JSEARCH_PAGE_CONCURRENCY. No further wave starts once a page comes back
+    short or mostly made of postings already seen for this query.
+    """
+    counter = {"pages": 0}
+    token = jsearch_page_counter.set(counter)
+    try:
+        jobs = await _fetch_query_pages(client, query, location, date_posted)
+    finally:
+        jsearch_page_counter.reset(token)
+    return jobs, counter["pages"]
+
+
+async def _fetch_query_pages(
+    client: httpx.AsyncClient,
+    query: str,
+    location: Optional[str],
+    date_posted: str,
+) -> List[Dict]:
+    max_pages = settings.jsearch_max_pages
+    if not settings.jsearch_page_parallel:
+        return await fetch_jobs_single(client, query, location, date_posted)
+
+    seen_ids = set()
+    jobs: List[Dict] = []
+    step = max(1, settings.jsearch_page_concurrency)
+    for first in range(1, max_pages + 1, step):
+        wave = range(first, min(first + step, max_pages + 1))
+        batches = await asyncio.gather(
+            *(
+                fetch_jobs_single(
+                    client, query, location, date_posted, page=page, num_pages=1
+                )
+                for page in wave
+            )
+        )
+        exhausted = False
+        for batch in batches:
+            fresh = []
+            for job in batch:
+                key = _dedup_job_key(job)
+                if key not in seen_ids:
+                    seen_ids.add(key)
+                    fresh.append(job)
+            jobs.extend(fresh)
+            POSTINGS_DEDUPED.inc(len(batch) - len(fresh), reason="job_id")
+
+            short = len(batch) < JSEARCH_PAGE_SIZE
+            duplicate_ratio = 1 - len(fresh) / len(batch) if batch else 1.0
+            if short or duplicate_ratio >= settings.jsearch_duplicate_stop_ratio:
+                exhausted = True
+        if exhausted:
+            break
+
+    return jobs
+
+
+def _require_rapidapi_key() -> None:
+    if not RAPIDAPI_KEY:
+        raise HTTPException(
+            status_code=401,
+            detail="Missing RapidAPI Key! Please create a .env file in the same folder as InteliJob.exe with your RAPIDAPI_KEY=... to scan."
+        )
+
+
+async def fetch_jobs_expanded(
+    job_title: str, location: str = None, date_posted: str = "today"
+) -> tuple[List[Dict], List[str], Dict[str, int]]:
+    """Fetch jobs using expanded queries, dedup, and return (jobs, queries_used, pages_fetched)."""
+    _require_rapidapi_key()
+
+    queries = get_search_queries(job_title)
+
+    try:
+        client = get_http_client()
+        # Queries run concurrently; the JSearch scheduler paces the actual calls.
+        tasks = [fetch_query(client, q, location, date_posted) for q in queries]
+        results = await asyncio.gather(*tasks)
+        pages_fetched = {q: pages for q, (_batch, pages) in zip(queries, results)}
 
         # Merge and deduplicate by stable identity while preserving distinct postings.
         seen_ids = set()
         all_jobs = []
-        for batch in results:
+        for batch, _pages in results:
             for job in batch:
                 key = _dedup_job_key(job)
                 if key not in seen_ids:
                     seen_ids.add(key)
                     all_jobs.append(job)
+        POSTINGS_DEDUPED.inc(
+            sum(len(batch) for batch, _pages in results) - len(all_jobs),
+            reason="job_id",
+        )
+
+        return all_jobs, queries, pages_fetched
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching jobs: {e}")
+
+
+# ── Cert Extraction ──────────────────────────────────────────────────────────
+
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+
+def clean_text(text: str, lower: bool = False) -> str:
+    """Strip tags, decode entities (&amp;, &nbsp;, &#43;...) and collapse whitespace.
+
+    With lower=True the text is lowercased up front, which is cheaper on the
+    raw string and hands the cert matcher exactly what it scans.
+    """
+    if not text:
+        return ""
+    if lower:
+        text = text.lower()
+    if "<" in text:
+        text = _HTML_TAG.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return " ".join(text.split())
+
+
+def match_cert_names(text: str, lowered: bool = False) -> List[str]:
+    """Canonical cert names mentioned in cleaned text, in dictionary order."""
+    index = get_cert_index()
+    if index.pattern is None:
+        return []
+
+    found = set()
+    term_hits = index.term_hits
+    for match in index.pattern.finditer(text if lowered else text.lower()):
+        found.update(term_hits[_normalize_term(match.group(1))])
+    return sorted(found, key=index.order.__getitem__)
+
+
+def cert_mentions(
+    names: List[str],
+    job_title: str,
+    company: str = "Unknown",
+    job_url: str = None,
+    job_key: Optional[str] = None,
+) -> List[Dict]:
+    """Expand canonical cert names into the per-posting mentions used for ranking."""
+    certs = []
+    dictionary = get_cert_index().dictionary
+    for canonical in names:
+        info = dictionary.get(canonical, {})
+        certs.append(
+            {
+                "name": canonical,
+                "full_name": info.get("full_name", canonical),
+                "org": info.get("org", ""),
+                "source_job": f"{job_title} at {company}",
+                "company": company,
+                "job_url": job_url,
+                "job_key": job_key or job_url or f"{job_title} at {company}",
+            }
+        )
+    return certs
+
+
+def extract_certs(
+    text: str,
+    job_title: str,
+    company: str = "Unknown",
+    job_url: str = None,
+    job_key: Optional[str] = None,
+) -> List[Dict]:
+    """Extract certifications using dictionary lookup."""
+    return cert_mentions(match_cert_names(text), job_title, company, job_url, job_key)
+
+
+def _posting_identity(job: Dict) -> tuple[str, str, Optional[str], str]:
+    """(title, company, url, job_key) as reported on each cert mention."""
+    title = job.get("job_title", "Job Posting")
+    company = job.get("company_name", job.get("employer_name", "Unknown"))
+    url = job.get("job_apply_link", job.get("job_url"))
+    job_key = str(job.get("job_id") or url or f"{title}-{company}")
+    return title, company, url, job_key
+
+
+# ── Duplicate Descriptions ───────────────────────────────────────────────────
+# Aggregators repost the same description under new IDs, which _dedup_job_key
+# can't see. Postings are fingerprinted on their cleaned, lowercased text; with
+# near-duplicate detection on, a 64-bit SimHash over word 3-shingles also
+# catches reposts with small edits. Fingerprints come from ExtractionBatch, which
+# caches them and hands the cleaned text on to the cert matcher, so reposts are
+# dropped before matching and no description is cleaned twice.
+# Byte value -> its 8 bits spread into 16-bit lanes, so per-bit counts can be
+# accumulated with big-integer additions instead of a 64-step loop per shingle.
+_SIMHASH_SPREAD = [
+    sum(((byte >> bit) & 1) << (16 * bit) for bit in range(8)) for byte in range(256)
+]
+
+
+def description_fingerprint(normalized: str) -> str:
+    """Stable content hash of normalized (cleaned, lowercased) description text."""
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def simhash(normalized: str) -> int:
+    """64-bit SimHash of a text's word 3-shingles."""
+    words = normalized.split()
+    shingles = {" ".join(words[i : i + 3]) for i in range(max(1, len(words) - 2))}
+    lanes = [0] * 8
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for i, byte in enumerate(digest):
+            lanes[i] += _SIMHASH_SPREAD[byte]
+
+    half = len(shingles) / 2
+    fingerprint = 0
+    for i, lane in enumerate(lanes):
+        for bit in range(8):
+            if (lane >> (16 * bit)) & 0xFFFF > half:
+                fingerprint |= 1 << (8 * i + bit)
+    return fingerprint
+
+
+class DescriptionIndex:
+    """Descriptions seen so far in one scan, used to skip reposts.
+
+    Near-duplicates are found with a banded index: splitting the 64 bits into
+    max_distance + 1 bands guarantees two fingerprints within max_distance bits
+    share at least one band exactly, so only those candidates are compared.
+    """
+
+    def __init__(self, max_distance: int = 0):
+        self.max_distance = max_distance
+        self.duplicates = 0
+        self._fingerprints: set = set()
+        bands = max_distance + 1
+        width = 64 // bands
+        self._bands = [
+            (i * width, 64 if i == bands - 1 else (i + 1) * width) for i in range(bands)
+        ]
+        self._band_index: Dict[tuple, List[int]] = {}
+
+    @property
+    def needs_simhash(self) -> bool:
+        return self.max_distance > 0
+
+    def add_fingerprint(self, fingerprint: str, sim: Optional[int]) -> bool:
+        """Record a description; returns False if it repeats an earlier one."""
+        if fingerprint in self._fingerprints:
+            self.duplicates += 1
+            return False
+
+        if self.needs_simhash:
+            keys = [
+                (start, (sim >> start) & ((1 << (end - start)) - 1))
+                for start, end in self._bands
+            ]
+            for key in keys:
+                for other in self._band_index.get(key, ()):
+                    if bin(sim ^ other).count("1") <= self.max_distance:
+                        self.duplicates += 1
+                        return False
+            for key in keys:
+                self._band_index.setdefault(key, []).append(sim)
+
+        self._fingerprints.add(fingerprint)
+        return True
+
+
+def new_description_index() -> Optional[DescriptionIndex]:
+    if not settings.description_dedup:
+        return None
+    return DescriptionIndex(settings.near_duplicate_distance)
+
+
+# ── Ranking ──────────────────────────────────────────────────────────────────
+
+
+def rank_certs(items: List[Dict], total_jobs: int, top_n: int = 15) -> List[Dict]:
+    """Rank certs by % of jobs mentioning them."""
+    if not items:
+        return []
+
+    groups: Dict[str, Dict] = {}
+    for item in items:
+        name = item["name"]
+        if name not in groups:
+            groups[name] = {
+                "name": name,
+                "full_name": item.get("full_name", name),
+                "org": item.get("org", ""),
+                "jobs": set(),
+                "sources": [],
+            }
+        groups[name]["jobs"].add(item.get("job_key", item["source_job"]))
+        groups[name]["sources"].append(
+            {
+                "job": item["source_job"],
+                "company": item["company"],
+                "job_url": item.get("job_url"),
+            }
+        )
+
+    sorted_groups = sorted(groups.values(), key=lambda x: len(x["jobs"]), reverse=True)
+    if top_n:
+        sorted_groups = sorted_groups[:top_n]
+
+    ranked = []
+    for g in sorted_groups:
+        seen = set()
+        unique_sources = []
+        for s in g["sources"]:
+            key = s.get("job_url") or f"{s['job']}-{s['company']}"
+            if key not in seen:
+                unique_sources.append(s)
+                seen.add(key)
+
+        job_count = len(g["jobs"])
+        ranked.append(
+            {
+                "name": g["name"],
+                "full_name": g["full_name"],
+                "org": g["org"],
+                "count": job_count,
+                "percentage": round((job_count / total_jobs) * 100, 1)
+                if total_jobs > 0
+                else 0,
+                "sources": unique_sources[:5],
+            }
+        )
+
+    return ranked
+
+
+# ── Insights ─────────────────────────────────────────────────────────────────
+
+
+def compute_title_distribution(jobs: List[Dict]) -> List[Dict]:
+    """Count job title variations in results (case/spacing normalized)."""
+    titles = Counter()
+    canonical_display: Dict[str, str] = {}
+
+    for job in jobs:
+        raw = str(job.get("job_title") or "Unknown")
+        cleaned = raw.strip() or "Unknown"
+        norm = re.sub(r"\s+", " ", cleaned).lower()
+
+        if norm not in canonical_display:
+            canonical_display[norm] = re.sub(r"\s+", " ", cleaned)
+        titles[norm] += 1
+
+    total = sum(titles.values())
+    dist = []
+    for norm, count in titles.most_common(8):
+        dist.append(
+            {
+                "title": canonical_display.get(norm, norm),
+                "count": count,
+                "percentage": round((count / total) * 100, 1) if total > 0 else 0,
+            }
+        )
+    return dist
+
+
+def compute_cert_pairs(
+    all_certs_per_job: List[List[str]], total_jobs: int
+) -> List[Dict]:
+    """Find the most common cert pairs across jobs."""
+    pair_counter = Counter()
+    for job_certs in all_certs_per_job:
+        unique = sorted(set(job_certs))
+        for i in range(len(unique)):
+            for j in range(i + 1, len(unique)):
+                pair_counter[(unique[i], unique[j])] += 1
+
+    pairs = []
+    for (a, b), count in pair_counter.most_common(5):
+        if count >= 2:  # Only show pairs that appear in 2+ jobs
+            pairs.append(
+                {
+                    "certs": [a, b],
+                    "count": count,
+                    "percentage": round((count / total_jobs) * 100, 1)
+                    if total_jobs > 0
+                    else 0,
+                }
+            )
+    return pairs
+
+
+# ── Re-analysis ──────────────────────────────────────────────────────────────
+# Re-ranks archived scans against the current cert dictionary. Results are
+# staged scan by scan, with progress persisted, so an interrupted run resumes
+# where it stopped; scan_certs and cert_stats are replaced in one transaction
+# once every archived scan is done.
+REANALYSIS_CHUNK_SCANS = 8
+_reanalysis_task: Optional[asyncio.Task] = None
+
+
+def get_reanalysis_status() -> Optional[Dict[str, Any]]:
+    row = _get_db().execute("SELECT * FROM reanalysis WHERE id = 1").fetchone()
+    if row is None:
+        return None
+    return {
+        **dict(row),
+        "active": _reanalysis_task is not None and not _reanalysis_task.done(),
+        "current_dict_version": get_cert_index().version,
+    }
+
+
+def begin_reanalysis() -> Dict[str, Any]:
+    """Resume an unfinished run for the current dictionary, or start a fresh one."""
+    conn = _get_db()
+    with conn:
+        state = conn.execute("SELECT * FROM reanalysis WHERE id = 1").fetchone()
+        if (
+            state is not None
+            and state["status"] in ("running", "interrupted")
+            and state["dict_version"] == get_cert_index().version
+        ):
+            conn.execute("UPDATE reanalysis SET status = 'running' WHERE id = 1")
+        else:
+            (total,) = conn.execute(
+                "SELECT COUNT(DISTINCT scan_id) FROM scan_postings"
+            ).fetchone()
+            conn.execute("DELETE FROM scan_certs_staging")
+            conn.execute(
+                "INSERT OR REPLACE INTO reanalysis (id, dict_version, status, total, done, last_scan_id, started_at) VALUES (1, ?, 'running', ?, 0, 0, ?)",
+                (
+                    get_cert_index().version,
+                    total,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+    return get_reanalysis_status()
+
+
+async def reanalyze_scan(scan_id: int) -> List[Dict]:
+    """Rank one scan's kept archived postings with the current dictionary."""
+    jobs = list(iter_archived_postings(scan_id, kept_only=True))
+    all_certs, _, jobs_with_desc = await analyze_postings_async(jobs)
+    return rank_certs(all_certs, _ranking_base(jobs, jobs_with_desc), 15)
+
+
+def _swap_reanalysis(conn: sqlite3.Connection, last_scan_id: int) -> None:
+    """Replace the ranks of every re-analyzed scan and rebuild cert_stats."""
+    conn.execute(
+        "DELETE FROM scan_certs WHERE scan_id IN (SELECT DISTINCT scan_id FROM scan_postings WHERE scan_id <= ?)",
+        (last_scan_id,),
+    )
+    # Same scan set as the delete above: a scan whose archive was evicted
+    # mid-run keeps its original ranks rather than mixing in staged ones.
+    conn.execute(
+        "INSERT OR REPLACE INTO scan_certs SELECT * FROM scan_certs_staging WHERE scan_id IN (SELECT DISTINCT scan_id FROM scan_postings WHERE scan_id <= ?) AND scan_id IN (SELECT id FROM scans)",
+        (last_scan_id,),
+    )
+    conn.execute("DELETE FROM scan_certs_staging")
+
+    ranks = _load_scan_certs(conn, "SELECT id FROM scans", ())
+    dictionary = get_cert_index().dictionary
+    conn.execute("DELETE FROM cert_stats")
+    for scan in conn.execute("SELECT id, timestamp FROM scans ORDER BY timestamp, id"):
+        items = []
+        for cert in ranks.get(scan["id"], []):
+            info = dictionary.get(cert["name"], {})
+            items.append(
+                {
+                    **cert,
+                    "full_name": info.get("full_name", cert["full_name"]),
+                    "org": info.get("org", cert["org"]),
+                }
+            )
+        _add_cert_stats(conn, scan["timestamp"], items)
+
+
+async def run_reanalysis(
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Process a begun re-analysis to completion and return its final state.
+
+    Failures are recorded in the state rather than raised; cancellation marks
+    the run interrupted so the next begin_reanalysis() resumes it.
+    """
+    conn = _get_db()
+    state = get_reanalysis_status()
+    try:
+        while True:
+            scan_ids = [
+                row["scan_id"]
+                for row in conn.execute(
+                    "SELECT DISTINCT scan_id FROM scan_postings WHERE scan_id > ? ORDER BY scan_id LIMIT ?",
+                    (state["last_scan_id"], REANALYSIS_CHUNK_SCANS),
+                )
+            ]
+            if not scan_ids:
+                break
+            ranked = await asyncio.gather(*(reanalyze_scan(i) for i in scan_ids))
+            with conn:
+                for scan_id, items in zip(scan_ids, ranked):
+                    _insert_scan_certs(conn, scan_id, items, table="scan_certs_staging")
+                conn.execute(
+                    "UPDATE reanalysis SET done = done + ?, total = MAX(total, done + ?), last_scan_id = ? WHERE id = 1",
+                    (len(scan_ids), len(scan_ids), scan_ids[-1]),
+                )
+            state = get_reanalysis_status()
+            if progress:
+                progress(state)
+
+        with conn:
+            _swap_reanalysis(conn, state["last_scan_id"])
+            conn.execute(
+                "UPDATE reanalysis SET status = 'done', finished_at = ? WHERE id = 1",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+    except asyncio.CancelledError:
+        with conn:
+            conn.execute("UPDATE reanalysis SET status = 'interrupted' WHERE id = 1")
+        raise
+    except Exception as e:
+        print(f"Re-analysis failed: {e}")
+        with conn:
+            conn.execute(
+                "UPDATE reanalysis SET status = 'failed', error = ? WHERE id = 1",
+                (str(e),),
+            )
+    return get_reanalysis_status()
+
+
+async def cancel_reanalysis() -> None:
+    global _reanalysis_task
+    if _reanalysis_task is not None:
+        _reanalysis_task.cancel()
+        try:
+            await _reanalysis_task
+        except asyncio.CancelledError:
+            pass
+        _reanalysis_task = None
+
+
+# ── Saved Searches ───────────────────────────────────────────────────────────
+# Recurring scans stored in SQLite and started by an in-process loop. Runs go
+# through the same single-flight run_scan path as /analyze-jobs, at background
+# priority, under a global concurrency cap and a daily upstream-call budget.
+# Start times are jittered so several searches don't hit RapidAPI at once.
+SAVED_SEARCH_RUNS_KEPT = 100
+_scan_scheduler_task: Optional[asyncio.Task] = None
+_saved_search_tasks: set = set()
+_running_searches: set = set()
+_run_slots: Optional[asyncio.Semaphore] = None
+_run_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_run_slots() -> asyncio.Semaphore:
+    global _run_slots, _run_slots_loop
+    loop = asyncio.get_running_loop()
+    if _run_slots is None or _run_slots_loop is not loop:
+        slots = max(1, settings.scheduler_max_concurrent_runs)
+        _run_slots = asyncio.Semaphore(slots)
+        _run_slots_loop = loop
+    return _run_slots
+
+
+def next_saved_search_run(search: Dict[str, Any], after: datetime) -> datetime:
+    """Next start time after `after`: the next local HH:MM for daily searches,
+    otherwise one interval later, plus up to SCHEDULER_JITTER_SECONDS."""
+    if search["daily_at"]:
+        hour, minute = map(int, search["daily_at"].split(":"))
+        local = after.astimezone()
+        start = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if start <= local:
+            start += timedelta(days=1)
+        start = start.astimezone(timezone.utc)
+    else:
+        start = after + timedelta(minutes=search["interval_minutes"])
+    jitter = random.uniform(0, max(0, settings.scheduler_jitter_seconds))
+    return start + timedelta(seconds=jitter)
+
+
+def _saved_search_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    search = dict(row)
+    search["enabled"] = bool(search["enabled"])
+    search["running"] = search["id"] in _running_searches
+    return search
+
+
+def create_saved_search(request: SavedSearchRequest) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    search = request.model_dump()
+    if search["daily_at"]:
+        first_run = next_saved_search_run(search, now)
+    else:
+        jitter = random.uniform(0, max(0, settings.scheduler_jitter_seconds))
+        first_run = now + timedelta(seconds=jitter)
+    conn = _get_db()
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO saved_searches (job_title, location, time_range, interval_minutes, daily_at, created_at, next_run_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                search["job_title"],
+                search["location"],
+                search["time_range"],
+                search["interval_minutes"],
+                search["daily_at"],
+                now.isoformat(),
+                first_run.isoformat(),
+            ),
+        )
+    return get_saved_search(cursor.lastrowid)
+
+
+def get_saved_search(search_id: int) -> Optional[Dict[str, Any]]:
+    row = _get_db().execute(
+        "SELECT * FROM saved_searches WHERE id = ?", (search_id,)
+    ).fetchone()
+    return _saved_search_dict(row) if row is not None else None
+
+
+def list_saved_searches() -> List[Dict[str, Any]]:
+    rows = _get_db().execute("SELECT * FROM saved_searches ORDER BY id").fetchall()
+    return [_saved_search_dict(row) for row in rows]
+
+
+def delete_saved_search(search_id: int) -> bool:
+    conn = _get_db()
+    with conn:
+        deleted = conn.execute(
+            "DELETE FROM saved_searches WHERE id = ?", (search_id,)
+        )
+        conn.execute("DELETE FROM saved_search_runs WHERE search_id = ?", (search_id,))
+    return deleted.rowcount > 0
+
+
+def get_saved_search_runs(search_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = _get_db().execute(
+        "SELECT * FROM saved_search_runs WHERE search_id = ? ORDER BY id DESC LIMIT ?",
+        (search_id, limit),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _estimated_upstream_calls(job_title: str) -> int:
+    """Upper bound on JSearch calls for one scan (ignoring retries and cache hits)."""
+    pages = settings.jsearch_max_pages if settings.jsearch_page_parallel else 1
+    return len(get_search_queries(job_title)) * pages
+
+
+def _calls_spent_today(conn: sqlite3.Connection) -> int:
+    midnight = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    (spent,) = conn.execute(
+        "SELECT COALESCE(SUM(upstream_calls), 0) FROM saved_search_runs WHERE started_at >= ?",
+        (midnight.isoformat(),),
+    ).fetchone()
+    return spent
+
+
+def _finish_saved_search_run(
+    conn: sqlite3.Connection,
+    search_id: int,
+    run_id: int,
+    status: str,
+    jobs_analyzed: Optional[int] = None,
+    upstream_calls: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        conn.execute(
+            "UPDATE saved_search_runs SET finished_at = ?, status = ?, jobs_analyzed = ?, upstream_calls = COALESCE(?, upstream_calls), error = ? WHERE id = ?",
+            (now, status, jobs_analyzed, upstream_calls, error, run_id),
+        )
+        conn.execute(
+            "UPDATE saved_searches SET last_run_at = ?, last_status = ?, last_error = ? WHERE id = ?",
+            (now, status, error, search_id),
+        )
+        conn.execute(
+            "DELETE FROM saved_search_runs WHERE search_id = ? AND id NOT IN (SELECT id FROM saved_search_runs WHERE search_id = ? ORDER BY id DESC LIMIT ?)",
+            (search_id, search_id, SAVED_SEARCH_RUNS_KEPT),
+        )
+
+
+async def run_saved_search(search: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one saved search now and return its recorded run."""
+    async with _get_run_slots():
+        conn = _get_db()
+        estimate = _estimated_upstream_calls(search["job_title"])
+        started = datetime.now(timezone.utc).isoformat()
+        with conn:
+            budget = settings.scheduler_daily_call_budget
+            over_budget = budget > 0 and _calls_spent_today(conn) + estimate > budget
+            # The estimate reserves budget while the run is in flight.
+            run_id = conn.execute(
+                "INSERT INTO saved_search_runs (search_id, started_at, status, upstream_calls) VALUES (?, ?, ?, ?)",
+                (
+                    search["id"],
+                    started,
+                    "running",
+                    0 if over_budget else estimate,
+                ),
+            ).lastrowid
+        if over_budget:
+            _finish_saved_search_run(
+                conn, search["id"], run_id, "skipped_budget", upstream_calls=0
+            )
+            return get_saved_search_runs(search["id"], 1)[0]
+
+        payload = JobSearchRequest(
+            job_title=search["job_title"],
+            location=search["location"],
+            time_range=search["time_range"],
+        )
+        counter = {"calls": 0}
+        priority_token = jsearch_priority.set(PRIORITY_BACKGROUND)
+        counter_token = jsearch_call_counter.set(counter)
+        try:
+            result = await coalesced_scan(payload)
+            _finish_saved_search_run(
+                conn,
+                search["id"],
+                run_id,
+                "success" if result.success else "no_jobs",
+                result.jobs_analyzed,
+                counter["calls"],
+            )
+        except asyncio.CancelledError:
+            calls = counter["calls"]
+            _finish_saved_search_run(
+                conn, search["id"], run_id, "cancelled", upstream_calls=calls
+            )
+            raise
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            print(f"Saved search {search['id']} failed: {detail}")
+            _finish_saved_search_run(
+                conn,
+                search["id"],
+                run_id,
+                "error",
+                upstream_calls=counter["calls"],
+                error=str(detail),
+            )
+        finally:
+            jsearch_call_counter.reset(counter_token)
+            jsearch_priority.reset(priority_token)
+    return get_saved_search_runs(search["id"], 1)[0]
+
+
+def start_saved_search(search: Dict[str, Any]) -> Optional[asyncio.Task]:
+    """Run a saved search in the background unless it is already running."""
+    if search["id"] in _running_searches:
+        return None
+    _running_searches.add(search["id"])
+    task = asyncio.create_task(run_saved_search(search))
+    _saved_search_tasks.add(task)
+
+    def _done(done: asyncio.Task) -> None:
+        _running_searches.discard(search["id"])
+        _saved_search_tasks.discard(done)
+
+    task.add_done_callback(_done)
+    return task
+
+
+def start_due_saved_searches() -> List[asyncio.Task]:
+    """Start every enabled search whose next run is due and schedule its next one."""
+    now = datetime.now(timezone.utc)
+    conn = _get_db()
+    due = conn.execute(
+        "SELECT * FROM saved_searches WHERE enabled = 1 AND next_run_at <= ? ORDER BY next_run_at",
+        (now.isoformat(),),
+    ).fetchall()
+    tasks = []
+    for row in due:
+        search = dict(row)
+        with conn:
+            conn.execute(
+                "UPDATE saved_searches SET next_run_at = ? WHERE id = ?",
+                (next_saved_search_run(search, now).isoformat(), search["id"]),
+            )
+        task = start_saved_search(search)
+        if task is not None:
+            tasks.append(task)
+    return tasks
+
+
+async def _scan_scheduler_loop() -> None:
+    while True:
+        try:
+            start_due_saved_searches()
+        except Exception as e:
+            print(f"Scan scheduler error: {e}")
+        await asyncio.sleep(settings.scheduler_poll_seconds)
+
+
+def start_scan_scheduler() -> None:
+    global _scan_scheduler_task
+    if settings.scheduler_enabled and _scan_scheduler_task is None:
+        _scan_scheduler_task = asyncio.create_task(_scan_scheduler_loop())
+
+
+async def stop_scan_scheduler() -> None:
+    global _scan_scheduler_task
+    tasks = list(_saved_search_tasks)
+    if _scan_scheduler_task is not None:
+        tasks.append(_scan_scheduler_task)
+        _scan_scheduler_task = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ── Profiling ────────────────────────────────────────────────────────────────
+# `?profile=1` or `X-Profile: 1` runs /analyze-jobs or /stats under cProfile.
+# Open in development; elsewhere it needs X-Admin-Key.
+
+PROFILE_DIR = DATA_DIR / "profiles"
+PROFILE_SUMMARY_LINES = 40
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}Z-[a-z-]+-[0-9a-f]{6}$")
+_profiling_active = False
+
+
+def profiling_requested(request: Request) -> bool:
+    flag = request.query_params.get("profile") or request.headers.get("x-profile") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+
+def _require_profiling_access(x_admin_key: Optional[str]) -> None:
+    if ENVIRONMENT == "development":
+        return
+    _require_admin_access(x_admin_key)
+
+
+def save_profile(
+    endpoint: str,
+    payload: Dict[str, Any],
+    profiler: cProfile.Profile,
+    duration: float,
+    error: Optional[str] = None,
+) -> str:
+    """Write `<id>.prof` (pstats format) and `<id>.json` (payload + summary)."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    profile_id = f"{now:%Y%m%dT%H%M%S%f}Z-{endpoint}-{os.urandom(3).hex()}"
+    profiler.dump_stats(str(PROFILE_DIR / f"{profile_id}.prof"))
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+    meta = {
+        "id": profile_id,
+        "endpoint": endpoint,
+        "created_at": now.isoformat(),
+        "duration_seconds": round(duration, 4),
+        "error": error,
+        "payload": payload,
+        "summary": summary.getvalue(),
+    }
+    (PROFILE_DIR / f"{profile_id}.json").write_text(
+        json.dumps(meta, default=str), encoding="utf-8"
+    )
+    _prune_profiles()
+    return profile_id
+
+
+def _prune_profiles() -> None:
+    if settings.profile_max_files <= 0:
+        return
+    # Ids start with a UTC timestamp, so name order is age order.
+    for meta_path in sorted(PROFILE_DIR.glob("*.json"))[: -settings.profile_max_files]:
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+async def run_profiled(
+    endpoint: str, payload: Dict[str, Any], call: Callable[[], Any]
+) -> tuple[Any, str]:
+    """Await `call()` under cProfile and save the profile, even if it fails.
+
+    cProfile follows the event-loop thread, so other requests served meanwhile
+    show up too and pool-side extraction does not; one capture runs at a time.
+    """
+    global _profiling_active
+    if _profiling_active:
+        raise HTTPException(
+            status_code=409, detail="Another request is already being profiled."
+        )
+    _profiling_active = True
+    profiler = cProfile.Profile()
+    error = None
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        result = await call()
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        profiler.disable()
+        _profiling_active = False
+        profile_id = save_profile(
+            endpoint, payload, profiler, time.perf_counter() - started, error
+        )
+    return result, profile_id
+
+
+async def run_maybe_profiled(
+    request: Request,
+    response: Response,
+    x_admin_key: Optional[str],
+    endpoint: str,
+    payload: Dict[str, Any],
+    call: Callable[[], Any],
+) -> Any:
+    """Await `call()`, under run_profiled when the request asks for `?profile=1`.
+
+    Profiling needs the admin key; the saved profile's id goes in X-Profile-Id.
+    """
+    if not profiling_requested(request):
+        return await call()
+    _require_profiling_access(x_admin_key)
+    result, profile_id = await run_profiled(endpoint, payload, call)
+    response.headers["X-Profile-Id"] = profile_id
+    return result
+
+
+def list_profiles(limit: int = 50) -> List[Dict[str, Any]]:
+    """Newest-first profile metadata, without the text summaries."""
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for meta_path in sorted(PROFILE_DIR.glob("*.json"), reverse=True)[:limit]:
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta.pop("summary", None)
+        profiles.append(meta)
+    return profiles
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    meta_path = PROFILE_DIR / f"{profile_id}.json"
+    if not meta_path.exists():
+        return None
+    return json.loads(meta_path.read_text(encoding="utf-8"))
+
+
+# ── API Routes ───────────────────────────────────────────────────────────────
+
+
+
+# JSearch supports: today, 3days, week, month, all
+JSEARCH_DATE_POSTED: Dict[str, str] = {
+    "1d": "today",
+    "3d": "3days",
+    "7d": "week",
+    "14d": "month",
+    "30d": "month",
+}
+
+
+def fingerprint_descriptions(
+    descriptions: List[str], with_simhash: bool = False
+) -> List[tuple]:
+    """Clean each raw description once into (fingerprint, SimHash or None, cleaned text)."""
+    rows = []
+    for desc in descriptions:
+        normalized = clean_text(desc, lower=True)
+        rows.append(
+            (
+                description_fingerprint(normalized),
+                simhash(normalized) if with_simhash else None,
+                normalized,
+            )
+        )
+    return rows
+
+
+def match_descriptions(items: List[tuple]) -> List[List[str]]:
+    """Cert names per (text, already cleaned?) pair; raw text is cleaned first."""
+    return [
+        match_cert_names(text if cleaned else clean_text(text, lower=True), lowered=True)
+        for text, cleaned in items
+    ]
+
+
+def extract_posting_cert_names(jobs: List[Dict]) -> List[Optional[List[str]]]:
+    """Clean and match each posting; None for postings without a description."""
+    return [
+        match_cert_names(clean_text(job["job_description"], lower=True), lowered=True)
+        if job.get("job_description")
+        else None
+        for job in jobs
+    ]
+
+
+def assemble_postings(
+    jobs: List[Dict], names_per_job: List[Optional[List[str]]]
+) -> tuple[List[Dict], List[List[str]], int]:
+    """Turn per-posting cert names into (mentions, names per job, jobs with descriptions)."""
+    all_certs = []
+    certs_per_job: List[List[str]] = []
+    jobs_with_desc = 0
+
+    for job, names in zip(jobs, names_per_job):
+        if names is None:
+            continue
+        jobs_with_desc += 1
+        title, company, url, job_key = _posting_identity(job)
+        all_certs.extend(cert_mentions(names, title, company, url, job_key=job_key))
+        certs_per_job.append(names)
+
+    return all_certs, certs_per_job, jobs_with_desc
+
+
+def analyze_postings(jobs: List[Dict]) -> tuple[List[Dict], List[List[str]], int]:
+    """Extract certs from each posting with a description.
+
+    Returns (cert mentions, cert names per job for pair analysis, jobs with descriptions).
+    """
+    return assemble_postings(jobs, extract_posting_cert_names(jobs))
+
+
+_extraction_executor: Optional[Executor] = None
+
+
+def get_extraction_executor() -> Executor:
+    """Lazily create the pool that runs clean_text/extract_certs off the event loop."""
+    global _extraction_executor
+    if _extraction_executor is None:
+        if settings.extraction_executor == "process":
+            _extraction_executor = ProcessPoolExecutor(
+                max_workers=settings.extraction_workers
+            )
+        else:
+            _extraction_executor = ThreadPoolExecutor(
+                max_workers=settings.extraction_workers,
+                thread_name_prefix="extract",
+            )
+    return _extraction_executor
+
+
+def shutdown_extraction_executor() -> None:
+    global _extraction_executor
+    if _extraction_executor is not None:
+        _extraction_executor.shutdown(wait=False, cancel_futures=True)
+        _extraction_executor = None
+
+
+async def _run_pooled(fn: Callable[..., list], items: list, *args: Any) -> list:
+    """Run fn(chunk, *args) over items in chunks on the extraction pool, in order.
+
+    Small batches stay inline so they don't pay pool and pickling overhead.
+    """
+    if len(items) <= settings.extraction_inline_max:
+        return fn(items, *args)
+
+    size = max(1, settings.extraction_chunk_size)
+    loop = asyncio.get_running_loop()
+    executor = get_extraction_executor()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, fn, items[i : i + size], *args)
+            for i in range(0, len(items), size)
+        )
+    )
+    return [result for chunk in results for result in chunk]
+
+
+class ExtractionBatch:
+    """Extraction-cache rows for a batch of postings, filled in two steps.
+
+    fingerprint() looks every description up in the cache and cleans and
+    fingerprints the misses; collapse() drops reposts using those fingerprints;
+    match() runs the cert matcher only on the postings that are left, reusing
+    the cleaned text, and saves new and completed rows.
+    """
+
+    def __init__(self, with_simhash: bool = False):
+        self.with_simhash = with_simhash
+        self.rows: Dict[str, list] = {}
+        self._raw: Dict[str, str] = {}
+        self._cleaned: Dict[str, str] = {}
+        self._dirty: set = set()
+
+    async def fingerprint(self, jobs: List[Dict]) -> None:
+        wanted = []
+        for job in jobs:
+            if job.get("job_description"):
+                key = extraction_cache_key(job)
+                if key not in self._raw:
+                    self._raw[key] = job["job_description"]
+                    wanted.append(key)
+        for key, row in extraction_cache_get(wanted).items():
+            if row[2] is not None or not self.with_simhash:
+                self.rows[key] = row
+
+        pending = [key for key in wanted if key not in self.rows]
+        if pending:
+            computed = await _run_pooled(
+                fingerprint_descriptions,
+                [self._raw[key] for key in pending],
+                self.with_simhash,
+            )
+            for key, (fingerprint, sim, cleaned) in zip(pending, computed):
+                self.rows[key] = [None, fingerprint, sim]
+                self._cleaned[key] = cleaned
+                self._dirty.add(key)
+
+    def collapse(
+        self, jobs: List[Dict], index: Optional[DescriptionIndex]
+    ) -> List[Dict]:
+        """Drop postings whose description repeats one already in `index`."""
+        if index is None:
+            return jobs
+        kept = []
+        for job in jobs:
+            if job.get("job_description"):
+                row = self.rows[extraction_cache_key(job)]
+                if not index.add_fingerprint(row[1], row[2]):
+                    continue
+            kept.append(job)
+        POSTINGS_DEDUPED.inc(len(jobs) - len(kept), reason="description")
+        return kept
+
+    async def match(self, jobs: List[Dict]) -> List[Optional[List[str]]]:
+        """Cert names per fingerprinted posting; None without a description."""
+        keys = [
+            extraction_cache_key(job) if job.get("job_description") else None
+            for job in jobs
+        ]
+        pending = [
+            key
+            for key in dict.fromkeys(keys)
+            if key is not None and self.rows[key][0] is None
+        ]
+        if pending:
+            names = await _run_pooled(
+                match_descriptions,
+                [
+                    (self._cleaned[key], True)
+                    if key in self._cleaned
+                    else (self._raw[key], False)
+                    for key in pending
+                ],
+            )
+            for key, found in zip(pending, names):
+                self.rows[key][0] = found
+            self._dirty.update(pending)
+        if self._dirty:
+            extraction_cache_put({key: self.rows[key] for key in self._dirty})
+            self._dirty.clear()
+        return [self.rows[key][0] if key is not None else None for key in keys]
+
+
+async def extract_cert_names_cached(
+    jobs: List[Dict],
+) -> List[Optional[List[str]]]:
+    """Cert names per posting (None without a description): cache first, pool the rest."""
+    extraction = ExtractionBatch()
+    await extraction.fingerprint(jobs)
+    return await extraction.match(jobs)
+
+
+async def extract_unique_postings(
+    jobs: List[Dict], index: Optional[DescriptionIndex], stages: ScanStages
+) -> tuple[List[Dict], List[Optional[List[str]]]]:
+    """Fingerprint every posting, drop reposts, then extract certs from the rest.
+
+    Returns the kept postings and their cert names.
+    """
+    extraction = ExtractionBatch(index is not None and index.needs_simhash)
+    with stages.stage("dedup"):
+        await extraction.fingerprint(jobs)
+        jobs = extraction.collapse(jobs, index)
+    with stages.stage("extract"):
+        names = await extraction.match(jobs)
+    return jobs, names
+
+
+async def analyze_postings_async(
+    jobs: List[Dict],
+) -> tuple[List[Dict], List[List[str]], int]:
+    """analyze_postings, reusing cached per-posting results and pooling the rest."""
+    return assemble_postings(jobs, await extract_cert_names_cached(jobs))
+
+
+def _ranking_base(jobs: List[Dict], jobs_with_desc: int) -> int:
+    """Percentages are relative to postings with descriptions, when there are any."""
+    return jobs_with_desc if jobs_with_desc > 0 else len(jobs)
+
+
+def build_report(
+    payload: JobSearchRequest,
+    jobs: List[Dict],
+    all_certs: List[Dict],
+    certs_per_job: List[List[str]],
+    jobs_with_desc: int,
+    queries_used: List[str],
+    pages_fetched: Optional[Dict[str, int]] = None,
+    duplicates_collapsed: int = 0,
+) -> Dict[str, Any]:
+    """Rank extracted certs and assemble the `data` block of JobAnalysisResponse."""
+    total = _ranking_base(jobs, jobs_with_desc)
+    ranked = rank_certs(all_certs, total, 15)
+
+    return {
+        "certifications": {"title": "Certification Demand", "items": ranked},
+        "total_jobs_found": len(jobs),
+        "jobs_with_descriptions": jobs_with_desc,
+        "queries_used": queries_used,
+        "pages_fetched": pages_fetched or {},
+        "duplicates_collapsed": duplicates_collapsed,
+        "title_distribution": compute_title_distribution(jobs),
+        "cert_pairs": compute_cert_pairs(certs_per_job, total),
+        "search_criteria": _search_criteria(payload),
+    }
+
+
+def _search_criteria(payload: JobSearchRequest) -> Dict[str, Any]:
+    return {
+        "job_title": payload.job_title,
+        "location": payload.location,
+        "time_range": payload.time_range,
+        "target_path": payload.target_path,
+        "owned_certs": payload.owned_certs,
+    }
+
+
+def _save_report(
+    payload: JobSearchRequest,
+    data: Dict[str, Any],
+    jobs: List[Dict],
+    fetched: List[Dict],
+) -> None:
+    """Save a finished report; the archive gets everything fetched, with the
+    ranked `jobs` flagged as kept."""
+    save_scan(
+        job_title=payload.job_title,
+        location=payload.location,
+        time_range=payload.time_range,
+        total_jobs=data["total_jobs_found"],
+        jobs_with_desc=data["jobs_with_descriptions"],
+        cert_items=data["certifications"]["items"],
+        postings=fetched if settings.posting_archive else None,
+        kept_postings=jobs,
+    )
+
+
+async def run_scan(payload: JobSearchRequest) -> JobAnalysisResponse:
+    """Fetch, extract, rank and save one scan."""
+    date_posted = JSEARCH_DATE_POSTED.get(payload.time_range, "today")
+
+    with ScanStages("scan") as stages:
+        # Multi-query expansion
+        with stages.stage("fetch"):
+            jobs, queries_used, pages_fetched = await fetch_jobs_expanded(
+                payload.job_title, payload.location, date_posted
+            )
+        fetched = jobs
+        with stages.stage("filter"):
+            jobs = filter_jobs_by_time_range(jobs, payload.time_range)
+
+        if not jobs:
+            return JobAnalysisResponse(
+                success=False, message="No jobs found", jobs_analyzed=0
+            )
+
+        description_index = new_description_index()
+        jobs, names = await extract_unique_postings(jobs, description_index, stages)
+        with stages.stage("report"):
+            all_certs, certs_per_job, jobs_with_desc = assemble_postings(jobs, names)
+            data = build_report(
+                payload,
+                jobs,
+                all_certs,
+                certs_per_job,
+                jobs_with_desc,
+                queries_used,
+                pages_fetched,
+                description_index.duplicates if description_index else 0,
+            )
+
+        # Save to SQLite
+        with stages.stage("save"):
+            _save_report(payload, data, jobs, fetched)
+
+    return JobAnalysisResponse(
+        success=True,
+        message="Analysis complete",
+        data=data,
+        jobs_analyzed=len(jobs),
+    )
 
-        return all_jobs, queries
 
+def _scan_flight_key(payload: JobSearchRequest) -> tuple[str, str, str]:
+    return (
+        " ".join(payload.job_title.lower().split()),
+        " ".join((payload.location or "").lower().split()),
+        payload.time_range,
+    )
+
+
+@app.post("/analyze-jobs", response_model=JobAnalysisResponse)
+async def analyze_jobs(
+    request: Request,
+    response: Response,
+    payload: JobSearchRequest = Body(...),
+    x_admin_key: Optional[str] = Header(None),
+):
+    """Analyze job postings for certification demand.
+
+    A profiled scan (`?profile=1`) skips coalescing so the profile covers the
+    real work.
+    """
+    try:
+        return await run_maybe_profiled(
+            request,
+            response,
+            x_admin_key,
+            "analyze-jobs",
+            payload.model_dump(),
+            lambda: analyze_scan(payload, coalesce=not profiling_requested(request)),
+        )
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching jobs: {e}")
+        print(f"Error: {e}")
+        import traceback
 
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Unexpected error during analysis.")
 
-# ── Cert Extraction ──────────────────────────────────────────────────────────
 
+async def analyze_scan(
+    payload: JobSearchRequest, coalesce: bool = True
+) -> JobAnalysisResponse:
+    """Run one scan and echo the caller's search criteria into the result.
 
-def clean_text(text: str) -> str:
-    """Clean HTML and normalize whitespace."""
-    if not text:
-        return ""
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    Identical scans submitted concurrently (same title, location and time
+    range) run once and save one scan row; each caller still gets its own
+    personalization fields echoed back.
+    """
+    if coalesce:
+        result = await coalesced_scan(payload)
+    else:
+        result = await run_scan(payload)
+    if result.data is None:
+        return result
+    data = {**result.data, "search_criteria": _search_criteria(payload)}
+    return result.model_copy(update={"data": data})
 
 
-def extract_certs(
-    text: str,
-    job_title: str,
-    company: str = "Unknown",
-    job_url: str = None,
-    job_key: Optional[str] = None,
-) -> List[Dict]:
-    """Extract certifications using dictionary lookup."""
-    certs = []
-    text_lower = text.lower()
-    seen = set()
+async def scan_events(payload: JobSearchRequest) -> AsyncIterator[Dict[str, Any]]:
+    """run_scan as a scan-flight producer: one `result` or `error` event."""
+    try:
+        result = await run_scan(payload)
+    except HTTPException as e:
+        yield {"event": "error", "status": e.status_code, "detail": e.detail}
+        return
+    except Exception as e:
+        print(f"Error: {e}")
+        yield {
+            "event": "error",
+            "status": 500,
+            "detail": "Unexpected error during analysis.",
+        }
+        return
+    yield {"event": "result", **result.model_dump()}
 
-    for search_term, canonical, info in _cert_lookup:
-        if canonical in seen:
-            continue
 
-        escaped = re.escape(search_term).replace(r"\ ", r"\s+")
-        pattern = rf"(?<![a-z0-9]){escaped}(?![a-z0-9])"
-        if re.search(pattern, text_lower):
-            seen.add(canonical)
-            certs.append(
-                {
-                    "name": canonical,
-                    "full_name": info.get("full_name", canonical),
-                    "org": info.get("org", ""),
-                    "source_job": f"{job_title} at {company}",
-                    "company": company,
-                    "job_url": job_url,
-                    "job_key": job_key or job_url or f"{job_title} at {company}",
-                }
-            )
+async def coalesced_scan(payload: JobSearchRequest) -> JobAnalysisResponse:
+    """run_scan, joining any identical scan or stream already in flight.
 
-    return certs
+    Whichever entry point starts the flight produces it: a scan that joins a
+    stream skips its progress events and takes the final `result`.
+    """
+    events = _scan_flights.subscribe(
+        _scan_flight_key(payload), lambda: scan_events(payload)
+    )
+    try:
+        async for event in events:
+            if event["event"] == "result":
+                fields = {k: v for k, v in event.items() if k != "event"}
+                return JobAnalysisResponse(**fields)
+            if event["event"] == "error":
+                raise HTTPException(status_code=event["status"], detail=event["detail"])
+    finally:
+        await events.aclose()
+    raise HTTPException(status_code=500, detail="Unexpected error during analysis.")
 
 
-# ── Ranking ──────────────────────────────────────────────────────────────────
+def _plan_batch_queries(
+    pairs: List[BatchPair],
+) -> tuple[Dict[tuple, tuple[str, Optional[str]]], List[List[tuple]]]:
+    """Unique upstream (query, location) keys across pairs, and each pair's keys."""
+    unique: Dict[tuple, tuple[str, Optional[str]]] = {}
+    plans: List[List[tuple]] = []
+    for pair in pairs:
+        keys = []
+        for query in get_search_queries(pair.job_title):
+            key = (query.strip().lower(), (pair.location or "").strip().lower())
+            unique.setdefault(key, (query, pair.location))
+            if key not in keys:
+                keys.append(key)
+        plans.append(keys)
+    return unique, plans
 
 
-def rank_certs(items: List[Dict], total_jobs: int, top_n: int = 15) -> List[Dict]:
-    """Rank certs by % of jobs mentioning them."""
-    if not items:
-        return []
+async def run_batch(request: BatchAnalysisRequest) -> Dict[str, Any]:
+    """Analyze many (title, location) pairs from one shared set of upstream queries.
 
-    groups: Dict[str, Dict] = {}
-    for item in items:
-        name = item["name"]
-        if name not in groups:
-            groups[name] = {
-                "name": name,
-                "full_name": item.get("full_name", name),
-                "org": item.get("org", ""),
-                "jobs": set(),
-                "sources": [],
-            }
-        groups[name]["jobs"].add(item.get("job_key", item["source_job"]))
-        groups[name]["sources"].append(
-            {
-                "job": item["source_job"],
-                "company": item["company"],
-                "job_url": item.get("job_url"),
-            }
-        )
+    Each unique query is fetched once, BATCH_QUERY_CONCURRENCY at a time, and
+    each distinct posting is extracted once. Every pair is then ranked and
+    saved like a regular scan, and all postings are ranked together.
+    """
+    _require_rapidapi_key()
+    date_posted = JSEARCH_DATE_POSTED.get(request.time_range, "today")
+    unique, plans = _plan_batch_queries(request.pairs)
 
-    sorted_groups = sorted(groups.values(), key=lambda x: len(x["jobs"]), reverse=True)
-    if top_n:
-        sorted_groups = sorted_groups[:top_n]
+    client = get_http_client()
+    slots = asyncio.Semaphore(max(1, settings.batch_query_concurrency))
 
-    ranked = []
-    for g in sorted_groups:
-        seen = set()
-        unique_sources = []
-        for s in g["sources"]:
-            key = s.get("job_url") or f"{s['job']}-{s['company']}"
-            if key not in seen:
-                unique_sources.append(s)
-                seen.add(key)
+    async def fetch(key: tuple) -> tuple[tuple, tuple[List[Dict], int]]:
+        query, location = unique[key]
+        async with slots:
+            return key, await fetch_query(client, query, location, date_posted)
 
-        job_count = len(g["jobs"])
-        ranked.append(
-            {
-                "name": g["name"],
-                "full_name": g["full_name"],
-                "org": g["org"],
-                "count": job_count,
-                "percentage": round((job_count / total_jobs) * 100, 1)
-                if total_jobs > 0
-                else 0,
-                "sources": unique_sources[:5],
-            }
-        )
+    with ScanStages("batch") as stages:
+        with stages.stage("fetch"):
+            fetched = dict(await asyncio.gather(*(fetch(key) for key in unique)))
 
-    return ranked
+        pair_fetched = []
+        pair_jobs = []
+        with stages.stage("filter"):
+            for keys in plans:
+                seen_ids = set()
+                jobs = []
+                for key in keys:
+                    for job in fetched[key][0]:
+                        job_key = _dedup_job_key(job)
+                        if job_key not in seen_ids:
+                            seen_ids.add(job_key)
+                            jobs.append(job)
+                POSTINGS_DEDUPED.inc(
+                    sum(len(fetched[key][0]) for key in keys) - len(jobs),
+                    reason="job_id",
+                )
+                pair_fetched.append(jobs)
+                pair_jobs.append(filter_jobs_by_time_range(jobs, request.time_range))
 
+        distinct: Dict[str, Dict] = {}
+        for jobs in pair_jobs:
+            for job in jobs:
+                distinct.setdefault(_dedup_job_key(job), job)
+        extraction = ExtractionBatch(
+            settings.description_dedup and settings.near_duplicate_distance > 0
+        )
+        kept_jobs = []
+        indexes = []
+        combined: Dict[str, Dict] = {}
+        with stages.stage("dedup"):
+            await extraction.fingerprint(list(distinct.values()))
+            for jobs in pair_jobs:
+                description_index = new_description_index()
+                jobs = extraction.collapse(jobs, description_index)
+                for job in jobs:
+                    combined.setdefault(_dedup_job_key(job), job)
+                kept_jobs.append(jobs)
+                indexes.append(description_index)
+        with stages.stage("extract"):
+            names = dict(
+                zip(combined, await extraction.match(list(combined.values())))
+            )
 
-# ── Insights ─────────────────────────────────────────────────────────────────
+        results = []
+        for pair, keys, fetched_jobs, jobs, description_index in zip(
+            request.pairs, plans, pair_fetched, kept_jobs, indexes
+        ):
+            payload = JobSearchRequest(
+                job_title=pair.job_title,
+                location=pair.location,
+                time_range=request.time_range,
+            )
+            if not jobs:
+                result = JobAnalysisResponse(
+                    success=False, message="No jobs found", jobs_analyzed=0
+                )
+            else:
+                with stages.stage("report"):
+                    all_certs, certs_per_job, jobs_with_desc = assemble_postings(
+                        jobs, [names[_dedup_job_key(job)] for job in jobs]
+                    )
+                    data = build_report(
+                        payload,
+                        jobs,
+                        all_certs,
+                        certs_per_job,
+                        jobs_with_desc,
+                        [unique[key][0] for key in keys],
+                        {unique[key][0]: fetched[key][1] for key in keys},
+                        description_index.duplicates if description_index else 0,
+                    )
+                with stages.stage("save"):
+                    _save_report(payload, data, jobs, fetched_jobs)
+                result = JobAnalysisResponse(
+                    success=True,
+                    message="Analysis complete",
+                    data=data,
+                    jobs_analyzed=len(jobs),
+                )
+            results.append(
+                {"job_title": pair.job_title, "location": pair.location, **result.model_dump()}
+            )
 
+        with stages.stage("report"):
+            all_jobs = list(combined.values())
+            all_certs, certs_per_job, jobs_with_desc = assemble_postings(
+                all_jobs, list(names.values())
+            )
+            total = _ranking_base(all_jobs, jobs_with_desc)
+            ranked = rank_certs(all_certs, total, 15)
+            cert_pairs = compute_cert_pairs(certs_per_job, total)
 
-def compute_title_distribution(jobs: List[Dict]) -> List[Dict]:
-    """Count job title variations in results (case/spacing normalized)."""
-    titles = Counter()
-    canonical_display: Dict[str, str] = {}
+    return {
+        "success": True,
+        "pairs": results,
+        "combined": {
+            "certifications": {
+                "title": "Combined Certification Demand",
+                "items": ranked,
+            },
+            "total_jobs_found": len(all_jobs),
+            "jobs_with_descriptions": jobs_with_desc,
+            "cert_pairs": cert_pairs,
+        },
+        "queries_planned": sum(len(keys) for keys in plans),
+        "upstream_queries": len(unique),
+    }
 
-    for job in jobs:
-        raw = str(job.get("job_title") or "Unknown")
-        cleaned = raw.strip() or "Unknown"
-        norm = re.sub(r"\s+", " ", cleaned).lower()
 
-        if norm not in canonical_display:
-            canonical_display[norm] = re.sub(r"\s+", " ", cleaned)
-        titles[norm] += 1
+def _ndjson(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event) + "\n").encode("utf-8")
 
-    total = sum(titles.values())
-    dist = []
-    for norm, count in titles.most_common(8):
-        dist.append(
-            {
-                "title": canonical_display.get(norm, norm),
-                "count": count,
-                "percentage": round((count / total) * 100, 1) if total > 0 else 0,
-            }
-        )
-    return dist
 
+async def stream_analysis(payload: JobSearchRequest) -> AsyncIterator[bytes]:
+    """Yield NDJSON events: one `progress` per finished query, then `result`.
 
-def compute_cert_pairs(
-    all_certs_per_job: List[List[str]], total_jobs: int
-) -> List[Dict]:
-    """Find the most common cert pairs across jobs."""
-    pair_counter = Counter()
-    for job_certs in all_certs_per_job:
-        unique = sorted(set(job_certs))
-        for i in range(len(unique)):
-            for j in range(i + 1, len(unique)):
-                pair_counter[(unique[i], unique[j])] += 1
+    Identical streams and scans submitted concurrently share one flight; each
+    subscriber gets every event with its own search criteria echoed back. A
+    stream that joins a flight started by /analyze-jobs or a saved search only
+    gets the final `result` event.
+    """
+    criteria = _search_criteria(payload)
+    events = _scan_flights.subscribe(
+        _scan_flight_key(payload), lambda: stream_events(payload)
+    )
+    async for event in events:
+        if event.get("data") is not None:
+            event = {**event, "data": {**event["data"], "search_criteria": criteria}}
+        yield _ndjson(event)
 
-    pairs = []
-    for (a, b), count in pair_counter.most_common(5):
-        if count >= 2:  # Only show pairs that appear in 2+ jobs
-            pairs.append(
-                {
-                    "certs": [a, b],
-                    "count": count,
-                    "percentage": round((count / total_jobs) * 100, 1)
-                    if total_jobs > 0
-                    else 0,
-                }
-            )
-    return pairs
 
+async def stream_events(payload: JobSearchRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Run one streamed scan, yielding `progress` events and a final `result`.
 
-# ── API Routes ───────────────────────────────────────────────────────────────
+    Postings are deduped, filtered and extracted as each query lands, so the
+    partial ranking only grows; the `result` event carries the same fields as
+    JobAnalysisResponse. Failures are reported as a final `error` event because
+    the HTTP status has already been sent.
+    """
+    date_posted = JSEARCH_DATE_POSTED.get(payload.time_range, "today")
+    queries = get_search_queries(payload.job_title)
+    client = get_http_client()
 
+    async def run_query(query: str) -> tuple[str, List[Dict], int]:
+        batch, pages = await fetch_query(client, query, payload.location, date_posted)
+        return query, batch, pages
 
+    tasks = [asyncio.ensure_future(run_query(q)) for q in queries]
+    seen_ids = set()
+    fetched: List[Dict] = []
+    jobs: List[Dict] = []
+    all_certs: List[Dict] = []
+    certs_per_job: List[List[str]] = []
+    jobs_with_desc = 0
+    pages_fetched: Dict[str, int] = {}
+    description_index = new_description_index()
+    stages = ScanStages("stream")
 
-@app.post("/analyze-jobs", response_model=JobAnalysisResponse)
-async def analyze_jobs(payload: JobSearchRequest = Body(...)):
-    """Analyze job postings for certification demand."""
     try:
-        # JSearch supports: today, 3days, week, month, all
-        date_map = {
-            "1d": "today",
-            "3d": "3days",
-            "7d": "week",
-            "14d": "month",
-            "30d": "month",
-        }
-        date_posted = date_map.get(payload.time_range, "today")
-
-        # Multi-query expansion
-        jobs, queries_used = await fetch_jobs_expanded(
-            payload.job_title, payload.location, date_posted
-        )
-        jobs = filter_jobs_by_time_range(jobs, payload.time_range)
+        for done, next_query in enumerate(asyncio.as_completed(tasks), start=1):
+            with stages.stage("fetch"):
+                query, batch, pages_fetched[query] = await next_query
 
-        if not jobs:
-            return JobAnalysisResponse(
-                success=False, message="No jobs found", jobs_analyzed=0
+            with stages.stage("filter"):
+                fresh = []
+                for job in batch:
+                    key = _dedup_job_key(job)
+                    if key not in seen_ids:
+                        seen_ids.add(key)
+                        fresh.append(job)
+                POSTINGS_DEDUPED.inc(len(batch) - len(fresh), reason="job_id")
+                fetched.extend(fresh)
+                fresh = filter_jobs_by_time_range(fresh, payload.time_range)
+            fresh, names = await extract_unique_postings(
+                fresh, description_index, stages
             )
 
-        # Extract certs from all job descriptions
-        all_certs = []
-        certs_per_job: List[List[str]] = []  # For pair analysis
-        jobs_with_desc = 0
+            with stages.stage("report"):
+                batch_certs, batch_per_job, batch_with_desc = assemble_postings(
+                    fresh, names
+                )
+                jobs.extend(fresh)
+                all_certs.extend(batch_certs)
+                certs_per_job.extend(batch_per_job)
+                jobs_with_desc += batch_with_desc
+                data = build_report(
+                    payload,
+                    jobs,
+                    all_certs,
+                    certs_per_job,
+                    jobs_with_desc,
+                    queries,
+                    pages_fetched,
+                    description_index.duplicates if description_index else 0,
+                )
 
-        for job in jobs:
-            desc = job.get("job_description", "")
-            if not desc:
-                continue
-            jobs_with_desc += 1
-
-            cleaned = clean_text(desc)
-            title = job.get("job_title", "Job Posting")
-            company = job.get("company_name", job.get("employer_name", "Unknown"))
-            url = job.get("job_apply_link", job.get("job_url"))
-            job_key = str(job.get("job_id") or url or f"{title}-{company}")
-
-            job_certs = extract_certs(cleaned, title, company, url, job_key=job_key)
-            all_certs.extend(job_certs)
-            certs_per_job.append([c["name"] for c in job_certs])
+            yield {
+                "event": "progress",
+                "query": query,
+                "queries_done": done,
+                "queries_total": len(queries),
+                "data": data,
+            }
 
-        total = jobs_with_desc if jobs_with_desc > 0 else len(jobs)
-        ranked = rank_certs(all_certs, total, 15)
+        if not jobs:
+            result = JobAnalysisResponse(
+                success=False, message="No jobs found", jobs_analyzed=0
+            )
+        else:
+            with stages.stage("report"):
+                data = build_report(
+                    payload,
+                    jobs,
+                    all_certs,
+                    certs_per_job,
+                    jobs_with_desc,
+                    queries,
+                    pages_fetched,
+                    description_index.duplicates if description_index else 0,
+                )
+            with stages.stage("save"):
+                _save_report(payload, data, jobs, fetched)
+            result = JobAnalysisResponse(
+                success=True,
+                message="Analysis complete",
+                data=data,
+                jobs_analyzed=len(jobs),
+            )
+        yield {"event": "result", **result.model_dump()}
 
-        # Compute insights
-        title_dist = compute_title_distribution(jobs)
-        cert_pairs = compute_cert_pairs(certs_per_job, total)
+    except HTTPException as e:
+        yield {"event": "error", "status": e.status_code, "detail": e.detail}
+    except Exception as e:
+        print(f"Error: {e}")
+        yield {
+            "event": "error",
+            "status": 500,
+            "detail": "Unexpected error during analysis.",
+        }
+    finally:
+        for task in tasks:
+            task.cancel()
+        stages.record()
 
-        # Save to SQLite
-        save_scan(
-            job_title=payload.job_title,
-            location=payload.location,
-            time_range=payload.time_range,
-            total_jobs=len(jobs),
-            jobs_with_desc=jobs_with_desc,
-            cert_items=ranked,
-        )
-
-        return JobAnalysisResponse(
-            success=True,
-            message="Analysis complete",
-            data={
-                "certifications": {"title": "Certification Demand", "items": ranked},
-                "total_jobs_found": len(jobs),
-                "jobs_with_descriptions": jobs_with_desc,
-                "queries_used": queries_used,
-                "title_distribution": title_dist,
-                "cert_pairs": cert_pairs,
-                "search_criteria": {
-                    "job_title": payload.job_title,
-                    "location": payload.location,
-                    "time_range": payload.time_range,
-                    "target_path": payload.target_path,
-                    "owned_certs": payload.owned_certs,
-                },
-            },
-            jobs_analyzed=len(jobs),
-        )
 
+@app.post("/analyze-jobs/batch")
+async def analyze_jobs_batch(request: BatchAnalysisRequest = Body(...)):
+    """Analyze up to 50 (title, location) pairs with shared upstream queries."""
+    try:
+        return await run_batch(request)
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
-
-        traceback.print_exc()
         raise HTTPException(status_code=500, detail="Unexpected error during analysis.")
 
 
+@app.post("/analyze-jobs/stream")
+async def analyze_jobs_stream(payload: JobSearchRequest = Body(...)):
+    """Analyze job postings, streaming partial rankings as NDJSON."""
+    _require_rapidapi_key()
+    return StreamingResponse(
+        stream_analysis(payload), media_type="application/x-ndjson"
+    )
+
+
 @app.get("/history")
 async def scan_history(limit: int = 50):
     """Return saved scan history for trend tracking."""
@@ -682,84 +3918,175 @@ async def scan_history(limit: int = 50):
         raise HTTPException(status_code=500, detail=f"Error loading history: {e}")
 
 
+@app.get("/history/{scan_id}/postings")
+async def scan_postings(scan_id: int, kept_only: bool = False):
+    """Stream a scan's archived raw postings as NDJSON.
+
+    Everything the scan fetched by default; `kept_only` streams just the
+    postings its ranks came from.
+    """
+    exists = _get_db().execute("SELECT 1 FROM scans WHERE id = ?", (scan_id,))
+    if exists.fetchone() is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return StreamingResponse(
+        (_ndjson(job) for job in iter_archived_postings(scan_id, kept_only)),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/admin/reanalyze", status_code=202)
+async def start_reanalysis(x_admin_key: Optional[str] = Header(None)):
+    """Re-rank archived scans against the current cert dictionary in the background."""
+    global _reanalysis_task
+    _require_admin_access(x_admin_key)
+    if _reanalysis_task is None or _reanalysis_task.done():
+        begin_reanalysis()
+        _reanalysis_task = asyncio.create_task(run_reanalysis())
+    return get_reanalysis_status()
+
+
+@app.get("/admin/reanalyze")
+async def reanalysis_status(x_admin_key: Optional[str] = Header(None)):
+    _require_admin_access(x_admin_key)
+    return get_reanalysis_status() or {"status": "never_run"}
+
+
+@app.get("/admin/profiles")
+async def profiles(
+    limit: int = Query(50, ge=1, le=500), x_admin_key: Optional[str] = Header(None)
+):
+    """Recently captured request profiles, newest first."""
+    _require_profiling_access(x_admin_key)
+    return {"profiles": list_profiles(limit)}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def profile_detail(
+    profile_id: str,
+    format: Literal["json", "prof"] = "json",
+    x_admin_key: Optional[str] = Header(None),
+):
+    """A profile's payload and top functions, or the raw pstats file (`format=prof`)."""
+    _require_profiling_access(x_admin_key)
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "prof":
+        return FileResponse(
+            PROFILE_DIR / f"{profile_id}.prof",
+            media_type="application/octet-stream",
+            filename=f"{profile_id}.prof",
+        )
+    return profile
+
+
+@app.get("/saved-searches")
+async def saved_searches():
+    return {"saved_searches": list_saved_searches()}
+
+
+@app.post("/saved-searches", status_code=201)
+async def add_saved_search(request: SavedSearchRequest = Body(...)):
+    """Save a search to be re-run on a schedule."""
+    return create_saved_search(request)
+
+
+@app.delete("/saved-searches/{search_id}", status_code=204)
+async def remove_saved_search(search_id: int):
+    if not delete_saved_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+
+@app.post("/saved-searches/{search_id}/run", status_code=202)
+async def run_saved_search_now(search_id: int):
+    """Start a saved search immediately (outside its schedule)."""
+    search = get_saved_search(search_id)
+    if search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    started = start_saved_search(search) is not None
+    return {**get_saved_search(search_id), "started": started}
+
+
+@app.get("/saved-searches/{search_id}/runs")
+async def saved_search_runs(search_id: int, limit: int = 20):
+    if get_saved_search(search_id) is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return {"runs": get_saved_search_runs(search_id, limit)}
+
+
 @app.get("/stats")
-async def aggregate_stats():
-    """Aggregate all scan data into all-time stats and trends."""
-    try:
-        conn = _get_db()
-        rows = conn.execute("SELECT * FROM scans ORDER BY timestamp ASC").fetchall()
-        conn.close()
+async def aggregate_stats(
+    request: Request,
+    response: Response,
+    points: Optional[int] = Query(None, ge=2, le=10000),
+    x_admin_key: Optional[str] = Header(None),
+):
+    """Aggregate all scan data into all-time stats and trends.
 
-        if not rows:
-            return {"stats": None}
+    `points` caps each role's trend series at that many (bucketed) points.
+    """
 
-        total_scans = len(rows)
-        total_jobs = sum(row["total_jobs"] for row in rows)
-        total_jobs_desc = sum(row["jobs_with_descriptions"] for row in rows)
+    async def compute() -> Dict[str, Any]:
+        return compute_aggregate_stats(points)
 
-        # Aggregate cert counts across ALL scans
-        cert_totals: Dict[str, Dict] = {}
-        # Track per-scan trends for each cert
-        trend_data: List[Dict] = []
+    return await run_maybe_profiled(
+        request, response, x_admin_key, "stats", {"points": points}, compute
+    )
 
-        for row in rows:
-            certs = json.loads(row["cert_data"])
-            scan_jobs = row["jobs_with_descriptions"] or row["total_jobs"]
-            ts = row["timestamp"][:10]  # date only
-            scan_entry = {"date": ts, "job_title": row["job_title"], "jobs": scan_jobs}
-
-            for cert in certs:
-                name = cert["name"]
-                if name not in cert_totals:
-                    cert_totals[name] = {
-                        "name": name,
-                        "full_name": cert.get("full_name", name),
-                        "org": cert.get("org", ""),
-                        "total_mentions": 0,
-                        "scans_appeared": 0,
-                        "percentages": [],
-                    }
-                cert_totals[name]["total_mentions"] += cert.get("count", 0)
-                cert_totals[name]["scans_appeared"] += 1
-                cert_totals[name]["percentages"].append(cert.get("percentage", 0))
-                scan_entry[name] = cert.get("percentage", 0)
-
-            trend_data.append(scan_entry)
-
-        # Build all-time rankings
-        all_time = []
-        for ct in cert_totals.values():
-            avg_pct = (
-                round(sum(ct["percentages"]) / len(ct["percentages"]), 1)
-                if ct["percentages"]
-                else 0
-            )
-            all_time.append(
-                {
-                    "name": ct["name"],
-                    "full_name": ct["full_name"],
-                    "org": ct["org"],
-                    "total_mentions": ct["total_mentions"],
-                    "scans_appeared": ct["scans_appeared"],
-                    "avg_percentage": avg_pct,
-                    "latest_percentage": ct["percentages"][-1]
-                    if ct["percentages"]
-                    else 0,
-                }
-            )
-        all_time.sort(key=lambda x: x["avg_percentage"], reverse=True)
 
-        # Top certs for trend tracking (the top 8 by avg %)
+@app.get("/stats/certs/{cert}")
+async def cert_series(cert: str, limit: int = Query(200, ge=1, le=10000)):
+    """One cert's percentage in each of its most recent scans, oldest first."""
+    series = get_cert_series(_get_db(), cert, limit)
+    if not series:
+        raise HTTPException(status_code=404, detail="Cert not found in any scan")
+    return {"cert": cert, "series": series}
+
+
+def compute_aggregate_stats(points: Optional[int] = None) -> Dict[str, Any]:
+    try:
+        conn = _get_db()
+        totals = conn.execute(
+            "SELECT COUNT(*) AS scans, SUM(total_jobs) AS jobs, SUM(jobs_with_descriptions) AS jobs_desc, MIN(timestamp) AS first_scan, MAX(timestamp) AS latest_scan FROM scans"
+        ).fetchone()
+        if not totals["scans"]:
+            return {"stats": None}
+
+        # All-time rankings come straight from the aggregates save_scan
+        # maintains; SQLite picks the top 15 (ties keep first-seen order).
+        cert_rows = conn.execute(
+            """
+            SELECT *, ROUND(percentage_sum / scans_appeared, 1) AS avg_percentage
+            FROM cert_stats
+            ORDER BY avg_percentage DESC, first_seen ASC, rowid ASC
+            LIMIT 15
+            """
+        ).fetchall()
+        all_time = [
+            {
+                "name": ct["name"],
+                "full_name": ct["full_name"],
+                "org": ct["org"],
+                "total_mentions": ct["total_mentions"],
+                "scans_appeared": ct["scans_appeared"],
+                "avg_percentage": ct["avg_percentage"],
+                "latest_percentage": ct["latest_percentage"],
+            }
+            for ct in cert_rows
+        ]
         top_cert_names = [c["name"] for c in all_time[:8]]
 
+        # Per-scan trend points only carry the top certs the UI charts
+        trend_data = build_trend_series(conn, top_cert_names, points)
+
         return {
             "stats": {
-                "total_scans": total_scans,
-                "total_jobs_scanned": total_jobs,
-                "total_jobs_with_descriptions": total_jobs_desc,
-                "first_scan": rows[0]["timestamp"],
-                "latest_scan": rows[-1]["timestamp"],
-                "all_time_certs": all_time[:15],
+                "total_scans": totals["scans"],
+                "total_jobs_scanned": totals["jobs"],
+                "total_jobs_with_descriptions": totals["jobs_desc"],
+                "first_scan": totals["first_scan"],
+                "latest_scan": totals["latest_scan"],
+                "all_time_certs": all_time,
                 "trend_data": trend_data,
                 "top_cert_names": top_cert_names,
             }
@@ -774,32 +4101,174 @@ async def health_check():
         "status": "healthy",
         "environment": ENVIRONMENT,
         "rapidapi_configured": bool(RAPIDAPI_KEY),
-        "certs_loaded": len(CERT_DICTIONARY),
+        "certs_loaded": len(_cert_index.dictionary) if _cert_index else 0,
         "role_families": len(ROLE_FAMILIES),
+        "query_cache": {
+            "enabled": settings.query_cache_max_entries > 0,
+            **_query_cache_stats,
+            **get_query_cache_size(),
+        },
+        "posting_archive": {
+            "enabled": settings.posting_archive,
+            **get_archive_stats(),
+        },
+        "coalesced": {
+            "scans": _scan_flights.joined,
+            "queries": _query_flights.joined,
+        },
+        "jsearch_scheduler": (
+            _jsearch_scheduler.snapshot() if _jsearch_scheduler is not None else None
+        ),
+        "extraction_cache": {
+            "enabled": settings.extraction_cache_max_entries > 0,
+            "dictionary_version": _cert_index.version if _cert_index else None,
+            **_extraction_cache_stats,
+        },
+        "startup": startup_status(),
         "version": "1.0.0",
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Latency histograms and counters in Prometheus text format."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # ── Serve Frontend ───────────────────────────────────────────────────────────
-if FRONTEND_DIST.exists() and FRONTEND_DIST.is_dir():
-    # Mount the assets directory explicitly
-    assets_dir = FRONTEND_DIST / "assets"
-    if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
-
-    @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
-        # Prevent directory traversal
-        if ".." in full_path:
-            raise HTTPException(status_code=400, detail="Invalid path")
-
-        file_path = FRONTEND_DIST / full_path
-        if file_path.is_file():
-            return FileResponse(file_path)
-        # Fallback to index.html for SPA routing
-        return FileResponse(FRONTEND_DIST / "index.html")
-else:
-    print(f"Warning: Frontend dist folder not found at {FRONTEND_DIST}")
+# The built UI is read into memory once at startup, along with any `.br`/`.gz`
+# siblings written by tools/build_app.py, so requests never touch the disk.
+# Hashed files under /assets never change and are cached for a year; the rest
+# revalidate with their ETag.
+FRONTEND_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_REVALIDATE_CACHE = "no-cache"
+
+
+class FrontendFile:
+    """One dist file: its bytes, precompressed variants and response headers."""
+
+    __slots__ = ("body", "media_type", "cache_control", "variants")
+
+    def __init__(self, relative: str, body: bytes, variants: Dict[str, bytes]):
+        self.body = body
+        self.media_type = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+        self.cache_control = (
+            _IMMUTABLE_CACHE if relative.startswith("assets/") else _REVALIDATE_CACHE
+        )
+        # encoding -> (body, strong ETag); "identity" is the uncompressed file.
+        self.variants = {
+            encoding: (data, f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"')
+            for encoding, data in {"identity": body, **variants}.items()
+        }
+
+
+_frontend_files: Dict[str, FrontendFile] = {}
+_frontend_loaded = False
+
+
+def load_frontend_files(dist: Path) -> Dict[str, FrontendFile]:
+    """Every file under `dist` keyed by its URL path, with its compressed variants."""
+    suffixes = tuple(suffix for _encoding, suffix in FRONTEND_ENCODINGS)
+    files: Dict[str, FrontendFile] = {}
+    for path in dist.rglob("*"):
+        if not path.is_file() or path.name.endswith(suffixes):
+            continue
+        relative = path.relative_to(dist).as_posix()
+        variants = {}
+        for encoding, suffix in FRONTEND_ENCODINGS:
+            compressed = path.with_name(path.name + suffix)
+            if compressed.is_file():
+                variants[encoding] = compressed.read_bytes()
+        files[relative] = FrontendFile(relative, path.read_bytes(), variants)
+    return files
+
+
+def load_frontend() -> None:
+    """Fill the in-memory file table from FRONTEND_DIST (once per process)."""
+    global _frontend_files, _frontend_loaded
+    if _frontend_loaded:
+        return
+    _frontend_loaded = True
+    if not (FRONTEND_DIST.exists() and FRONTEND_DIST.is_dir()):
+        print(f"Warning: Frontend dist folder not found at {FRONTEND_DIST}")
+        return
+    _frontend_files = load_frontend_files(FRONTEND_DIST)
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}; codings with q=0 are refused."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    return accepted
+
+
+def _choose_encoding(frontend_file: FrontendFile, accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for encoding, _suffix in FRONTEND_ENCODINGS:
+        q = accepted.get(encoding, wildcard)
+        if encoding in frontend_file.variants and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def frontend_response(frontend_file: FrontendFile, request: Request) -> Response:
+    encoding = _choose_encoding(
+        frontend_file, request.headers.get("accept-encoding", "")
+    )
+    body, etag = frontend_file.variants[encoding]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": frontend_file.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=frontend_file.media_type, headers=headers)
+
+
+@app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_frontend(full_path: str, request: Request):
+    # Prevent directory traversal
+    if ".." in full_path:
+        raise HTTPException(status_code=400, detail="Invalid path")
+
+    frontend_file = _frontend_files.get(full_path)
+    if frontend_file is None:
+        # Missing hashed assets are real 404s; anything else is an SPA route.
+        if full_path.startswith("assets/"):
+            raise HTTPException(status_code=404, detail="Not Found")
+        frontend_file = _frontend_files.get("index.html")
+        if frontend_file is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+    return frontend_response(frontend_file, request)
+
+
+_startup_phases["module_init"] = round(time.perf_counter() - _MODULE_STARTED, 4)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Re-rank archived scans against the current certs.json.
+
+Needs scans saved with POSTING_ARCHIVE=true. An interrupted run resumes where
+it stopped as long as certs.json hasn't changed since.
+
+Usage (from backend/):
+    python reanalyze.py [--executor process] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import Any, Dict
+
+import main
+
+
+def _print_progress(state: Dict[str, Any]) -> None:
+    print(f"  {state['done']}/{state['total']} scans", flush=True)
+
+
+async def _run() -> Dict[str, Any]:
+    main.init_db()
+    try:
+        state = main.begin_reanalysis()
+        print(
+            f"Re-analyzing {state['total'] - state['done']} of {state['total']} "
+            f"archived scans (dictionary {state['dict_version']})"
+        )
+        return await main.run_reanalysis(progress=_print_progress)
+    finally:
+        main.shutdown_extraction_executor()
+        main.close_db()
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--executor",
+        choices=("thread", "process"),
+        default="process",
+        help="extraction pool type (default: process, to use every core)",
+    )
+    parser.add_argument("--workers", type=int, default=0, help="pool size (0 = CPUs)")
+    args = parser.parse_args()
+
+    main.settings.extraction_executor = args.executor
+    main.settings.extraction_workers = args.workers or None
+    state = asyncio.run(_run())
+    if state["status"] != "done":
+        print(f"Re-analysis {state['status']}: {state.get('error') or ''}")
+        return 1
+    print(f"Done: {state['done']} scans re-ranked")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
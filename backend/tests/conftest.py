@@ -3,6 +3,18 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
+import pytest
+
 BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path, monkeypatch):
+    """Keep tests away from the real ~/.intelijob scan database."""
+    import main
+
+    monkeypatch.setattr(main, "DB_PATH", tmp_path / "scans.db")
+    monkeypatch.setattr(main, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(main, "_query_cache_stats", {"hits": 0, "misses": 0})
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import json
 from collections.abc import Generator
 from datetime import datetime, timedelta, timezone
 import pytest
@@ -47,6 +48,7 @@ def test_analyze(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
                 }
             ],
             [job_title],
+            {job_title: 1},
         )
 
     monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
@@ -80,7 +82,7 @@ def test_time_range_mapping_30d_uses_month(
         date_posted: str = "today",
     ):
         captured["date_posted"] = date_posted
-        return ([], [job_title])
+        return ([], [job_title], {})
 
     monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
 
@@ -185,6 +187,7 @@ def test_analyze_counts_duplicate_title_company_postings_separately(
                 },
             ],
             [job_title],
+            {job_title: 1},
         )
 
     monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
@@ -237,7 +240,7 @@ async def test_fetch_jobs_expanded_does_not_collapse_same_title_company_without_
     monkeypatch.setattr(main, "get_search_queries", lambda title: [title])
     monkeypatch.setattr(main, "fetch_jobs_single", fake_fetch_jobs_single)
 
-    jobs, _queries = await main.fetch_jobs_expanded("Cybersecurity Analyst")
+    jobs, _queries, _pages = await main.fetch_jobs_expanded("Cybersecurity Analyst")
 
     assert len(jobs) == 2
 
@@ -304,6 +307,7 @@ def test_analyze_echoes_personalization_fields(
                 }
             ],
             [job_title],
+            {job_title: 1},
         )
 
     monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
@@ -343,7 +347,7 @@ def test_save_scan_applies_retention_limits(
 
     conn = main._get_db()
     conn.execute(
-        "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions, cert_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions) VALUES (?, ?, ?, ?, ?, ?)",
         (
             (datetime.now(timezone.utc) - timedelta(days=90)).isoformat(),
             "Old Role",
@@ -351,7 +355,6 @@ def test_save_scan_applies_retention_limits(
             "30d",
             1,
             1,
-            "[]",
         ),
     )
     conn.commit()
@@ -379,7 +382,7 @@ def test_save_scan_retention_can_be_disabled(
 
     conn = main._get_db()
     conn.execute(
-        "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions, cert_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions) VALUES (?, ?, ?, ?, ?, ?)",
         (
             (datetime.now(timezone.utc) - timedelta(days=3650)).isoformat(),
             "Very Old Role",
@@ -387,7 +390,6 @@ def test_save_scan_retention_can_be_disabled(
             "30d",
             1,
             1,
-            "[]",
         ),
     )
     conn.commit()
@@ -402,3 +404,1361 @@ def test_save_scan_retention_can_be_disabled(
     conn.close()
 
     assert [row["job_title"] for row in rows] == ["Newest Role", "Very Old Role"]
+
+
+def test_extract_certs_tolerates_whitespace_in_full_names() -> None:
+    text = "Must hold the Certified\n  Information Systems   Security Professional."
+
+    certs = main.extract_certs(text, "Role", "Acme")
+
+    assert [item["name"] for item in certs] == ["CISSP"]
+
+
+def test_extract_certs_reports_each_cert_once_in_dictionary_order() -> None:
+    text = "CCNA Security, CISSP, cissp, CKAD and CompTIA Security+ preferred."
+
+    names = [item["name"] for item in main.extract_certs(text, "Role", "Acme")]
+
+    order = list(main.get_cert_index().dictionary)
+    assert names == sorted(names, key=order.index)
+    assert len(names) == len(set(names))
+    assert {"CISSP", "Security+", "CCNA", "CCNA Security", "CKAD"} <= set(names)
+    assert "CKA" not in names
+
+
+def test_fetch_jobs_single_reuses_injected_shared_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Every scan should go through the one shared client installed on the app."""
+    import httpx
+
+    seen_queries: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_queries.append(request.url.params["query"])
+        return httpx.Response(
+            200,
+            json={
+                "data": [
+                    {
+                        "job_id": request.url.params["query"],
+                        "job_title": "SOC Analyst",
+                        "job_description": "Security+ required",
+                    }
+                ]
+            },
+        )
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    shared = main.build_http_client(transport=httpx.MockTransport(handler))
+    main.set_http_client(shared)
+
+    with TestClient(main.app) as api_client:
+        assert main.get_http_client() is shared
+        for _ in range(2):
+            response = api_client.post(
+                "/analyze-jobs", json={"job_title": "SOC Analyst", "time_range": "1d"}
+            )
+            response.raise_for_status()
+            assert response.json()["success"] is True
+
+    assert sorted(seen_queries) == sorted(main.get_search_queries("SOC Analyst") * 2)
+    assert shared.is_closed
+
+
+def test_query_cache_serves_repeat_queries_until_ttl_expires(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Repeat scans should be answered from the SQLite cache, then refetched."""
+    import httpx
+
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["query"])
+        return httpx.Response(200, json={"data": [{"job_id": "job-1"}]})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    main.set_http_client(main.build_http_client(transport=httpx.MockTransport(handler)))
+
+    with TestClient(main.app) as api_client:
+        for _ in range(2):
+            api_client.post(
+                "/analyze-jobs", json={"job_title": "Unknown Role", "time_range": "1d"}
+            ).raise_for_status()
+        health = api_client.get("/health").json()
+
+        assert calls == ["Unknown Role"]
+        assert health["query_cache"]["hits"] == 1
+        assert health["query_cache"]["misses"] == 1
+
+        monkeypatch.setitem(main.QUERY_CACHE_TTL_SECONDS, "today", -1)
+        main.query_cache_put(
+            main._query_cache_key("Unknown Role", None, "today", 1, 10), "today", []
+        )
+        api_client.post(
+            "/analyze-jobs", json={"job_title": "Unknown Role", "time_range": "1d"}
+        ).raise_for_status()
+
+    assert calls == ["Unknown Role", "Unknown Role"]
+
+
+def test_query_cache_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 2)
+
+    main.query_cache_put("a", "month", [{"job_id": "a"}])
+    main.query_cache_put("b", "month", [{"job_id": "b"}])
+    assert main.query_cache_get("a") == [{"job_id": "a"}]
+    main.query_cache_put("c", "month", [{"job_id": "c"}])
+
+    assert main.query_cache_get("b") is None
+    assert main.query_cache_get("a") is not None
+    assert main.query_cache_get("c") is not None
+
+
+def test_query_cache_evicts_least_recently_used_beyond_byte_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main.settings, "query_cache_max_mb", 1)
+    page = [{"job_id": "x", "job_description": "d" * (400 * 1024)}]
+
+    for key in ("a", "b", "c"):
+        main.query_cache_put(key, "month", page)
+    assert main.get_query_cache_size()["entries"] == 2
+    assert main.query_cache_get("a") is None
+
+    # Replacing a payload resizes the running total instead of adding to it.
+    main.query_cache_put("c", "month", [])
+    assert main.get_query_cache_size() == {
+        "entries": 2,
+        "bytes": len(json.dumps(page)) + len("[]"),
+    }
+
+
+def test_analyze_stream_emits_progress_then_final_result(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Streaming mode should report each query, then the usual response shape."""
+    import json
+
+    async def fake_fetch_jobs_single(
+        client, query: str, location: str | None = None, date_posted: str = "today"
+    ):
+        return [
+            {
+                "job_id": f"{query}-1",
+                "job_title": query,
+                "company_name": "Acme Corp",
+                "job_description": f"Security+ required for {query}",
+            },
+            {
+                "job_id": "shared-posting",
+                "job_title": query,
+                "company_name": "Acme Corp",
+                "job_description": "CISSP preferred",
+            },
+        ]
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main, "fetch_jobs_single", fake_fetch_jobs_single)
+
+    with client.stream(
+        "POST",
+        "/analyze-jobs/stream",
+        json={"job_title": "SOC Analyst", "time_range": "1d"},
+    ) as response:
+        response.raise_for_status()
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    queries = main.get_search_queries("SOC Analyst")
+    progress = [e for e in events if e["event"] == "progress"]
+    assert [e["queries_done"] for e in progress] == list(range(1, len(queries) + 1))
+    assert sorted(e["query"] for e in progress) == sorted(queries)
+    assert progress[0]["data"]["total_jobs_found"] == 2
+
+    final = events[-1]
+    assert final["event"] == "result"
+    assert final["success"] is True
+    assert final["jobs_analyzed"] == len(queries) + 1
+    assert set(final) >= {"success", "message", "data", "jobs_analyzed"}
+    assert main.get_scan_history()[0]["job_title"] == "SOC Analyst"
+
+
+def test_analyze_stream_reports_upstream_quota_errors(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import json
+
+    async def fake_fetch_jobs_single(client, query, location=None, date_posted="today"):
+        raise main.HTTPException(status_code=429, detail="quota")
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main, "fetch_jobs_single", fake_fetch_jobs_single)
+
+    response = client.post(
+        "/analyze-jobs/stream", json={"job_title": "SOC Analyst", "time_range": "1d"}
+    )
+
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events == [{"event": "error", "status": 429, "detail": "quota"}]
+
+
+def _cert(name: str, count: int, percentage: float, sources: tuple = ()) -> dict:
+    return {
+        "name": name,
+        "full_name": name,
+        "org": "",
+        "count": count,
+        "percentage": percentage,
+        "sources": list(sources),
+    }
+
+
+def test_stats_reads_aggregates_maintained_by_save_scan(client: TestClient) -> None:
+    main.save_scan("SOC Analyst", None, "1d", 10, 10, [_cert("Security+", 5, 50.0)])
+    main.save_scan(
+        "SOC Analyst",
+        None,
+        "1d",
+        4,
+        4,
+        [_cert("Security+", 1, 25.0), _cert("CISSP", 3, 75.0)],
+    )
+
+    stats = client.get("/stats").json()["stats"]
+
+    assert stats["total_scans"] == 2
+    assert stats["total_jobs_scanned"] == 14
+    by_name = {c["name"]: c for c in stats["all_time_certs"]}
+    assert by_name["Security+"]["total_mentions"] == 6
+    assert by_name["Security+"]["scans_appeared"] == 2
+    assert by_name["Security+"]["avg_percentage"] == 37.5
+    assert by_name["Security+"]["latest_percentage"] == 25.0
+    assert [c["name"] for c in stats["all_time_certs"]] == ["CISSP", "Security+"]
+    assert stats["trend_data"][1]["CISSP"] == 75.0
+
+
+def test_stats_downsamples_each_role_series_with_jobs_weighting(
+    client: TestClient,
+) -> None:
+    for jobs, pct in [(10, 50.0), (30, 10.0), (20, 40.0), (20, 20.0), (5, 0.0)]:
+        main.save_scan("SOC Analyst", None, "1d", jobs, jobs, [_cert("CISSP", 1, pct)])
+    main.save_scan("Pentester", None, "1d", 8, 8, [_cert("OSCP", 2, 25.0)])
+
+    full = client.get("/stats").json()["stats"]["trend_data"]
+    sampled = client.get("/stats", params={"points": 2}).json()["stats"]["trend_data"]
+
+    assert len(full) == 6
+    soc = [row for row in sampled if row["job_title"] == "SOC Analyst"]
+    assert [(row["jobs"], row["scans"]) for row in soc] == [(40, 2), (45, 3)]
+    assert [row["CISSP"] for row in soc] == [20.0, 26.7]
+    assert [row["job_title"] for row in sampled][-1] == "Pentester"
+    assert client.get("/stats", params={"points": 1}).status_code == 422
+
+
+def test_history_keeps_sources_and_cert_series_reads_the_cert_index(
+    client: TestClient,
+) -> None:
+    source = {"title": "SOC Analyst", "company": "Acme", "url": "https://example.com/1"}
+    first = main.save_scan("SOC Analyst", None, "1d", 4, 4, [_cert("CISSP", 2, 50.0, [source])])
+    main.save_scan("Pentester", None, "1d", 2, 2, [_cert("OSCP", 1, 50.0)])
+    last = main.save_scan(
+        "SOC Analyst", None, "1d", 5, 5, [_cert("Security+", 3, 60.0), _cert("CISSP", 1, 20.0)]
+    )
+
+    history = client.get("/history").json()["history"]
+    assert history[-1]["cert_data"] == [_cert("CISSP", 2, 50.0, [source])]
+
+    series = client.get("/stats/certs/CISSP").json()["series"]
+    assert [(row["scan_id"], row["rank"], row["percentage"]) for row in series] == [
+        (first, 1, 50.0),
+        (last, 2, 20.0),
+    ]
+    latest = client.get("/stats/certs/CISSP", params={"limit": 1}).json()["series"]
+    assert [row["scan_id"] for row in latest] == [last]
+    assert client.get("/stats/certs/CCNA").status_code == 404
+
+    plan = " ".join(
+        row["detail"]
+        for row in main._get_db().execute(
+            "EXPLAIN QUERY PLAN SELECT sc.percentage FROM scan_certs sc WHERE sc.cert = ? ORDER BY sc.scan_id DESC",
+            ("CISSP",),
+        )
+    )
+    assert "idx_scan_certs_cert" in plan
+
+
+def test_retention_backs_pruned_scans_out_of_aggregates(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.settings, "max_scan_rows", 1)
+
+    main.save_scan("Old", None, "1d", 1, 1, [_cert("CISSP", 1, 100.0)])
+    main.save_scan("New", None, "1d", 2, 2, [_cert("Security+", 1, 50.0)])
+
+    stats = client.get("/stats").json()["stats"]
+
+    assert stats["total_scans"] == 1
+    assert [c["name"] for c in stats["all_time_certs"]] == ["Security+"]
+
+
+def test_legacy_cert_data_blobs_migrate_to_scan_certs() -> None:
+    import json
+    import sqlite3
+
+    conn = sqlite3.connect(str(main.DB_PATH))
+    conn.execute(
+        "CREATE TABLE scans (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, job_title TEXT NOT NULL, location TEXT, time_range TEXT, total_jobs INTEGER, jobs_with_descriptions INTEGER, cert_data TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO scans (timestamp, job_title, location, time_range, total_jobs, jobs_with_descriptions, cert_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            datetime.now(timezone.utc).isoformat(),
+            "Legacy",
+            None,
+            "1d",
+            5,
+            5,
+            json.dumps([_cert("CISM", 2, 40.0)]),
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+    with TestClient(main.app) as client:
+        stats = client.get("/stats").json()["stats"]
+
+    assert stats["all_time_certs"][0]["name"] == "CISM"
+    assert stats["all_time_certs"][0]["avg_percentage"] == 40.0
+    assert stats["trend_data"][0]["CISM"] == 40.0
+
+    history = main.get_scan_history()
+    assert history[0]["job_title"] == "Legacy"
+    assert history[0]["cert_data"] == [_cert("CISM", 2, 40.0)]
+
+    conn = main._get_db()
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(scans)")}
+    conn.close()
+    assert "cert_data" not in columns
+
+
+def test_db_connection_is_reused_per_thread_in_wal_mode() -> None:
+    import threading
+
+    conn = main._get_db()
+    assert main._get_db() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other: list = []
+    worker = threading.Thread(target=lambda: other.append(main._get_db()))
+    worker.start()
+    worker.join()
+    assert other[0] is not conn
+
+    conn.close()
+    reopened = main._get_db()
+    assert reopened is not conn
+    assert reopened.execute("SELECT COUNT(*) FROM scans").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_analyze_postings_async_matches_inline_order(
+    monkeypatch: pytest.MonkeyPatch, executor: str
+) -> None:
+    """Pooled extraction should merge chunk results back in the original order."""
+    import asyncio
+
+    names = list(main.get_cert_index().dictionary)
+    jobs = [
+        {
+            "job_id": f"job-{i}",
+            "job_title": "Analyst",
+            "company_name": "Acme",
+            "job_description": "" if i % 7 == 0 else f"<p>{names[i % len(names)]}</p>",
+        }
+        for i in range(45)
+    ]
+    monkeypatch.setattr(main.settings, "extraction_executor", executor)
+    monkeypatch.setattr(main.settings, "extraction_workers", 2)
+    monkeypatch.setattr(main.settings, "extraction_chunk_size", 8)
+    monkeypatch.setattr(main.settings, "extraction_inline_max", 10)
+    main.shutdown_extraction_executor()
+
+    try:
+        pooled = asyncio.run(main.analyze_postings_async(jobs))
+    finally:
+        main.shutdown_extraction_executor()
+
+    assert pooled == main.analyze_postings(jobs)
+
+
+def test_page_parallel_fetch_stops_on_short_or_duplicate_pages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    import httpx
+
+    requested: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        assert request.url.params["num_pages"] == "1"
+        requested.append(page)
+        size = 4 if page == 3 else 10
+        jobs = [{"job_id": f"p{page}-{i}"} for i in range(size)]
+        return httpx.Response(200, json={"data": jobs})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "jsearch_page_parallel", True)
+    monkeypatch.setattr(main.settings, "jsearch_page_concurrency", 2)
+    main.set_http_client(main.build_http_client(transport=httpx.MockTransport(handler)))
+
+    with TestClient(main.app) as api_client:
+        response = api_client.post(
+            "/analyze-jobs", json={"job_title": "Unknown Role", "time_range": "1d"}
+        )
+
+    data = response.json()["data"]
+    assert sorted(requested) == [1, 2, 3, 4]
+    assert data["pages_fetched"] == {"Unknown Role": 4}
+    assert data["total_jobs_found"] == 34
+
+    requested.clear()
+
+    def duplicate_handler(request: httpx.Request) -> httpx.Response:
+        requested.append(int(request.url.params["page"]))
+        return httpx.Response(200, json={"data": [{"job_id": f"same-{i}"} for i in range(10)]})
+
+    async def fetch_other_role():
+        async with main.build_http_client(
+            transport=httpx.MockTransport(duplicate_handler)
+        ) as other_client:
+            return await main.fetch_query(other_client, "Other Role")
+
+    jobs, pages = asyncio.run(fetch_other_role())
+    assert pages == 2
+    assert len(jobs) == 10
+
+    # Pages served from the query cache cost no upstream calls.
+    requested.clear()
+    jobs, pages = asyncio.run(fetch_other_role())
+    assert (requested, pages, len(jobs)) == ([], 0, 10)
+
+    # A single multi-page call estimates the pages its results fill.
+    monkeypatch.setattr(main.settings, "jsearch_page_parallel", False)
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+
+    def sequential_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": [{"job_id": f"s{i}"} for i in range(23)]})
+
+    async def fetch_sequential():
+        async with main.build_http_client(
+            transport=httpx.MockTransport(sequential_handler)
+        ) as other_client:
+            return await main.fetch_query(other_client, "Sequential Role")
+
+    jobs, pages = asyncio.run(fetch_sequential())
+    assert (len(jobs), pages) == (23, 3)
+
+
+def test_analyze_collapses_reposted_descriptions(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The same description under different IDs should only be counted once."""
+    description = "Security+ required. Join our SOC team to triage alerts."
+
+    async def fake_fetch_jobs_expanded(
+        job_title: str, location: str | None = None, date_posted: str = "today"
+    ):
+        return (
+            [
+                {"job_id": "a", "job_title": job_title, "job_description": description},
+                {
+                    "job_id": "b",
+                    "job_title": job_title,
+                    "job_description": f"<p>{description.upper()}</p>\n",
+                },
+                {"job_id": "c", "job_title": job_title, "job_description": "CISSP needed"},
+            ],
+            [job_title],
+            {job_title: 1},
+        )
+
+    monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
+
+    response = client.post(
+        "/analyze-jobs", json={"job_title": "SOC Analyst", "time_range": "1d"}
+    )
+
+    data = response.json()["data"]
+    assert data["duplicates_collapsed"] == 1
+    assert data["jobs_with_descriptions"] == 2
+    sec = next(i for i in data["certifications"]["items"] if i["name"] == "Security+")
+    assert sec["percentage"] == 50.0
+
+
+def test_analyze_skips_reposts_before_matching_and_cleans_once(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Reposts are dropped on cached fingerprints before the cert matcher runs."""
+    jobs = [
+        {
+            "job_id": f"j{i}",
+            "job_title": "SOC Analyst",
+            "job_description": f"Security+ required. Posting {i // 2}.",
+        }
+        for i in range(10)
+    ]
+
+    async def fake_fetch_jobs_expanded(
+        job_title: str, location: str | None = None, date_posted: str = "today"
+    ):
+        return [dict(job) for job in jobs], [job_title], {job_title: 1}
+
+    monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
+    calls = []
+    matched = []
+    real_clean_text = main.clean_text
+    real_match_cert_names = main.match_cert_names
+
+    def counting_clean_text(text: str, lower: bool = False) -> str:
+        calls.append(text)
+        return real_clean_text(text, lower)
+
+    def counting_match_cert_names(text: str, lowered: bool = False) -> list[str]:
+        matched.append(text)
+        return real_match_cert_names(text, lowered)
+
+    monkeypatch.setattr(main, "clean_text", counting_clean_text)
+    monkeypatch.setattr(main, "match_cert_names", counting_match_cert_names)
+    body = {"job_title": "SOC Analyst", "time_range": "1d"}
+
+    # Reposts share a raw description, so each distinct one is cleaned once
+    # and only the kept postings reach the matcher.
+    cold = client.post("/analyze-jobs", json=body).json()["data"]
+    assert len(calls) == 5
+    assert len(matched) == 5
+    assert cold["duplicates_collapsed"] == 5
+
+    calls.clear()
+    matched.clear()
+    warm = client.post("/analyze-jobs", json=body).json()["data"]
+    assert calls == [] and matched == []
+    assert warm["duplicates_collapsed"] == 5
+    assert warm["certifications"] == cold["certifications"]
+
+
+def test_description_index_detects_near_duplicates_only_when_enabled() -> None:
+    import random
+
+    rng = random.Random(3)
+    vocab = [f"word{i}" for i in range(5000)]
+    words = [rng.choice(vocab) for _ in range(400)]
+    original = {"job_description": " ".join(words)}
+    words[200] = "edited"
+    edited = {"job_description": " ".join(words)}
+    unrelated = {"job_description": " ".join(rng.choice(vocab) for _ in range(400))}
+
+    def add(index: main.DescriptionIndex, job: dict) -> bool:
+        [(fingerprint, sim, _)] = main.fingerprint_descriptions(
+            [job["job_description"]], index.needs_simhash
+        )
+        return index.add_fingerprint(fingerprint, sim)
+
+    exact_only = main.DescriptionIndex(max_distance=0)
+    assert [add(exact_only, j) for j in (original, edited, original)] == [True, True, False]
+
+    near = main.DescriptionIndex(max_distance=6)
+    assert [add(near, j) for j in (original, edited, unrelated)] == [True, False, True]
+    assert near.duplicates == 1
+
+
+def test_extraction_cache_reuses_results_until_dictionary_changes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    name = next(iter(main.get_cert_index().dictionary))
+    jobs = [
+        {"job_id": "a", "job_title": "Analyst", "job_description": f"<p>{name}</p>"},
+        {"job_id": "b", "job_title": "Analyst", "job_description": "nothing here"},
+        {"job_id": "c", "job_title": "Analyst", "job_description": ""},
+    ]
+    expected = main.analyze_postings(jobs)
+    assert asyncio.run(main.analyze_postings_async(jobs)) == expected
+
+    def fail(text: str, lower: bool = False) -> str:
+        raise AssertionError("cached postings should not be cleaned again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main, "clean_text", fail)
+        assert asyncio.run(main.analyze_postings_async(jobs)) == expected
+
+    # An edited description or a new certs.json misses the cache.
+    edited = [dict(jobs[0], job_description="no certs now")]
+    assert asyncio.run(main.analyze_postings_async(edited))[1] == [[]]
+    monkeypatch.setattr(main.get_cert_index(), "version", "changed")
+    assert main.extraction_cache_get([main.extraction_cache_key(jobs[1])]) == {}
+
+
+def test_extraction_cache_evicts_least_recently_used(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main.settings, "extraction_cache_max_entries", 2)
+
+    main.extraction_cache_put({"a": ["A"]})
+    main.extraction_cache_put({"b": ["B"]})
+    assert main.extraction_cache_get(["a"]) == {"a": ["A"]}
+    main.extraction_cache_put({"c": ["C"]})
+    main.extraction_cache_put({"c": ["C2"]})
+
+    assert main.extraction_cache_get(["a", "b", "c"]) == {"a": ["A"], "c": ["C2"]}
+    # Upserts and evictions keep the trigger-maintained count exact.
+    conn = main._get_db()
+    assert conn.execute("SELECT entries FROM extraction_cache_totals").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0] == 2
+
+
+def test_posting_archive_dedups_and_streams_scan_postings(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.settings, "posting_archive", True)
+    monkeypatch.setattr(main, "_ARCHIVE_READ_BATCH", 2)
+
+    def save(job_ids: list[str]) -> int:
+        jobs = [
+            {"job_id": job_id, "job_title": "Analyst", "job_description": "x" * 500}
+            for job_id in job_ids
+        ]
+        return main.save_scan("Analyst", None, "1d", len(jobs), len(jobs), [], jobs)
+
+    first = save(["a", "b", "c"])
+    second = save(["b", "c", "d", "d"])
+
+    assert main.get_archive_stats()["postings"] == 4
+    response = client.get(f"/history/{second}/postings")
+    response.raise_for_status()
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert [job["job_id"] for job in streamed] == ["b", "c", "d"]
+    assert [job["job_id"] for job in main.iter_archived_postings(first)] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert client.get("/history/999/postings").status_code == 404
+
+
+def test_posting_archive_keeps_the_whole_fetch_and_flags_ranked_postings(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.settings, "posting_archive", True)
+    description = "Security+ required for the SOC team."
+
+    async def fake_fetch_jobs_expanded(
+        job_title: str, location: str | None = None, date_posted: str = "today"
+    ):
+        jobs = [
+            {"job_id": "a", "job_title": job_title, "job_description": description},
+            {"job_id": "repost", "job_title": job_title, "job_description": description},
+            {
+                "job_id": "stale",
+                "job_title": job_title,
+                "job_description": "CISSP needed",
+                "job_posted_at_timestamp": 0,
+            },
+        ]
+        return jobs, [job_title], {job_title: 1}
+
+    monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
+    client.post("/analyze-jobs", json={"job_title": "SOC Analyst", "time_range": "1d"})
+    scan_id = main.get_scan_history()[0]["id"]
+
+    def archived(**params) -> list[str]:
+        response = client.get(f"/history/{scan_id}/postings", params=params)
+        return sorted(json.loads(line)["job_id"] for line in response.text.splitlines())
+
+    assert archived() == ["a", "repost", "stale"]
+    assert archived(kept_only=True) == ["a"]
+
+    # Pruning the scan drops the postings only it linked, without a full sweep.
+    monkeypatch.setattr(main.settings, "max_scan_rows", 1)
+    main.save_scan("Other", None, "1d", 1, 1, [], [{"job_id": "a", "job_title": "x"}])
+    assert [job["job_id"] for job in main.iter_archived_postings()] == ["a"]
+    assert main.get_archive_stats()["postings"] == 1
+
+
+def test_posting_archive_evicts_oldest_beyond_size_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main.settings, "posting_archive_retention_days", 0)
+    monkeypatch.setattr(main.settings, "posting_archive_max_mb", 1)
+    conn = main._get_db()
+    with conn:
+        for scan_id, key in enumerate(["old", "mid", "new"], start=1):
+            timestamp = f"2026-01-0{scan_id}T00:00:00+00:00"
+            main._archive_postings(conn, scan_id, timestamp, [{"job_id": key}])
+        # Pretend each posting is half a megabyte so only two fit the budget.
+        conn.execute("UPDATE postings SET size = ?", (512 * 1024,))
+        main._apply_archive_retention(conn)
+
+    assert [job["job_id"] for job in main.iter_archived_postings()] == ["mid", "new"]
+    assert main.get_archive_stats() == {"postings": 2, "compressed_bytes": 1024 * 1024}
+    linked = conn.execute("SELECT scan_id FROM scan_postings ORDER BY scan_id")
+    assert [row[0] for row in linked] == [2, 3]
+
+
+def test_posting_archive_evicts_whole_scans(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A scan that loses one posting must not be re-ranked from the rest."""
+    monkeypatch.setattr(main.settings, "posting_archive_retention_days", 0)
+    monkeypatch.setattr(main.settings, "posting_archive_max_mb", 1)
+    conn = main._get_db()
+    with conn:
+        main._archive_postings(
+            conn, 1, "2026-01-01T00:00:00+00:00", [{"job_id": "a"}, {"job_id": "b"}]
+        )
+        main._archive_postings(
+            conn, 2, "2026-01-02T00:00:00+00:00", [{"job_id": "b"}, {"job_id": "c"}]
+        )
+        conn.execute("UPDATE postings SET size = ?", (512 * 1024,))
+        main._apply_archive_retention(conn)
+
+    linked = conn.execute("SELECT scan_id, job_key FROM scan_postings ORDER BY job_key")
+    assert [tuple(row) for row in linked] == [(2, "b"), (2, "c")]
+    assert list(main.iter_archived_postings(1)) == []
+    assert main.get_archive_stats()["postings"] == 2
+
+
+def test_reanalysis_resumes_and_swaps_refreshed_ranks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    monkeypatch.setattr(main, "REANALYSIS_CHUNK_SCANS", 1)
+    name = next(iter(main.get_cert_index().dictionary))
+    jobs = [{"job_id": "a", "job_title": "Analyst", "job_description": name}]
+    # Saved before the cert was in the dictionary: no ranks recorded.
+    first = main.save_scan("Analyst", None, "1d", 1, 1, [], jobs)
+    second = main.save_scan("Analyst", None, "1d", 1, 1, [], jobs)
+
+    def interrupt(state: dict) -> None:
+        raise asyncio.CancelledError
+
+    main.begin_reanalysis()
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main.run_reanalysis(progress=interrupt))
+    state = main.get_reanalysis_status()
+    assert (state["status"], state["done"], state["total"]) == ("interrupted", 1, 2)
+    assert main.get_scan_history()[0]["cert_data"] == []
+
+    assert main.begin_reanalysis()["done"] == 1
+    assert asyncio.run(main.run_reanalysis())["status"] == "done"
+
+    history = {scan["id"]: scan["cert_data"] for scan in main.get_scan_history()}
+    for scan_id in (first, second):
+        assert [(c["name"], c["percentage"]) for c in history[scan_id]] == [
+            (name, 100.0)
+        ]
+    stats = main._get_db().execute("SELECT * FROM cert_stats").fetchall()
+    assert [(row["name"], row["scans_appeared"]) for row in stats] == [(name, 2)]
+
+
+def test_reanalyze_endpoint_requires_admin_key(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.settings, "admin_api_key", "secret")
+
+    assert client.post("/admin/reanalyze").status_code == 401
+    response = client.post("/admin/reanalyze", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 202
+    assert response.json()["dict_version"] == main.get_cert_index().version
+
+
+def test_jsearch_calls_retry_429_and_5xx_but_not_long_quota_waits(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    import httpx
+    from fastapi import HTTPException
+
+    replies = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"data": [{"job_id": "ok"}]}),
+        httpx.Response(429, headers={"Retry-After": "3600"}),
+    ]
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return replies[len(calls) - 1]
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    monkeypatch.setattr(main.settings, "jsearch_retry_base_seconds", 0.01)
+    client = main.build_http_client(transport=httpx.MockTransport(handler))
+
+    async def run() -> None:
+        assert await main.fetch_jobs_single(client, "a") == [{"job_id": "ok"}]
+        assert main.get_jsearch_scheduler().stats["throttled"] == 1
+        with pytest.raises(HTTPException) as error:
+            await main.fetch_jobs_single(client, "b")
+        assert error.value.status_code == 429
+        await client.aclose()
+
+    asyncio.run(run())
+    assert len(calls) == 4
+
+
+def test_jsearch_scheduler_serves_priority_and_paces_requests() -> None:
+    import asyncio
+
+    async def run() -> tuple[list[str], float]:
+        scheduler = main.JSearchScheduler(rate=20, burst=1, max_concurrency=1)
+        order: list[str] = []
+
+        async def call(name: str, priority: int) -> None:
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        started = scheduler.loop.time()
+        await asyncio.gather(
+            call("first", main.PRIORITY_INTERACTIVE),
+            call("background", main.PRIORITY_BACKGROUND),
+            call("interactive", main.PRIORITY_INTERACTIVE),
+        )
+        return order, scheduler.loop.time() - started
+
+    order, elapsed = asyncio.run(run())
+    assert order == ["first", "interactive", "background"]
+    assert elapsed >= 0.09  # two refills at 20 tokens/second
+
+
+def test_jsearch_scheduler_without_rate_limit_only_caps_concurrency() -> None:
+    import asyncio
+
+    async def run() -> tuple[int, int]:
+        scheduler = main.JSearchScheduler(rate=0, burst=1, max_concurrency=4)
+        active = peak = 0
+
+        async def call() -> None:
+            nonlocal active, peak
+            async with scheduler.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        scheduler.pause(0.01)  # queue every waiter, then release them together
+        await asyncio.wait_for(asyncio.gather(*(call() for _ in range(10))), 1)
+        return peak, scheduler.stats["granted"]
+
+    assert asyncio.run(run()) == (4, 10)
+
+
+def test_identical_concurrent_scans_share_one_fetch_and_scan_row(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    import httpx
+
+    calls: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["query"])
+        await asyncio.sleep(0.05)
+        job = {
+            "job_id": request.url.params["query"],
+            "job_title": "SOC Analyst",
+            "job_description": "Security+ required",
+        }
+        return httpx.Response(200, json={"data": [job]})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    client = main.build_http_client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "get_http_client", lambda: client)
+
+    payloads = [
+        main.JobSearchRequest(job_title="SOC Analyst", time_range="1d", owned_certs=[]),
+        main.JobSearchRequest(
+            job_title=" soc analyst", time_range="1d", owned_certs=["Security+"]
+        ),
+    ]
+
+    async def run() -> list:
+        results = await asyncio.gather(*(main.analyze_scan(p) for p in payloads))
+        await client.aclose()
+        return results
+
+    first, second = asyncio.run(run())
+
+    assert sorted(calls) == sorted(main.get_search_queries("SOC Analyst"))
+    assert len(main.get_scan_history()) == 1
+    assert first.data["certifications"] == second.data["certifications"]
+    assert first.data["search_criteria"]["owned_certs"] == []
+    assert second.data["search_criteria"]["owned_certs"] == ["Security+"]
+
+
+def test_identical_concurrent_streams_share_one_scan_and_fan_out_events(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    import httpx
+
+    calls: list[str] = []
+    queries = main.get_search_queries("SOC Analyst")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["query"])
+        # Stagger the queries so the second caller joins between progress events.
+        await asyncio.sleep(0.05 * (queries.index(request.url.params["query"]) + 1))
+        job = {
+            "job_id": request.url.params["query"],
+            "job_title": "SOC Analyst",
+            "job_description": f"Security+ required ({request.url.params['query']})",
+        }
+        return httpx.Response(200, json={"data": [job]})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    client = main.build_http_client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "get_http_client", lambda: client)
+    extracted: list[int] = []
+    real_match = main.match_descriptions
+
+    def counting_match(items: list) -> list:
+        extracted.append(len(items))
+        return real_match(items)
+
+    monkeypatch.setattr(main, "match_descriptions", counting_match)
+
+    payloads = [
+        main.JobSearchRequest(job_title="SOC Analyst", time_range="1d", owned_certs=[]),
+        main.JobSearchRequest(
+            job_title=" soc analyst", time_range="1d", owned_certs=["Security+"]
+        ),
+    ]
+
+    async def collect(payload: main.JobSearchRequest, delay: float) -> list[dict]:
+        await asyncio.sleep(delay)  # the second caller joins mid-stream
+        return [json.loads(line) async for line in main.stream_analysis(payload)]
+
+    async def run() -> list:
+        results = await asyncio.gather(collect(payloads[0], 0), collect(payloads[1], 0.07))
+        await client.aclose()
+        return results
+
+    first, second = asyncio.run(run())
+
+    assert sorted(calls) == sorted(queries)
+    assert sum(extracted) == len(queries)
+    assert len(main.get_scan_history()) == 1
+    assert [e["event"] for e in first] == [e["event"] for e in second]
+    assert [e["event"] for e in first] == ["progress"] * len(queries) + ["result"]
+    assert first[-1]["data"]["certifications"] == second[-1]["data"]["certifications"]
+    assert first[-1]["data"]["search_criteria"]["owned_certs"] == []
+    assert second[-1]["data"]["search_criteria"]["owned_certs"] == ["Security+"]
+    assert second[0]["data"]["search_criteria"]["owned_certs"] == ["Security+"]
+
+
+def test_concurrent_scan_and_stream_share_one_flight(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A scheduled-style scan and a user stream of the same search run once."""
+    import asyncio
+
+    import httpx
+
+    calls: list[str] = []
+    queries = main.get_search_queries("SOC Analyst")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["query"])
+        await asyncio.sleep(0.05 * (queries.index(request.url.params["query"]) + 1))
+        job = {
+            "job_id": request.url.params["query"],
+            "job_title": "SOC Analyst",
+            "job_description": f"Security+ required ({request.url.params['query']})",
+        }
+        return httpx.Response(200, json={"data": [job]})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    client = main.build_http_client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(main, "get_http_client", lambda: client)
+    payload = main.JobSearchRequest(job_title="SOC Analyst", time_range="1d")
+
+    async def stream(delay: float) -> list[dict]:
+        await asyncio.sleep(delay)
+        return [json.loads(line) async for line in main.stream_analysis(payload)]
+
+    async def scan(delay: float) -> main.JobAnalysisResponse:
+        await asyncio.sleep(delay)
+        return await main.analyze_scan(payload)
+
+    async def run() -> list:
+        stream_first = await asyncio.gather(stream(0), scan(0.07))
+        scan_first = await asyncio.gather(scan(0), stream(0.07))
+        await client.aclose()
+        return [stream_first, scan_first]
+
+    (streamed, joined_scan), (scanned, joined_stream) = asyncio.run(run())
+
+    assert sorted(calls) == sorted(queries * 2)
+    assert len(main.get_scan_history()) == 2
+    assert streamed[-1]["event"] == "result"
+    assert joined_scan.data["certifications"] == streamed[-1]["data"]["certifications"]
+    assert [e["event"] for e in joined_stream] == ["result"]
+    assert joined_stream[0]["data"]["certifications"] == scanned.data["certifications"]
+
+
+def test_clean_text_decodes_entities_so_certs_still_match() -> None:
+    html = "<li>CompTIA&nbsp;Security&#43; or CISSP&amp;CISM</li>\n\t<br/>"
+
+    assert main.clean_text(html) == "CompTIA Security+ or CISSP&CISM"
+    assert main.clean_text(html, lower=True) == "comptia security+ or cissp&cism"
+    names = [c["name"] for c in main.extract_certs(main.clean_text(html), "Role")]
+    assert {"Security+", "CISSP", "CISM"} <= set(names)
+
+
+def test_due_saved_searches_run_through_scan_path_at_background_priority(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import asyncio
+
+    priorities: list[int] = []
+
+    async def fake_fetch_jobs_expanded(job_title, location=None, date_posted="today"):
+        priorities.append(main.jsearch_priority.get())
+        main.jsearch_call_counter.get()["calls"] += 2
+        job = {"job_id": "1", "job_title": job_title, "job_description": "CISSP"}
+        return [job], [job_title], {job_title: 1}
+
+    monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
+    monkeypatch.setattr(main.settings, "scheduler_jitter_seconds", 0)
+
+    created = client.post(
+        "/saved-searches",
+        json={"job_title": "SOC Analyst", "interval_minutes": 60, "daily_at": None},
+    ).json()
+    assert client.post(
+        "/saved-searches", json={"job_title": "x", "interval_minutes": 5}
+    ).status_code == 422
+
+    async def run() -> None:
+        tasks = main.start_due_saved_searches()
+        assert len(tasks) == 1
+        await asyncio.gather(*tasks)
+        assert main.start_due_saved_searches() == []  # next run is an hour away
+
+    asyncio.run(run())
+
+    assert priorities == [main.PRIORITY_BACKGROUND]
+    assert len(main.get_scan_history()) == 1
+    runs = client.get(f"/saved-searches/{created['id']}/runs").json()["runs"]
+    assert [(r["status"], r["jobs_analyzed"], r["upstream_calls"]) for r in runs] == [
+        ("success", 1, 2)
+    ]
+    search = client.get("/saved-searches").json()["saved_searches"][0]
+    assert search["last_status"] == "success"
+    assert search["next_run_at"] > search["last_run_at"]
+
+
+def test_saved_search_runs_are_skipped_over_the_daily_call_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    monkeypatch.setattr(main.settings, "scheduler_daily_call_budget", 1)
+    search = main.create_saved_search(main.SavedSearchRequest(job_title="SOC Analyst"))
+
+    run = asyncio.run(main.run_saved_search(search))
+
+    assert (run["status"], run["upstream_calls"]) == ("skipped_budget", 0)
+    assert main.get_saved_search(search["id"])["last_status"] == "skipped_budget"
+
+
+def test_daily_saved_searches_start_at_the_next_local_time(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main.settings, "scheduler_jitter_seconds", 0)
+    after = datetime(2026, 3, 1, 12, 0).astimezone()
+    search = {"daily_at": "07:30", "interval_minutes": 1440}
+
+    start = main.next_saved_search_run(search, after).astimezone()
+
+    assert (start.date(), start.hour, start.minute) == (
+        (after + timedelta(days=1)).date(),
+        7,
+        30,
+    )
+
+
+def test_batch_analysis_fetches_shared_queries_once(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import httpx
+
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = request.url.params["query"]
+        calls.append(query)
+        job = {
+            "job_id": query,
+            "job_title": query,
+            "job_description": ("CISSP" if "Austin" in query else "Security+")
+            + f" for {query}",
+        }
+        return httpx.Response(200, json={"data": [job]})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    main.set_http_client(main.build_http_client(transport=httpx.MockTransport(handler)))
+
+    family = main.get_search_queries("Cybersecurity Analyst")
+    response = client.post(
+        "/analyze-jobs/batch",
+        json={
+            "pairs": [
+                {"job_title": "Cybersecurity Analyst", "location": "Austin"},
+                {"job_title": "Security Analyst", "location": "austin "},
+                {"job_title": "Cybersecurity Analyst", "location": "Denver"},
+            ],
+            "time_range": "1d",
+        },
+    )
+    response.raise_for_status()
+    body = response.json()
+
+    assert len(calls) == len(set(calls)) == body["upstream_queries"] == 2 * len(family)
+    assert body["queries_planned"] == 2 * len(family) + 1
+    assert [p["jobs_analyzed"] for p in body["pairs"]] == [len(family), 1, len(family)]
+    assert body["pairs"][1]["data"]["certifications"]["items"][0]["name"] == "CISSP"
+    combined = body["combined"]
+    assert combined["total_jobs_found"] == 2 * len(family)
+    assert {c["name"]: c["percentage"] for c in combined["certifications"]["items"]} == {
+        "CISSP": 50.0,
+        "Security+": 50.0,
+    }
+    assert len(main.get_scan_history()) == 3
+
+
+def test_metrics_exposes_stage_route_and_upstream_histograms(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import httpx
+
+    replies = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(
+            200,
+            json={
+                "data": [
+                    {"job_id": "m1", "job_description": "CISSP required."},
+                    {"job_id": "m2", "job_description": "CISSP required."},
+                ]
+            },
+        ),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return replies.pop(0) if replies else httpx.Response(200, json={"data": []})
+
+    monkeypatch.setattr(main, "RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(main.settings, "query_cache_max_entries", 0)
+    monkeypatch.setattr(main.settings, "description_dedup", True)
+    main.set_http_client(main.build_http_client(transport=httpx.MockTransport(handler)))
+    rate_limited = main.UPSTREAM_RATE_LIMITED.value()
+    collapsed = main.POSTINGS_DEDUPED.value(reason="description")
+    saves = main.SCAN_STAGE_SECONDS.count(path="scan", stage="save")
+
+    client.post("/analyze-jobs", json={"job_title": "Metrics Probe"}).raise_for_status()
+    response = client.get("/metrics")
+    response.raise_for_status()
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert main.UPSTREAM_RATE_LIMITED.value() == rate_limited + 1
+    assert main.POSTINGS_DEDUPED.value(reason="description") == collapsed + 1
+    assert main.SCAN_STAGE_SECONDS.count(path="scan", stage="save") == saves + 1
+    text = response.text
+    assert "# TYPE intelijob_scan_stage_seconds histogram" in text
+    assert (
+        'intelijob_scan_stage_seconds_bucket{path="scan",stage="extract",le="+Inf"}'
+        in text
+    )
+    assert 'intelijob_upstream_request_seconds_count{outcome="429"}' in text
+    assert 'intelijob_db_operation_seconds_count{operation="save_scan"}' in text
+    assert (
+        'intelijob_http_request_seconds_count{method="POST",route="/analyze-jobs",status="200"}'
+        in text
+    )
+
+    # Streamed and batch scans time their stages too, once per scan.
+    for path, url, body in (
+        ("stream", "/analyze-jobs/stream", {"job_title": "Metrics Probe"}),
+        ("batch", "/analyze-jobs/batch", {"pairs": [{"job_title": "Metrics Probe"}]}),
+    ):
+        fetches = main.SCAN_STAGE_SECONDS.count(path=path, stage="fetch")
+        client.post(url, json=body).raise_for_status()
+        assert main.SCAN_STAGE_SECONDS.count(path=path, stage="fetch") == fetches + 1
+
+
+def test_profiled_stats_request_is_stored_and_listed(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import pstats
+
+    main.save_scan("SOC Analyst", None, "1d", 10, 10, [_cert("Security+", 5, 50.0)])
+    monkeypatch.setattr(main.settings, "profile_max_files", 2)
+
+    plain = client.get("/stats?points=50")
+    assert "X-Profile-Id" not in plain.headers
+    for _ in range(3):
+        response = client.get("/stats?points=50", headers={"X-Profile": "1"})
+        response.raise_for_status()
+    assert response.json() == plain.json()
+    profile_id = response.headers["X-Profile-Id"]
+
+    listed = client.get("/admin/profiles").json()["profiles"]
+    assert [p["id"] for p in listed][0] == profile_id
+    assert len(listed) == 2
+    detail = client.get(f"/admin/profiles/{profile_id}").json()
+    assert detail["endpoint"] == "stats"
+    assert detail["payload"] == {"points": 50}
+    assert "compute_aggregate_stats" in detail["summary"]
+    raw = client.get(f"/admin/profiles/{profile_id}?format=prof")
+    raw_path = main.PROFILE_DIR / "copy.prof"
+    raw_path.write_bytes(raw.content)
+    assert pstats.Stats(str(raw_path)).total_calls > 0
+    assert client.get("/admin/profiles/../scans").status_code == 404
+
+    monkeypatch.setattr(main, "ENVIRONMENT", "production")
+    monkeypatch.setattr(main.settings, "admin_api_key", "secret")
+    assert client.get("/stats?profile=1").status_code == 401
+    assert client.get("/admin/profiles").status_code == 401
+    allowed = client.get("/stats?profile=1", headers={"X-Admin-Key": "secret"})
+    assert "X-Profile-Id" in allowed.headers
+
+
+def test_profiled_scan_runs_through_the_endpoint(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fake_fetch_jobs_expanded(
+        job_title: str, location: str | None = None, date_posted: str = "today"
+    ):
+        job = {"job_id": "a", "job_title": job_title, "job_description": "CISSP"}
+        return [job], [job_title], {job_title: 1}
+
+    monkeypatch.setattr(main, "fetch_jobs_expanded", fake_fetch_jobs_expanded)
+
+    response = client.post(
+        "/analyze-jobs?profile=1", json={"job_title": "SOC Analyst", "time_range": "1d"}
+    )
+    response.raise_for_status()
+    assert response.json()["data"]["search_criteria"]["job_title"] == "SOC Analyst"
+    detail = client.get(f"/admin/profiles/{response.headers['X-Profile-Id']}").json()
+    assert detail["endpoint"] == "analyze-jobs"
+    assert "run_scan" in detail["summary"]
+
+
+def test_startup_warms_cert_matcher_in_background_and_reports_phases(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main, "_cert_index", None)
+    main.startup_ready.clear()
+
+    with TestClient(main.app) as api_client:
+        assert main.startup_ready.wait(10)
+        startup = api_client.get("/health").json()["startup"]
+
+    assert startup["ready"] is True
+    assert startup["ready_after_seconds"] > 0
+    phases = startup["phases_seconds"]
+    assert {"module_init", "database", "frontend", "scheduler", "cert_index"} <= set(phases)
+    assert main._cert_index is not None
+
+
+def test_prebuilt_cert_index_loads_and_falls_back_when_stale_or_corrupt(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "certs.json"
+    source.write_bytes(main.CERT_DICT_PATH.read_bytes())
+    index_path = tmp_path / "certs.idx"
+    built = main.write_cert_index(source, index_path)
+
+    loaded = main.load_prebuilt_cert_index(index_path, source)
+    assert loaded is not None and loaded.source == "prebuilt"
+    assert loaded.version == built.version
+    assert loaded.lookup == built.lookup
+    text = "cissp or security+ and ccna security, plus aws certified solutions architect"
+    monkeypatch.setattr(main, "_cert_index", loaded)
+    from_index = main.match_cert_names(text, lowered=True)
+    monkeypatch.setattr(main, "_cert_index", built)
+    assert main.match_cert_names(text, lowered=True) == from_index != []
+
+    monkeypatch.setattr(main, "CERT_INDEX_PATH", index_path)
+    monkeypatch.setattr(main, "CERT_DICT_PATH", source)
+    monkeypatch.setattr(main, "_cert_index", None)
+    assert main.get_cert_index().source == "prebuilt"
+
+    # Editing certs.json makes the index stale; corrupting it fails the checksum.
+    source.write_text(source.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    assert main.load_prebuilt_cert_index(index_path, source) is None
+    main.write_cert_index(source, index_path)
+    data = bytearray(index_path.read_bytes())
+    data[-1] ^= 0xFF
+    index_path.write_bytes(bytes(data))
+    assert main.load_prebuilt_cert_index(index_path, source) is None
+    monkeypatch.setattr(main, "_cert_index", None)
+    assert main.get_cert_index().source == "certs.json"
+
+
+def test_frontend_serves_precompressed_assets_with_cache_headers(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import gzip
+
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<div id=root></div>", encoding="utf-8")
+    script = b"console.log('intelijob');" * 40
+    (dist / "assets" / "index-3f2a1c.js").write_bytes(script)
+    (dist / "assets" / "index-3f2a1c.js.gz").write_bytes(gzip.compress(script))
+    monkeypatch.setattr(main, "_frontend_files", main.load_frontend_files(dist))
+    assert set(main._frontend_files) == {"index.html", "assets/index-3f2a1c.js"}
+
+    asset = client.get("/assets/index-3f2a1c.js", headers={"Accept-Encoding": "gzip"})
+    assert asset.status_code == 200
+    assert asset.headers["content-encoding"] == "gzip"
+    assert asset.content == script
+    assert asset.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in asset.headers["vary"]
+    etag = asset.headers["etag"]
+
+    revalidated = client.get(
+        "/assets/index-3f2a1c.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    plain = client.get(
+        "/assets/index-3f2a1c.js", headers={"Accept-Encoding": "br, gzip;q=0"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.content == script
+    assert plain.headers["etag"] != etag
+
+    spa = client.get("/history/route")
+    assert spa.text == "<div id=root></div>"
+    assert spa.headers["cache-control"] == "no-cache"
+    assert client.get("/assets/missing-000000.js").status_code == 404
@@ -144,7 +144,7 @@ const HistorySection: React.FC<{
 
 // ── Main Tool Page ──────────────────────────────────────────────────────────
 const ToolPage: React.FC = () => {
-  const { reportData, isLoading, error, history, historyLoading, handleScan, lastCriteria } = useJobScan();
+  const { reportData, isLoading, progress, error, history, historyLoading, handleScan, lastCriteria } = useJobScan();
   const { isOpen, onOpen, onClose } = useDisclosure();
   const [selectedScan, setSelectedScan] = useState<ScanHistoryEntry | null>(null);
 
@@ -176,11 +176,22 @@ const ToolPage: React.FC = () => {
             <Flex justify="center" py={10}>
               <VStack spacing={3}>
                 <LoadingSpinner />
-                <Text fontSize="sm" color="gray.400">Scanning jobs across related titles...</Text>
+                <Text fontSize="sm" color="gray.400">
+                  {progress
+                    ? `Scanned ${progress.queries_done} of ${progress.queries_total} related titles — ${progress.report.metadata.total_jobs_found} jobs so far...`
+                    : 'Scanning jobs across related titles...'}
+                </Text>
               </VStack>
             </Flex>
           )}
 
+          {/* Partial results while the scan streams in */}
+          {isLoading && progress && (
+            <Box bg={cardBg} p={5} borderRadius="xl" borderWidth="1px" borderColor={cardBorder} boxShadow="sm" opacity={0.8}>
+              <JobReportCard data={progress.report} criteria={lastCriteria} />
+            </Box>
+          )}
+
           {/* Results */}
           {reportData && !isLoading && (
             <Box bg={cardBg} p={5} borderRadius="xl" borderWidth="1px" borderColor={cardBorder} boxShadow="sm">
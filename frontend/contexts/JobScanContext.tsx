@@ -1,10 +1,11 @@
 import React, { createContext, useState, useCallback, useContext, useEffect, ReactNode } from 'react';
-import { fetchReport, fetchHistory, fetchStats } from '../services/JobScanService';
-import type { JobCriteria, ReportData, ScanHistoryEntry, AggregateStats } from '../types';
+import { streamReport, fetchHistory, fetchStats } from '../services/JobScanService';
+import type { JobCriteria, ReportData, ScanHistoryEntry, AggregateStats, ScanProgress } from '../types';
 
 interface JobScanContextType {
   reportData: ReportData | null;
   isLoading: boolean;
+  progress: ScanProgress | null;
   error: string | null;
   history: ScanHistoryEntry[];
   historyLoading: boolean;
@@ -21,6 +22,7 @@ const JobScanContext = createContext<JobScanContextType | undefined>(undefined);
 export const JobScanProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
   const [reportData, setReportData] = useState<ReportData | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [progress, setProgress] = useState<ScanProgress | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [history, setHistory] = useState<ScanHistoryEntry[]>([]);
   const [historyLoading, setHistoryLoading] = useState(false);
@@ -56,9 +58,10 @@ export const JobScanProvider: React.FC<{ children: ReactNode }> = ({ children })
     setIsLoading(true);
     setError(null);
     setReportData(null);
+    setProgress(null);
     setLastCriteria(criteria);
     try {
-      const data = await fetchReport(criteria);
+      const data = await streamReport(criteria, setProgress);
       setReportData(data);
       loadHistory();
       loadStats();
@@ -67,6 +70,7 @@ export const JobScanProvider: React.FC<{ children: ReactNode }> = ({ children })
       setReportData(null);
     } finally {
       setIsLoading(false);
+      setProgress(null);
     }
   }, [loadHistory, loadStats]);
 
@@ -77,7 +81,7 @@ export const JobScanProvider: React.FC<{ children: ReactNode }> = ({ children })
 
   return (
     <JobScanContext.Provider value={{
-      reportData, isLoading, error,
+      reportData, isLoading, progress, error,
       history, historyLoading,
       stats, statsLoading,
       lastCriteria,
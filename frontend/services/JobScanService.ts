@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { JobCriteria, ReportData, ScanHistoryEntry, AggregateStats } from '../types';
+import type { JobCriteria, ReportData, ScanHistoryEntry, AggregateStats, ScanProgress } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -12,40 +12,48 @@ const api = axios.create({
 
 // ── Fetch Report ────────────────────────────────────────────────────────────
 
+const toRequestBody = (criteria: JobCriteria) => ({
+  job_title: criteria.job_title,
+  location: criteria.location || null,
+  time_range: criteria.time_range || '1d',
+  target_path: criteria.target_path || null,
+  owned_certs: criteria.owned_certs || [],
+});
+
+// Maps the backend `data` block (full or partial) onto the UI report shape.
+const toReportData = (d: any): ReportData => {
+  if (!d?.certifications) {
+    throw new Error('No certification data received');
+  }
+
+  return {
+    certifications: {
+      title: d.certifications.title || 'Certification Demand',
+      items: d.certifications.items || [],
+    },
+    metadata: {
+      total_jobs_found: d.total_jobs_found,
+      jobs_with_descriptions: d.jobs_with_descriptions,
+      queries_used: d.queries_used || [],
+      pages_fetched: d.pages_fetched || {},
+      duplicates_collapsed: d.duplicates_collapsed || 0,
+      search_criteria: d.search_criteria,
+    },
+    title_distribution: d.title_distribution || [],
+    cert_pairs: d.cert_pairs || [],
+  };
+};
+
 export const fetchReport = async (criteria: JobCriteria): Promise<ReportData> => {
   try {
-    const response = await api.post('/analyze-jobs', {
-      job_title: criteria.job_title,
-      location: criteria.location || null,
-      time_range: criteria.time_range || '1d',
-      target_path: criteria.target_path || null,
-      owned_certs: criteria.owned_certs || [],
-    });
+    const response = await api.post('/analyze-jobs', toRequestBody(criteria));
 
 
     if (!response.data.success) {
       throw new Error(response.data.message || 'Analysis failed');
     }
 
-    const d = response.data.data;
-    if (!d?.certifications) {
-      throw new Error('No certification data received');
-    }
-
-    return {
-      certifications: {
-        title: d.certifications.title || 'Certification Demand',
-        items: d.certifications.items || [],
-      },
-      metadata: {
-        total_jobs_found: d.total_jobs_found,
-        jobs_with_descriptions: d.jobs_with_descriptions,
-        queries_used: d.queries_used || [],
-        search_criteria: d.search_criteria,
-      },
-      title_distribution: d.title_distribution || [],
-      cert_pairs: d.cert_pairs || [],
-    };
+    return toReportData(response.data.data);
   } catch (error: any) {
     if (axios.isAxiosError(error)) {
       const status = error.response?.status;
@@ -62,6 +70,69 @@ export const fetchReport = async (criteria: JobCriteria): Promise<ReportData> =>
   }
 };
 
+// ── Stream Report ───────────────────────────────────────────────────────────
+// Reads NDJSON from /analyze-jobs/stream: a `progress` event per finished query
+// (with a partial report), then one `result` or `error` event.
+
+export const streamReport = async (
+  criteria: JobCriteria,
+  onProgress: (progress: ScanProgress) => void,
+): Promise<ReportData> => {
+  let response: Response;
+  try {
+    response = await fetch(`${API_BASE_URL}/analyze-jobs/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(toRequestBody(criteria)),
+    });
+  } catch {
+    throw new Error('Cannot connect to backend. Is it running?');
+  }
+
+  if (!response.ok || !response.body) {
+    const body = await response.json().catch(() => null);
+    const msg = body?.detail;
+    if (response.status === 429) throw new Error(msg || 'Rate limit exceeded. Wait a moment.');
+    throw new Error(msg || `Analysis failed (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    let newline = buffer.indexOf('\n');
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      newline = buffer.indexOf('\n');
+      if (!line) continue;
+
+      const event = JSON.parse(line);
+      if (event.event === 'progress') {
+        onProgress({
+          query: event.query,
+          queries_done: event.queries_done,
+          queries_total: event.queries_total,
+          report: toReportData(event.data),
+        });
+      } else if (event.event === 'error') {
+        throw new Error(event.detail || 'Unexpected error during analysis.');
+      } else if (event.event === 'result') {
+        if (!event.success) throw new Error(event.message || 'Analysis failed');
+        return toReportData(event.data);
+      }
+    }
+
+    if (done) break;
+  }
+
+  throw new Error('Analysis stream ended unexpectedly.');
+};
+
 // ── Fetch History ───────────────────────────────────────────────────────────
 
 export const fetchHistory = async (): Promise<ScanHistoryEntry[]> => {
@@ -76,9 +147,12 @@ export const fetchHistory = async (): Promise<ScanHistoryEntry[]> => {
 
 // ── Fetch Aggregate Stats ───────────────────────────────────────────────────
 
+// Each role's trend series is bucketed server-side to at most this many points.
+const STATS_TREND_POINTS = 200;
+
 export const fetchStats = async (): Promise<AggregateStats | null> => {
   try {
-    const response = await api.get('/stats');
+    const response = await api.get('/stats', { params: { points: STATS_TREND_POINTS } });
     return response.data.stats || null;
   } catch (error) {
     console.error('Failed to load stats:', error);
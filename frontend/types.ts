@@ -42,6 +42,8 @@ export interface ReportData {
     total_jobs_found: number;
     jobs_with_descriptions: number;
     queries_used: string[];
+    pages_fetched?: Record<string, number>;
+    duplicates_collapsed?: number;
     search_criteria: {
       job_title: string;
       location?: string;
@@ -52,6 +54,13 @@ export interface ReportData {
   cert_pairs: CertPair[];
 }
 
+export interface ScanProgress {
+  query: string;
+  queries_done: number;
+  queries_total: number;
+  report: ReportData;
+}
+
 export interface ScanHistoryEntry {
   id: number;
   timestamp: string;
@@ -77,7 +86,8 @@ export interface TrendDataPoint {
   date: string;
   job_title: string;
   jobs: number;
-  [certName: string]: string | number;
+  scans?: number; // set when several scans were bucketed into this point
+  [certName: string]: string | number | undefined;
 }
 
 export interface AggregateStats {
@@ -1,3 +1,4 @@
+import gzip
 import os
 import subprocess
 import sys
@@ -6,6 +7,12 @@ from pathlib import Path
 ROOT = Path(__file__).parent.parent.resolve()
 BACKEND = ROOT / "backend"
 
+# Text-like dist files worth serving precompressed (images/fonts already are).
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt", ".xml", ".ico",
+    ".webmanifest",
+}
+
 def run_cmd(cmd, cwd):
     print(f"Running: {' '.join(cmd)}")
     result = subprocess.run(cmd, cwd=cwd, text=True)
@@ -13,11 +20,42 @@ def run_cmd(cmd, cwd):
         print(f"Command failed with exit code {result.returncode}")
         sys.exit(result.returncode)
 
+def precompress_dist(dist):
+    """Write .gz (and .br when brotli is installed) next to each compressible file.
+
+    The backend serves these by Accept-Encoding; variants that don't shrink
+    the file are skipped.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("brotli not installed — writing gzip variants only")
+
+    for path in dist.rglob("*"):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+
 def main():
     print("=== Building React Frontend ===")
     npm_bin = "npm.cmd" if os.name == "nt" else "npm"
     run_cmd([npm_bin, "run", "build"], cwd=ROOT)
+
+    print("\n=== Precompressing Frontend ===")
+    precompress_dist(ROOT / "dist")
     
+    print("\n=== Compiling Cert Index ===")
+    # Built with the interpreter PyInstaller bundles; the exe falls back to
+    # certs.json if the index doesn't match.
+    run_cmd([sys.executable, "-c", "import main; main.write_cert_index()"], cwd=BACKEND)
+
     print("\n=== Installing PyInstaller ===")
     run_cmd([sys.executable, "-m", "pip", "install", "pyinstaller"], cwd=ROOT)
     
@@ -29,8 +67,9 @@ def main():
     # Add dist/ built by vite.
     add_dist = f"{ROOT / 'dist'}{separator}dist"
     
-    # Add certs.json.
+    # Add certs.json and the prebuilt index compiled from it.
     add_certs = f"{BACKEND / 'certs.json'}{separator}."
+    add_cert_index = f"{BACKEND / 'certs.idx'}{separator}."
     
     # Hidden imports PyInstaller can't auto-detect
     hidden_imports = [
@@ -48,9 +87,11 @@ def main():
         "fastapi",
         "pydantic",
         "httpx",
+        "h2",
         "dotenv",
         "sqlite3",
         "config",
+        "metrics",
         "main",
     ]
 
@@ -61,6 +102,7 @@ def main():
         "--onefile",
         "--add-data", add_dist,
         "--add-data", add_certs,
+        "--add-data", add_cert_index,
         "--paths", str(BACKEND),
     ]
 